@@ -3,19 +3,37 @@ SkillTwin Backend - Complete Updated Version
 Proactive Learning & Evaluation Platform
 """
 import os
+import io
 import sys
 import uuid
 import json
-from datetime import datetime
-from flask import Flask, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, request, jsonify, send_from_directory
+import re
+import base64
+import binascii
+from datetime import datetime, date, timedelta
+from flask import Flask, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, Response, request, jsonify, send_from_directory, stream_with_context
 from flask.wrappers import Response
 from flask.wrappers import Response
 from flask.wrappers import Response
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text
+from sqlalchemy import text, event, func, case, select, update, tuple_, or_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.dialects import postgresql, sqlite
 from dotenv import load_dotenv
 import tempfile
+import threading
+import functools
+import atexit
+import signal
+import hashlib
+import unicodedata
+import random
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
 
 from sqlalchemy.orm.relationships import RelationshipProperty
 
@@ -28,7 +46,20 @@ from sqlalchemy.orm.relationships import RelationshipProperty
 from sqlalchemy.orm.relationships import RelationshipProperty
 
 from werkzeug.datastructures.file_storage import FileStorage
+from werkzeug.wsgi import get_input_stream
 from typing import Any, Literal
+import numpy as np
+
+from migrations import run_migrations
+from model_registry import ModelRegistry, PREDICTOR_FEATURES, feature_row
+from irt_engine import IRTAdaptiveEngine, DEFAULT_DISCRIMINATION, DEFAULT_GUESSING, DIFFICULTY_LOCATIONS
+from write_buffer import WriteBuffer, BufferFull
+from event_hub import EventHub, RowRelay
+from pdf_extract import PdfExtractor, ExtractorBusy
+from job_runner import JobRunner
+from knowledge_tracing import BKTParams, DEFAULT_BKT, bkt_update, bkt_replay
+from topic_classifier import TopicClassifier, TopicTerms
+from feature_store import derive_features, record_event, reset_state, WINDOW_DAYS, today as feature_today
 
 # Load environment variables
 load_dotenv()
@@ -48,9 +79,38 @@ CORS(app, resources={
 # Configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///skilltwin.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    # Concurrent writers queue on SQLite's single write lock; wait instead of failing fast
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 30))}}
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'skilltwin-dev-secret-2024')
 app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', './uploads')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload
+app.config['ADAPTIVE_SESSION_CAPACITY'] = int(os.getenv('ADAPTIVE_SESSION_CAPACITY', 10000))
+app.config['ADAPTIVE_BATCH_MAX'] = int(os.getenv('ADAPTIVE_BATCH_MAX', 50))
+app.config['RESPONSE_CACHE_SIZE'] = int(os.getenv('RESPONSE_CACHE_SIZE', 5000))
+app.config['PREDICT_BATCH_MAX'] = int(os.getenv('PREDICT_BATCH_MAX', 10000))
+app.config['MODEL_DIR'] = os.getenv('MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+app.config['PERFORMANCE_BUFFER_ENABLED'] = os.getenv('PERFORMANCE_BUFFER_ENABLED', '1') == '1'
+app.config['PERFORMANCE_BUFFER_FLUSH_MS'] = int(os.getenv('PERFORMANCE_BUFFER_FLUSH_MS', 200))
+app.config['PERFORMANCE_BUFFER_MAX_EVENTS'] = int(os.getenv('PERFORMANCE_BUFFER_MAX_EVENTS', 500))
+app.config['PERFORMANCE_BUFFER_MAX_LAG_MS'] = int(os.getenv('PERFORMANCE_BUFFER_MAX_LAG_MS', 2000))
+app.config['PERFORMANCE_BUFFER_MAX_DEPTH'] = int(os.getenv('PERFORMANCE_BUFFER_MAX_DEPTH', 50000))
+app.config['INGEST_MAX_BYTES'] = int(os.getenv('INGEST_MAX_BYTES', 256 * 1024 * 1024))
+app.config['INGEST_BATCH_SIZE'] = int(os.getenv('INGEST_BATCH_SIZE', 1000))
+app.config['WEEKLY_GOAL_MINUTES'] = int(os.getenv('WEEKLY_GOAL_MINUTES', 300))
+app.config['ACTIVITY_RETENTION_DAYS'] = int(os.getenv('ACTIVITY_RETENTION_DAYS', 180))
+app.config['SSE_REPLAY_SIZE'] = int(os.getenv('SSE_REPLAY_SIZE', 10000))
+app.config['SSE_SUBSCRIBER_BUFFER'] = int(os.getenv('SSE_SUBSCRIBER_BUFFER', 256))
+app.config['SSE_HEARTBEAT_SECONDS'] = int(os.getenv('SSE_HEARTBEAT_SECONDS', 15))
+app.config['SSE_RELAY_POLL_SECONDS'] = float(os.getenv('SSE_RELAY_POLL_SECONDS', 0))  # 0: stream this process's own writes
+app.config['PDF_WORKERS'] = int(os.getenv('PDF_WORKERS', 2))
+app.config['PDF_PAGE_TIMEOUT'] = float(os.getenv('PDF_PAGE_TIMEOUT', 10))
+app.config['PDF_MAX_PAGES'] = int(os.getenv('PDF_MAX_PAGES', 300))
+app.config['PDF_MEMORY_MB'] = int(os.getenv('PDF_MEMORY_MB', 512))
+app.config['PAPER_JOB_WORKERS'] = int(os.getenv('PAPER_JOB_WORKERS', 2))
+app.config['PAPER_JOB_STALE_SECONDS'] = int(os.getenv('PAPER_JOB_STALE_SECONDS', 120))
+app.config['PAPER_JOB_MAX_ATTEMPTS'] = int(os.getenv('PAPER_JOB_MAX_ATTEMPTS', 3))
+app.config['PAPER_JOB_BUSY_RETRY_SECONDS'] = int(os.getenv('PAPER_JOB_BUSY_RETRY_SECONDS', 15))
 
 # Initialize database
 db = SQLAlchemy(app)
@@ -64,6 +124,9 @@ def allowed_file(filename) -> bool:
 # ============ DATABASE MODELS ============
 class Student(db.Model):
     __tablename__: str = 'users'  # Changed from 'students' to 'users' to match our database
+    __table_args__ = (
+        db.Index('ix_users_class_level', 'class_level'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     email = db.Column(db.String(255), unique=True, nullable=False)
@@ -103,8 +166,21 @@ class Topic(db.Model):
     topic_name = db.Column(db.String(200), nullable=False)
     difficulty_level = db.Column(db.Integer, default=2)
     description = db.Column(db.Text)
+    synonyms = db.Column(db.JSON)  # extra phrases for the paper topic classifier
+    # Knowledge tracing parameters fitted by fit_bkt.py; NULL means DEFAULT_BKT
+    bkt_init = db.Column(db.Float)
+    bkt_learn = db.Column(db.Float)
+    bkt_guess = db.Column(db.Float)
+    bkt_slip = db.Column(db.Float)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    def bkt_params(self) -> BKTParams:
+        """(init, learn, guess, slip) with defaults for topics that have not been fitted"""
+        return BKTParams(*(
+            value if value is not None else default
+            for value, default in zip((self.bkt_init, self.bkt_learn, self.bkt_guess, self.bkt_slip), DEFAULT_BKT)
+        ))
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -112,11 +188,18 @@ class Topic(db.Model):
             'topic_name': self.topic_name,
             'difficulty_level': self.difficulty_level,
             'description': self.description,
+            'synonyms': self.synonyms or [],
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+    
+    def classifier_terms(self) -> TopicTerms:
+        return TopicTerms(self.subject, self.topic_name, tuple(self.synonyms or ()), self.description)
 
 class StudentPerformance(db.Model):
     __tablename__: str = 'student_performance'
+    __table_args__ = (
+        db.Index('uq_student_performance_student_topic', 'student_id', 'topic_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     student_id = db.Column(db.String(50), db.ForeignKey('users.student_id', ondelete='CASCADE'), nullable=False)
@@ -144,13 +227,19 @@ class StudentPerformance(db.Model):
 
 class MockTest(db.Model):
     __tablename__: str = 'mock_tests'
+    __table_args__ = (
+        # Trailing id makes (started_at, id) a total order for keyset pagination
+        db.Index('ix_mock_tests_student_started_id', 'student_id', 'started_at', 'id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    student_id = db.Column(db.String(36), db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False)
+    student_id = db.Column(db.String(50), db.ForeignKey('users.student_id', ondelete='CASCADE'), nullable=False)
     subject = db.Column(db.String(100), nullable=False)
     test_type = db.Column(db.String(50), default='adaptive')
-    questions = db.Column(db.JSON, default=list)
-    answers = db.Column(db.JSON, default=list)
+    questions = db.Column(db.JSON, default=list)  # legacy; answers now live in test_answers
+    answers = db.Column(db.JSON, default=list)  # legacy; answers now live in test_answers
+    current_question_id = db.Column(db.String(36))
+    answer_count = db.Column(db.Integer, default=0, nullable=False)
     scores = db.Column(db.JSON, default=dict)
     ability_estimate = db.Column(db.Float, default=0.5)
     total_score = db.Column(db.Float)
@@ -158,14 +247,31 @@ class MockTest(db.Model):
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
     
+    answer_log = db.relationship('TestAnswer', order_by='TestAnswer.seq', lazy='select', cascade='all, delete-orphan')
+    
+    def answer_records(self) -> list[dict]:
+        """Answers in submission order (falls back to the legacy JSON column)"""
+        if self.answer_log:
+            return [a.to_dict() for a in self.answer_log]
+        return list(self.answers or [])
+    
+    def question_records(self) -> list[dict]:
+        """Questions served so far: answered ones plus the pending one"""
+        if self.questions and not self.answer_log:
+            return list(self.questions)
+        question_ids = [a.question_id for a in self.answer_log]
+        if self.current_question_id:
+            question_ids.append(self.current_question_id)
+        return [question_pool.get(qid) or {'id': qid} for qid in question_ids]
+    
     def to_dict(self):
         return {
             'id': self.id,
             'student_id': self.student_id,
             'subject': self.subject,
             'test_type': self.test_type,
-            'questions': self.questions,
-            'answers': self.answers,
+            'questions': self.question_records(),
+            'answers': self.answer_records(),
             'scores': self.scores,
             'ability_estimate': self.ability_estimate,
             'total_score': self.total_score,
@@ -175,8 +281,30 @@ class MockTest(db.Model):
             'duration': (self.completed_at - self.started_at).total_seconds() if self.completed_at and self.started_at else None
         }
 
+class TestAnswer(db.Model):
+    __tablename__: str = 'test_answers'
+    
+    # (test_id, seq) is the primary key, so reads by test are a single index range scan
+    test_id = db.Column(db.String(36), db.ForeignKey('mock_tests.id', ondelete='CASCADE'), primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    question_id = db.Column(db.String(36), nullable=False)
+    answer = db.Column(db.String(10))
+    correct = db.Column(db.Boolean, nullable=False, default=False)
+    response_time = db.Column(db.Integer, default=0)
+    
+    def to_dict(self):
+        return {
+            'question_id': self.question_id,
+            'answer': self.answer,
+            'correct': self.correct,
+            'response_time': self.response_time
+        }
+
 class Question(db.Model):
     __tablename__: str = 'questions'
+    __table_args__ = (
+        db.Index('ix_questions_subject_difficulty', 'subject', 'difficulty'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     subject = db.Column(db.String(100), nullable=False)
@@ -187,8 +315,20 @@ class Question(db.Model):
     correct_answer = db.Column(db.String(10), nullable=False)
     explanation = db.Column(db.Text)
     marks = db.Column(db.Integer, default=1)
+    # IRT item parameters (3PL); irt_difficulty falls back to the difficulty label
+    irt_discrimination = db.Column(db.Float, default=1.0)
+    irt_difficulty = db.Column(db.Float)
+    irt_guessing = db.Column(db.Float, default=0.0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    def irt_params(self) -> tuple[float, float, float]:
+        """(a, b, c) item parameters with defaults for uncalibrated questions"""
+        return (
+            self.irt_discrimination if self.irt_discrimination is not None else DEFAULT_DISCRIMINATION,
+            self.irt_difficulty if self.irt_difficulty is not None else DIFFICULTY_LOCATIONS.get(self.difficulty, 0.0),
+            self.irt_guessing if self.irt_guessing is not None else DEFAULT_GUESSING
+        )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -205,9 +345,12 @@ class Question(db.Model):
 
 class StudentActivity(db.Model):
     __tablename__: str = 'student_activities'
+    __table_args__ = (
+        db.Index('ix_student_activities_student_created_id', 'student_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    student_id = db.Column(db.String(36), db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False)
+    student_id = db.Column(db.String(50), db.ForeignKey('users.student_id', ondelete='CASCADE'), nullable=False)
     activity_type = db.Column(db.String(50), nullable=False)
     description = db.Column(db.Text)
     activity_metadata = db.Column(db.JSON, default=dict)  # Changed from 'metadata'
@@ -225,17 +368,40 @@ class StudentActivity(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class AnalysisContent(db.Model):
+    __tablename__: str = 'paper_analysis_content'
+    
+    # One analysis per distinct paper and topic vocabulary: see analysis_key()
+    content_hash = db.Column(db.String(64), primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # pdf, txt or text
+    subject = db.Column(db.String(100))
+    analysis_data = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class PaperAnalysis(db.Model):
     __tablename__: str = 'paper_analyses'
+    __table_args__ = (
+        db.Index('ix_paper_analyses_student_created', 'student_id', 'created_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    student_id = db.Column(db.String(36), db.ForeignKey('students.id', ondelete='CASCADE'))
+    student_id = db.Column(db.String(50), db.ForeignKey('users.student_id', ondelete='CASCADE'))
     filename = db.Column(db.String(255))
     original_filename = db.Column(db.String(255))
     subject = db.Column(db.String(100))
     analysis_data = db.Column(db.JSON, default=dict)  # Changed from 'metadata'
+    # Newer rows reference shared content instead of carrying their own analysis_data
+    content_hash = db.Column(db.String(64), db.ForeignKey('paper_analysis_content.content_hash'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    content = db.relationship('AnalysisContent')
+    
+    @property
+    def analysis(self) -> dict | None:
+        if self.analysis_data:
+            return self.analysis_data
+        return self.content.analysis_data if self.content is not None else None
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -243,11 +409,176 @@ class PaperAnalysis(db.Model):
             'filename': self.filename,
             'original_filename': self.original_filename,
             'subject': self.subject,
-            'analysis_data': self.analysis_data,
+            'analysis_data': self.analysis,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class PaperJob(db.Model):
+    __tablename__: str = 'paper_jobs'
+    __table_args__ = (
+        db.Index('ix_paper_jobs_status_created', 'status', 'created_at'),
+    )
+    
+    # Durable queue entry for one uploaded paper: queued -> running -> done | failed
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    student_id = db.Column(db.String(50), db.ForeignKey('users.student_id', ondelete='CASCADE'))
+    filename = db.Column(db.String(255))  # as uploaded
+    stored_filename = db.Column(db.String(255), nullable=False)  # in UPLOAD_FOLDER
+    subject_hint = db.Column(db.String(100))
+    content_hash = db.Column(db.String(64))
+    status = db.Column(db.String(20), default='queued', nullable=False)
+    pages_done = db.Column(db.Integer, default=0)
+    page_count = db.Column(db.Integer)
+    attempts = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    analysis_id = db.Column(db.String(36))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    available_at = db.Column(db.DateTime)  # not claimed before this (busy-extractor backoff)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'student_id': self.student_id,
+            'filename': self.filename,
+            'status': self.status,
+            'pages_done': self.pages_done,
+            'page_count': self.page_count,
+            'progress': round(min(self.pages_done or 0, self.page_count) / self.page_count * 100, 1) if self.page_count else None,
+            'attempts': self.attempts,
+            'error': self.error,
+            'analysis_id': self.analysis_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class StudentSummary(db.Model):
+    __tablename__: str = 'student_summary'
+    
+    # Running totals behind the dashboard stats block, maintained by the write paths
+    student_id = db.Column(db.String(50), db.ForeignKey('users.student_id', ondelete='CASCADE'), primary_key=True)
+    topic_count = db.Column(db.Integer, default=0, nullable=False)
+    mastery_total = db.Column(db.Float, default=0.0, nullable=False)
+    questions_attempted = db.Column(db.Integer, default=0, nullable=False)
+    questions_correct = db.Column(db.Integer, default=0, nullable=False)
+    total_time_spent = db.Column(db.Integer, default=0, nullable=False)
+    tests_completed = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @property
+    def overall_mastery(self) -> float:
+        return self.mastery_total / self.topic_count if self.topic_count else 0
+    
+    def to_dict(self):
+        return {
+            'student_id': self.student_id,
+            'topic_count': self.topic_count,
+            'overall_mastery': round(self.overall_mastery, 1),
+            'questions_attempted': self.questions_attempted,
+            'questions_correct': self.questions_correct,
+            'total_time_spent': self.total_time_spent,
+            'tests_completed': self.tests_completed,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class PredictionSnapshot(db.Model):
+    __tablename__: str = 'prediction_snapshot'
+
+    # Last computed prediction per student, served as-is by GET /api/performance/predict
+    student_id = db.Column(db.String(50), db.ForeignKey('users.student_id', ondelete='CASCADE'), primary_key=True)
+    predicted_score = db.Column(db.Float, nullable=False)
+    interval_low = db.Column(db.Float, nullable=False)
+    interval_high = db.Column(db.Float, nullable=False)
+    confidence = db.Column(db.Float, nullable=False)
+    risk_level = db.Column(db.String(20), nullable=False)
+    average_mastery = db.Column(db.Float, default=0.0)
+    total_study_time = db.Column(db.Float, default=0.0)
+    weak_topics = db.Column(db.JSON, default=list)
+    model_version = db.Column(db.String(100))
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def prediction(self) -> dict:
+        return {
+            'predicted_score': self.predicted_score,
+            'confidence_interval': [self.interval_low, self.interval_high],
+            'confidence': self.confidence
+        }
+
+    def to_dict(self):
+        return {
+            'student_id': self.student_id,
+            'prediction': self.prediction(),
+            'risk_level': self.risk_level,
+            'average_mastery': self.average_mastery,
+            'total_study_time': self.total_study_time,
+            'weak_topics': self.weak_topics or [],
+            'model_version': self.model_version,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+
+class PredictionDirty(db.Model):
+    __tablename__: str = 'prediction_dirty'
+
+    # Students whose prediction inputs changed since their snapshot was computed
+    student_id = db.Column(db.String(50), primary_key=True)
+    marked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class StudentFeatures(db.Model):
+    __tablename__: str = 'student_features'
+
+    # Incremental activity aggregates behind the predictor inputs (see feature_store.py)
+    student_id = db.Column(db.String(50), primary_key=True)
+    day_counts = db.Column(db.JSON, default=list)  # ring buffer of daily event counts
+    last_day = db.Column(db.Integer)
+    last_active_day = db.Column(db.Integer)
+    gap_mean = db.Column(db.Float, default=0.0)
+    gap_var = db.Column(db.Float, default=0.0)
+    gap_count = db.Column(db.Integer, default=0)
+    score_ewma = db.Column(db.Float)
+    tests_scored = db.Column(db.Integer, default=0)
+    event_count = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self, day=None):
+        return {
+            'student_id': self.student_id,
+            **derive_features(self, DEFAULT_PREDICTOR_INPUTS, day),
+            'tests_scored': self.tests_scored,
+            'event_count': self.event_count,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class StudentDailyActivity(db.Model):
+    __tablename__: str = 'student_daily_activity'
+
+    # Per-student, per-UTC-day activity totals; kept when raw activities are pruned
+    student_id = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    activity_count = db.Column(db.Integer, default=0, nullable=False)
+    total_duration = db.Column(db.Integer, default=0, nullable=False)  # seconds
+    tests_completed = db.Column(db.Integer, default=0, nullable=False)
+    questions_answered = db.Column(db.Integer, default=0, nullable=False)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'activity_count': self.activity_count,
+            'total_duration': self.total_duration,
+            'tests_completed': self.tests_completed,
+            'questions_answered': self.questions_answered
+        }
+
 # ============ HELPER FUNCTIONS ============
+def init_schema() -> None:
+    """Create missing tables and apply pending migrations (needs an app context)"""
+    db.create_all()
+    applied = run_migrations(db.engine, db.metadata)
+    if applied:
+        print(f"Applied schema migrations: {applied}")
+
 def seed_sample_data() -> bool:
     """Seed database with sample data"""
     try:
@@ -272,12 +603,24 @@ def seed_sample_data() -> bool:
         
         # Create sample topics
         topics: list[Topic] = [
-            Topic(subject="Physics", topic_name="Thermodynamics", difficulty_level=3),
-            Topic(subject="Physics", topic_name="Optics", difficulty_level=2),
-            Topic(subject="Physics", topic_name="Mechanics", difficulty_level=2),
-            Topic(subject="Mathematics", topic_name="Calculus", difficulty_level=4),
-            Topic(subject="Mathematics", topic_name="Algebra", difficulty_level=2),
-            Topic(subject="Chemistry", topic_name="Organic Chemistry", difficulty_level=3),
+            Topic(subject="Physics", topic_name="Thermodynamics", difficulty_level=3,
+                  description="Heat, temperature and internal energy; the laws of thermodynamics and heat engines",
+                  synonyms=["entropy", "enthalpy", "specific heat", "carnot", "adiabatic", "isothermal"]),
+            Topic(subject="Physics", topic_name="Optics", difficulty_level=2,
+                  description="Reflection, refraction, lenses and mirrors",
+                  synonyms=["lens", "mirror", "focal length", "refractive index", "diffraction", "interference"]),
+            Topic(subject="Physics", topic_name="Mechanics", difficulty_level=2,
+                  description="Kinematics, laws of motion, work and energy",
+                  synonyms=["velocity", "acceleration", "momentum", "friction", "newton", "projectile"]),
+            Topic(subject="Mathematics", topic_name="Calculus", difficulty_level=4,
+                  description="Limits, derivatives and integrals",
+                  synonyms=["differentiate", "integrate", "derivative", "integral", "maxima", "minima"]),
+            Topic(subject="Mathematics", topic_name="Algebra", difficulty_level=2,
+                  description="Equations, polynomials and inequalities",
+                  synonyms=["quadratic", "polynomial", "linear equation", "factorise", "factorize", "roots"]),
+            Topic(subject="Chemistry", topic_name="Organic Chemistry", difficulty_level=3,
+                  description="Hydrocarbons, functional groups and reaction mechanisms",
+                  synonyms=["alkane", "alkene", "alkyne", "benzene", "isomer", "ester"]),
         ]
         
         for topic in topics:
@@ -408,12 +751,151 @@ def seed_sample_data() -> bool:
         traceback.print_exc()
         return False
 
+def build_student_summary(student_id) -> StudentSummary:
+    """Compute a summary row from scratch (used to backfill students without one)"""
+    topic_count, mastery_total, attempted, correct, time_spent = db.session.query(
+        func.count(StudentPerformance.id),
+        func.coalesce(func.sum(StudentPerformance.mastery_score), 0.0),
+        func.coalesce(func.sum(StudentPerformance.questions_attempted), 0),
+        func.coalesce(func.sum(StudentPerformance.questions_correct), 0),
+        func.coalesce(func.sum(StudentPerformance.total_time_spent), 0)
+    ).filter(StudentPerformance.student_id == student_id).one()
+    tests_completed = db.session.query(func.count(MockTest.id))\
+        .filter(MockTest.student_id == student_id, MockTest.completed_at.isnot(None)).scalar()
+    return StudentSummary(
+        student_id=student_id,
+        topic_count=topic_count,
+        mastery_total=mastery_total,
+        questions_attempted=attempted,
+        questions_correct=correct,
+        total_time_spent=time_spent,
+        tests_completed=tests_completed
+    )
+
+def bump_student_summary(student_id, **deltas) -> None:
+    """Apply counter deltas to a student's summary in one UPDATE (caller commits)
+    
+    The first write for a student inserts a row built from the source rows instead. Two
+    first writers can race there, so the insert is an upsert: the loser adds its deltas
+    to the winner's row, whose totals could not yet see the loser's uncommitted rows.
+    """
+    now = datetime.utcnow()
+    values = {getattr(StudentSummary, name): getattr(StudentSummary, name) + delta for name, delta in deltas.items()}
+    values[StudentSummary.updated_at] = now
+    updated = StudentSummary.query.filter_by(student_id=student_id)\
+        .update(values, synchronize_session=False)
+    if not updated:
+        # First write for this student: flush pending changes and build from source rows
+        db.session.flush()
+        summary = build_student_summary(student_id)
+        row = {name: getattr(summary, name) for name in (
+            'student_id', 'topic_count', 'mastery_total', 'questions_attempted',
+            'questions_correct', 'total_time_spent', 'tests_completed'
+        )}
+        stmt = dialect_insert(StudentSummary).values(**row, updated_at=now)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['student_id'],
+            set_={column.key: expression for column, expression in values.items()}
+        ))
+
+def load_student_summary(student_id) -> StudentSummary:
+    """Primary-key read of a student's summary, backfilling it if missing"""
+    summary = db.session.get(StudentSummary, student_id)
+    if summary is None:
+        summary = build_student_summary(student_id)
+        db.session.add(summary)
+        db.session.commit()
+    return summary
+
+def encode_cursor(moment, row_id) -> str:
+    """Opaque pagination cursor for the row a page ended at"""
+    raw = json.dumps([moment.isoformat(), row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor, id_type=(int, str)) -> tuple[datetime, Any]:
+    """(timestamp, id) from encode_cursor(); ValueError if the cursor was not issued by us
+    
+    The id must be an instance of id_type, so a forged cursor cannot put a list, object
+    or wrongly typed value into the seek comparison.
+    """
+    try:
+        moment, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(moment, str) or isinstance(row_id, bool) or not isinstance(row_id, id_type):
+            raise ValueError('Invalid cursor')
+        return datetime.fromisoformat(moment), row_id
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError('Invalid cursor') from e
+
+def keyset_page(query, time_column, id_column, cursor=None, limit=20) -> tuple[list, str | None]:
+    """Newest-first page of query after cursor, plus the cursor for the next page
+    
+    Seeks on (time_column, id_column) instead of OFFSET, so with a matching
+    (student_id, time, id) index every page costs the same as the first.
+    """
+    if cursor:
+        moment, row_id = decode_cursor(cursor, id_column.type.python_type)
+        query = query.filter(tuple_(time_column, id_column) < tuple_(moment, row_id))
+    rows = query.order_by(time_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, time_column.key), getattr(last, id_column.key))
+
+def dialect_insert(model):
+    """INSERT for the bound database that supports on_conflict_do_* (SQLite and PostgreSQL)"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+def mark_prediction_dirty(student_id) -> None:
+    """Queue a student for the next snapshot refresh (caller commits)"""
+    now = datetime.utcnow()
+    db.session.execute(
+        dialect_insert(PredictionDirty)
+        .values(student_id=str(student_id), marked_at=now)
+        .on_conflict_do_update(index_elements=['student_id'], set_={'marked_at': now})
+    )
+
+def performance_increment(student_id, topic_id, attempted, correct, minutes, now) -> dict:
+    """Parameters for performance_upsert(): counters to add to a (student, topic) row"""
+    return {
+        'student_id': student_id,
+        'topic_id': topic_id,
+        'questions_attempted': attempted,
+        'questions_correct': correct,
+        'total_time_spent': minutes,
+        'mastery_score': 0.0,  # set by the knowledge-tracing step that follows the upsert
+        'last_updated': now
+    }
+
+def performance_upsert():
+    """INSERT .. ON CONFLICT DO UPDATE that adds counters to a StudentPerformance row atomically
+
+    Counters are combined in SQL from the stored row, so concurrent writers
+    cannot lose increments (SQLite 3.24+ and PostgreSQL). mastery_score is left
+    as stored; the upsert also locks the row until commit, so callers then
+    advance the knowledge-tracing mastery without racing other writers.
+    """
+    stmt = dialect_insert(StudentPerformance)
+    return stmt.on_conflict_do_update(
+        index_elements=['student_id', 'topic_id'],
+        set_={
+            'questions_attempted': StudentPerformance.questions_attempted + stmt.excluded.questions_attempted,
+            'questions_correct': StudentPerformance.questions_correct + stmt.excluded.questions_correct,
+            'total_time_spent': StudentPerformance.total_time_spent + stmt.excluded.total_time_spent,
+            'last_updated': stmt.excluded.last_updated
+        }
+    )
+
 # ============ SIMPLE ML ENGINE (No external dependencies) ============
 class SimplePredictor:
-    """Simple performance predictor without numpy/scikit-learn"""
+    """Simple linear performance predictor (per student, or vectorized over many)"""
+    
+    version = 'simple-v1'
     
     def __init__(self) -> None:
-        pass
+        self._rng = np.random.default_rng()
     
     def predict(self, student_data):
         """Simple prediction based on mastery scores"""
@@ -425,7 +907,6 @@ class SimplePredictor:
         base_score: int = max(0, min(100, base_score))
         
         # Add some randomness
-        import random
         variation: float = random.uniform(-5, 5)
         predicted_score: float = base_score + variation
         
@@ -438,6 +919,20 @@ class SimplePredictor:
             'confidence': round(85 + random.uniform(-10, 10), 1)
         }
     
+    def predict_batch(self, features) -> dict[str, np.ndarray]:
+        """Vectorized predict() over a feature matrix in PREDICTOR_FEATURES column order"""
+        average_mastery = features[:, PREDICTOR_FEATURES.index('average_mastery')]
+        engagement = features[:, PREDICTOR_FEATURES.index('engagement_score')]
+        base_score = np.clip(average_mastery * 0.8 + engagement * 20, 0, 100)
+        predicted_score = base_score + self._rng.uniform(-5, 5, size=base_score.shape)
+        
+        return {
+            'predicted_score': np.round(predicted_score, 1),
+            'interval_low': np.round(predicted_score - 5, 1),
+            'interval_high': np.round(predicted_score + 5, 1),
+            'confidence': np.round(85 + self._rng.uniform(-10, 10, size=base_score.shape), 1)
+        }
+    
     def assess_risk(self, predicted_score) -> str:
         """Assess risk level"""
         if predicted_score >= 80:
@@ -446,14 +941,21 @@ class SimplePredictor:
             return 'medium'
         else:
             return 'high'
+    
+    def assess_risk_batch(self, predicted_scores) -> np.ndarray:
+        """Vectorized assess_risk()"""
+        return np.select([predicted_scores >= 80, predicted_scores >= 60], ['low', 'medium'], default='high')
 
 class SimpleAdaptiveEngine:
-    """Simple adaptive test engine"""
+    """Simple adaptive test engine (one instance per running test)"""
     
-    def __init__(self) -> None:
-        self.ability_estimate = 0.5
+    __slots__ = ('ability_estimate', 'consecutive_correct', 'consecutive_wrong', 'asked_mask')
+    
+    def __init__(self, ability_estimate=0.5) -> None:
+        self.ability_estimate = ability_estimate
         self.consecutive_correct = 0
         self.consecutive_wrong = 0
+        self.asked_mask = 0  # bitset over QuestionPoolIndex ordinals
     
     def get_next_difficulty(self, previous_correct, response_time=30) -> str:
         """Determine next question difficulty"""
@@ -487,10 +989,1005 @@ class SimpleAdaptiveEngine:
         self.ability_estimate = 0.5
         self.consecutive_correct = 0
         self.consecutive_wrong = 0
+        self.asked_mask = 0
+    
+    def record_answer(self, question, correct, response_time=30, pool=None) -> str:
+        """Common engine interface: update state and return the next difficulty"""
+        return self.get_next_difficulty(correct, response_time)
+    
+    def select_next(self, pool, subject, difficulty) -> dict | None:
+        return pool.select_nearest(subject, difficulty, self.asked_mask)
+    
+    def is_converged(self, questions_completed) -> bool:
+        return False
+    
+    @classmethod
+    def from_test(cls, test, pool) -> 'SimpleAdaptiveEngine':
+        """Rebuild engine state from a persisted MockTest"""
+        engine = cls(test.ability_estimate if test.ability_estimate is not None else 0.5)
+        answers = test.answer_records()
+        
+        # Streak counters only depend on the trailing run of answers
+        if answers:
+            last_correct = bool(answers[-1].get('correct'))
+            run = 0
+            for a in reversed(answers):
+                if bool(a.get('correct')) != last_correct:
+                    break
+                run += 1
+            if last_correct:
+                engine.consecutive_correct = run
+            else:
+                engine.consecutive_wrong = run
+        
+        for a in answers:
+            engine.asked_mask |= pool.bit(a.get('question_id'))
+        for q in test.question_records():
+            engine.asked_mask |= pool.bit(q.get('id'))
+        return engine
+
+class QuestionPoolIndex:
+    """In-memory index of (subject, topic, difficulty) -> question ordinals for adaptive selection"""
+    
+    def __init__(self) -> None:
+        self._ids: list[str] = []
+        self._payloads: list[dict] = []
+        self._ordinals: dict[str, int] = {}
+        self._buckets: dict[tuple, array] = {}
+        self._params: list[tuple[float, float, float]] = []
+        self._subject_items: dict[str, array] = {}
+        self._subject_arrays: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+    
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for question in Question.query.order_by(Question.created_at, Question.id).all():
+                self._add_locked(question)
+            self._loaded = True
+    
+    def _add_locked(self, question) -> None:
+        if question.id in self._ordinals:
+            return
+        ordinal = len(self._ids)
+        self._ids.append(question.id)
+        self._payloads.append(question.to_dict())
+        self._params.append(question.irt_params())
+        self._ordinals[question.id] = ordinal
+        self._subject_items.setdefault(question.subject, array('I')).append(ordinal)
+        self._subject_arrays.pop(question.subject, None)
+        # Bucket by exact topic and by "any topic" so both lookups stay O(1)
+        for key in ((question.subject, question.topic, question.difficulty),
+                    (question.subject, None, question.difficulty)):
+            self._buckets.setdefault(key, array('I')).append(ordinal)
+    
+    def add(self, questions) -> None:
+        """Incrementally index newly committed questions"""
+        if not self._loaded:
+            return  # picked up by the initial load
+        with self._lock:
+            for question in questions:
+                self._add_locked(question)
+    
+    def invalidate(self) -> None:
+        """Drop the index so it is rebuilt on next use (e.g. after bulk edits)"""
+        with self._lock:
+            self._ids, self._payloads, self._ordinals, self._buckets = [], [], {}, {}
+            self._params, self._subject_items, self._subject_arrays = [], {}, {}
+            self._loaded = False
+    
+    def get(self, question_id) -> dict | None:
+        """Return the serialized question for an id, if indexed"""
+        self._ensure_loaded()
+        ordinal = self._ordinals.get(question_id)
+        return self._payloads[ordinal] if ordinal is not None else None
+    
+    def payload(self, ordinal) -> dict:
+        return self._payloads[ordinal]
+    
+    def item_params(self, question_id) -> tuple[float, float, float] | None:
+        """IRT (a, b, c) parameters for a question id, if indexed"""
+        self._ensure_loaded()
+        ordinal = self._ordinals.get(question_id)
+        return self._params[ordinal] if ordinal is not None else None
+    
+    def item_arrays(self, subject) -> tuple:
+        """Columnar (ordinals, a, b, c) NumPy arrays for every question in a subject"""
+        self._ensure_loaded()
+        arrays = self._subject_arrays.get(subject)
+        if arrays is None:
+            with self._lock:
+                ordinals = np.frombuffer(self._subject_items.get(subject, array('I')), dtype=np.uint32).copy()
+                params = np.array([self._params[o] for o in ordinals], dtype=float).reshape(-1, 3)
+                arrays = (ordinals, params[:, 0], params[:, 1], params[:, 2])
+                self._subject_arrays[subject] = arrays
+        return arrays
+    
+    def mask_to_array(self, mask, ordinals) -> np.ndarray:
+        """Expand a bitset into a boolean array aligned with the given ordinals"""
+        if not mask:
+            return np.zeros(len(ordinals), dtype=bool)
+        nbytes = (max(len(self._ids), mask.bit_length()) + 7) // 8
+        raw = np.frombuffer(mask.to_bytes(nbytes, 'little'), dtype=np.uint8)
+        bits = np.unpackbits(raw, bitorder='little').astype(bool)
+        return bits[ordinals]
+    
+    def bit(self, question_id) -> int:
+        """Bitset mask for a question id (0 if unknown)"""
+        self._ensure_loaded()
+        ordinal = self._ordinals.get(question_id)
+        return 1 << ordinal if ordinal is not None else 0
+    
+    def select(self, subject, difficulty, exclude_mask=0, topic=None) -> dict | None:
+        """Pick a random question from a bucket, preferring ones not in exclude_mask"""
+        self._ensure_loaded()
+        bucket = self._buckets.get((subject, topic, difficulty))
+        if not bucket:
+            return None
+        size = len(bucket)
+        start = random.randrange(size)
+        for step in range(size):
+            ordinal = bucket[(start + step) % size]
+            if not (exclude_mask >> ordinal) & 1:
+                return self._payloads[ordinal]
+        # Everything in the bucket has been asked; allow a repeat
+        return self._payloads[bucket[start]]
+    
+    def select_nearest(self, subject, difficulty, exclude_mask=0, topic=None) -> dict | None:
+        """Select at the requested difficulty, falling back to adjacent ones"""
+        difficulties: list[str] = ['easy', 'medium', 'hard']
+        current_idx: int = difficulties.index(difficulty) if difficulty in difficulties else 1
+        
+        # Unseen questions at any nearby difficulty beat a repeat at the exact one
+        for allow_repeat in (False, True):
+            for offset in [0, 1, -1, 2, -2]:
+                idx = current_idx + offset
+                if 0 <= idx < len(difficulties):
+                    question = self.select(subject, difficulties[idx], exclude_mask, topic)
+                    if question and (allow_repeat or not exclude_mask & self.bit(question['id'])):
+                        return question
+        return None
+
+class AdaptiveSessionStore:
+    """Bounded LRU store of per-test adaptive engines keyed by MockTest.id
+    
+    Engines are mutable: answer inside answering(test_id), from loading the
+    test until the commit, so two requests for one test never advance the
+    same engine at once and a failed commit never leaves it ahead of the row.
+    """
+    
+    def __init__(self, pool, capacity=10000, engines=None, lock_stripes=64) -> None:
+        self.engines = engines or {}
+        self.pool = pool
+        self.capacity = capacity
+        self._sessions: OrderedDict[str, SimpleAdaptiveEngine] = OrderedDict()
+        self._lock = threading.Lock()
+        self._test_locks = [threading.Lock() for _ in range(lock_stripes)]
+    
+    def lock(self, test_id) -> threading.Lock:
+        """Lock serializing answers for a test (striped, so memory stays fixed)"""
+        return self._test_locks[hash(test_id) % len(self._test_locks)]
+    
+    @contextmanager
+    def answering(self, test_id):
+        """Hold the test's lock; on error its engine is dropped before the lock is released,
+        since it may be ahead of what was committed"""
+        with self.lock(test_id):
+            try:
+                yield
+            except BaseException:
+                self.discard(test_id)
+                raise
+    
+    def engine_class(self, test_type):
+        return self.engines.get(test_type, SimpleAdaptiveEngine)
+    
+    def create(self, test_id, test_type='adaptive', ability_estimate=0.5):
+        """Register a fresh engine for a newly started test"""
+        engine = self.engine_class(test_type)(ability_estimate)
+        self._put(test_id, engine)
+        return engine
+    
+    def get(self, test) -> SimpleAdaptiveEngine:
+        """Return the engine for a test, rehydrating it from the row on a miss"""
+        with self._lock:
+            engine = self._sessions.get(test.id)
+            if engine is not None:
+                self._sessions.move_to_end(test.id)
+                return engine
+        engine = self.engine_class(test.test_type).from_test(test, self.pool)
+        self._put(test.id, engine)
+        return engine
+    
+    def discard(self, test_id) -> None:
+        """Drop a finished test's engine"""
+        with self._lock:
+            self._sessions.pop(test_id, None)
+    
+    def _put(self, test_id, engine) -> None:
+        with self._lock:
+            self._sessions[test_id] = engine
+            self._sessions.move_to_end(test_id)
+            while len(self._sessions) > self.capacity:
+                self._sessions.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
 
 # Initialize engines
 predictor = SimplePredictor()
-adaptive_engine = SimpleAdaptiveEngine()
+model_registry = ModelRegistry(app.config['MODEL_DIR'], predictor)
+question_pool = QuestionPoolIndex()
+# Engine per MockTest.test_type; unknown types use SimpleAdaptiveEngine
+ADAPTIVE_ENGINES = {
+    'adaptive': SimpleAdaptiveEngine,
+    'irt': IRTAdaptiveEngine
+}
+adaptive_sessions = AdaptiveSessionStore(question_pool, app.config['ADAPTIVE_SESSION_CAPACITY'], ADAPTIVE_ENGINES)
+
+@event.listens_for(Session, 'after_flush')
+def _collect_new_questions(session, flush_context) -> None:
+    new_questions = [obj for obj in session.new if isinstance(obj, Question)]
+    if new_questions:
+        session.info.setdefault('new_questions', []).extend(new_questions)
+
+@event.listens_for(Session, 'after_commit')
+def _index_new_questions(session) -> None:
+    new_questions = session.info.pop('new_questions', None)
+    if new_questions:
+        question_pool.add(new_questions)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_new_questions(session) -> None:
+    session.info.pop('new_questions', None)
+
+# ============ RESPONSE CACHE ============
+class StudentResponseCache:
+    """LRU cache of student-scoped GET responses keyed by a per-student version counter
+    
+    Any committed write touching a student's rows bumps that student's version, so
+    stale entries are never served and simply age out. Versions live in process
+    memory; the ETag includes a per-process epoch so restarts invalidate clients.
+    """
+    
+    def __init__(self, capacity=5000) -> None:
+        self.capacity = capacity
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: dict[str, int] = {}
+        self._entries: OrderedDict[tuple, tuple[bytes, str]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def version(self, student_id) -> int:
+        return self._versions.get(str(student_id), 0)
+    
+    def bump(self, student_ids) -> None:
+        with self._lock:
+            for student_id in student_ids:
+                key = str(student_id)
+                self._versions[key] = self._versions.get(key, 0) + 1
+    
+    def etag(self, key) -> str:
+        return hashlib.sha1(f'{self.epoch}:{key}'.encode()).hexdigest()[:20]
+    
+    def get(self, key) -> tuple[bytes, str] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def put(self, key, entry) -> None:
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+response_cache = StudentResponseCache(app.config['RESPONSE_CACHE_SIZE'])
+
+# Rows carrying a student_id whose changes invalidate that student's cached responses.
+# Derived rows (StudentSummary, StudentFeatures) are left out: they only change alongside
+# these, and a read path backfilling one must not bump the version its response is cached under.
+STUDENT_SCOPED_MODELS = (StudentPerformance, StudentActivity, MockTest, PaperAnalysis)
+
+@event.listens_for(Session, 'after_flush')
+def _collect_touched_students(session, flush_context) -> None:
+    touched = {
+        obj.student_id
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, STUDENT_SCOPED_MODELS) and obj.student_id
+    }
+    if touched:
+        session.info.setdefault('touched_students', set()).update(touched)
+
+@event.listens_for(Session, 'after_commit')
+def _bump_touched_students(session) -> None:
+    touched = session.info.pop('touched_students', None)
+    if touched:
+        response_cache.bump(touched)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_touched_students(session) -> None:
+    session.info.pop('touched_students', None)
+
+def student_cached(view=None, *, vary=None):
+    """Serve a student-scoped GET from the version cache, answering If-None-Match with 304
+    
+    vary is an optional callable taking the student_id whose result is added to the cache key,
+    for state the version counter cannot see (the date, rows written by other processes).
+    
+    The cache is per process: versions only move on this process's commits, so with several
+    workers each keeps its own entries, and writes from other processes are seen only via vary.
+    The key is taken before the view runs, so views must not commit to scoped models.
+    """
+    if view is None:
+        return functools.partial(student_cached, vary=vary)
+    
+    @functools.wraps(view)
+    def wrapper(student_id, *args, **kwargs):
+        key = (request.endpoint, str(student_id), request.query_string.decode(), response_cache.version(student_id))
+        if vary is not None:
+            key += (vary(student_id),)
+        etag = response_cache.etag(key)
+        
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            entry = response_cache.get(key)
+            if entry is None:
+                response = app.make_response(view(student_id, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = (response.get_data(), response.mimetype)
+                response_cache.put(key, entry)
+            response = Response(entry[0], mimetype=entry[1])
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+# ============ LIVE ACTIVITY EVENTS ============
+activity_hub = EventHub(app.config['SSE_REPLAY_SIZE'], app.config['SSE_SUBSCRIBER_BUFFER'])
+
+def activity_event(activity, class_level) -> tuple[list[str], str]:
+    """(channels, event type) for an activity dict: its student's channel and its class's"""
+    channels = [f"student:{activity['student_id']}"]
+    if class_level:
+        channels.append(f'class:{class_level}')
+    return channels, 'test_completed' if activity['activity_type'] == 'test_completed' else 'activity'
+
+def publish_activities(activities) -> None:
+    """Push committed (activity dict, class_level) pairs to stream subscribers"""
+    for activity, class_level in activities:
+        channels, kind = activity_event(activity, class_level)
+        activity_hub.publish(channels, kind, activity)
+
+def queue_activity_events(session, activities) -> None:
+    """Hold activity dicts for publishing after commit, tagged with each student's current class"""
+    student_ids = list({activity['student_id'] for activity in activities})
+    class_levels = {}
+    for start in range(0, len(student_ids), 900):
+        # Core on the session's connection: no autoflush, so this is safe inside flush hooks
+        class_levels.update(session.connection().execute(
+            select(Student.student_id, Student.class_level)
+            .where(Student.student_id.in_(student_ids[start:start + 900]))
+        ).all())
+    session.info.setdefault('activity_events', []).extend(
+        (activity, class_levels.get(activity['student_id'])) for activity in activities
+    )
+
+@event.listens_for(Session, 'after_flush')
+def _collect_activity_events(session, flush_context) -> None:
+    activities = [obj for obj in session.new if isinstance(obj, StudentActivity) and obj.student_id]
+    if activities:
+        queue_activity_events(session, [a.to_dict() for a in activities])
+
+@event.listens_for(Session, 'after_commit')
+def _publish_activity_events(session) -> None:
+    # Only committed activities reach subscribers; with the relay on they arrive from the table instead
+    activities = session.info.pop('activity_events', None)
+    if activities and activity_relay is None:
+        publish_activities(activities)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_activity_events(session) -> None:
+    session.info.pop('activity_events', None)
+
+def fetch_activity_events(after_id, gap_ids) -> list[tuple]:
+    """Activities committed by any process after after_id (or among gap_ids), for the relay"""
+    with app.app_context():
+        condition = StudentActivity.id > after_id
+        if gap_ids:
+            condition = or_(condition, StudentActivity.id.in_(gap_ids))
+        rows = db.session.query(StudentActivity, Student.class_level)\
+            .outerjoin(Student, Student.student_id == StudentActivity.student_id)\
+            .filter(condition).order_by(StudentActivity.id).limit(1000).all()
+        events = []
+        for activity, class_level in rows:
+            data = activity.to_dict()
+            events.append((activity.id, *activity_event(data, class_level), data))
+        return events
+
+def latest_activity_id() -> int:
+    with app.app_context():
+        return db.session.query(func.max(StudentActivity.id)).scalar() or 0
+
+# Stream workers run apart from the API workers, so they follow the table rather than their own commits
+activity_relay = RowRelay(
+    activity_hub,
+    fetch_activity_events,
+    latest_activity_id,
+    poll_seconds=app.config['SSE_RELAY_POLL_SECONDS']
+) if app.config['SSE_RELAY_POLL_SECONDS'] > 0 else None
+
+def sse_message(event) -> str:
+    """One Server-Sent Events frame"""
+    lines = []
+    if event.get('id'):
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['event']}")
+    lines.append(f"data: {json.dumps(event['data'], default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+# ============ PREDICTION SNAPSHOTS ============
+# Feature values used until a student has rows to derive them from
+DEFAULT_PREDICTOR_INPUTS = {
+    'engagement_score': 0.7,
+    'average_quiz_score': 75,
+    'average_mastery': 60,
+    'consistency_score': 0.8,
+    'total_study_time': 10
+}
+
+# Predictor inputs served from the incremental feature store
+ACTIVITY_FEATURES = ('engagement_score', 'average_quiz_score', 'consistency_score')
+
+def activity_score(activity_type, metadata):
+    """Test score carried by a test_completed activity, if any"""
+    if activity_type != 'test_completed':
+        return None
+    return (metadata or {}).get('score')
+
+def build_student_features(student_id) -> StudentFeatures:
+    """Replay a student's stored activity history into a fresh feature row (one-time backfill)"""
+    state = StudentFeatures(student_id=str(student_id))
+    reset_state(state)
+    history = StudentActivity.query.filter_by(student_id=student_id)\
+        .order_by(StudentActivity.created_at, StudentActivity.id)
+    for activity in history:
+        record_event(state, activity.created_at or datetime.utcnow(),
+                     activity_score(activity.activity_type, activity.activity_metadata))
+    return state
+
+def record_activity_features(session, events) -> None:
+    """Fold (student_id, created_at, activity_type, metadata) events into feature rows
+
+    Call before the activities themselves are written, so a backfill for a
+    student without a feature row does not count them twice.
+    """
+    now = datetime.utcnow()
+    events = sorted(((str(sid), created_at or now, kind, metadata) for sid, created_at, kind, metadata in events),
+                    key=lambda e: e[1])
+    student_ids = list({e[0] for e in events})
+    states: dict[str, StudentFeatures] = {}
+    with session.no_autoflush:
+        for start in range(0, len(student_ids), 900):
+            chunk = student_ids[start:start + 900]
+            states.update((state.student_id, state) for state in
+                          session.query(StudentFeatures).filter(StudentFeatures.student_id.in_(chunk)))
+        for student_id, created_at, kind, metadata in events:
+            state = states.get(student_id)
+            if state is None:
+                state = states[student_id] = build_student_features(student_id)
+                session.add(state)
+            record_event(state, created_at, activity_score(kind, metadata))
+
+@event.listens_for(Session, 'before_flush')
+def _record_activity_features(session, flush_context, instances) -> None:
+    activities = [obj for obj in session.new if isinstance(obj, StudentActivity) and obj.student_id is not None]
+    if activities:
+        # Pending activities are not in the history a backfill replays
+        record_activity_features(session, [
+            (a.student_id, a.created_at, a.activity_type, a.activity_metadata) for a in activities
+        ])
+
+def build_feature_matrix(student_ids) -> np.ndarray:
+    """Feature matrix (rows follow student_ids) from grouped/primary-key queries per chunk of ids"""
+    day = feature_today()
+    position = {sid: i for i, sid in enumerate(student_ids)}
+    features = np.array([feature_row(DEFAULT_PREDICTOR_INPUTS)] * len(student_ids), dtype=float)
+    features = features.reshape(len(student_ids), len(PREDICTOR_FEATURES))
+    mastery_col = PREDICTOR_FEATURES.index('average_mastery')
+    time_col = PREDICTOR_FEATURES.index('total_study_time')
+    for start in range(0, len(student_ids), 900):
+        chunk = student_ids[start:start + 900]
+        rows = db.session.query(
+            StudentPerformance.student_id,
+            func.avg(StudentPerformance.mastery_score),
+            func.sum(StudentPerformance.total_time_spent)
+        ).filter(StudentPerformance.student_id.in_(chunk))\
+            .group_by(StudentPerformance.student_id).all()
+        for sid, avg_mastery, time_spent in rows:
+            features[position[sid], mastery_col] = avg_mastery or 0
+            features[position[sid], time_col] = (time_spent or 0) / 60
+        for state in StudentFeatures.query.filter(StudentFeatures.student_id.in_(chunk)):
+            derived = derive_features(state, DEFAULT_PREDICTOR_INPUTS, day)
+            for name in ACTIVITY_FEATURES:
+                features[position[state.student_id], PREDICTOR_FEATURES.index(name)] = derived[name]
+    return features
+
+def weakest_topics(student_ids, limit=3) -> dict[str, list[dict]]:
+    """Lowest-mastery topics per student, ranked in SQL with ROW_NUMBER()"""
+    ranked = select(
+        StudentPerformance.student_id,
+        StudentPerformance.topic_id,
+        StudentPerformance.mastery_score,
+        StudentPerformance.questions_attempted,
+        StudentPerformance.questions_correct,
+        func.row_number().over(
+            partition_by=StudentPerformance.student_id,
+            order_by=StudentPerformance.mastery_score
+        ).label('rank')
+    ).where(StudentPerformance.student_id.in_(student_ids)).subquery()
+    rows = db.session.query(ranked, Topic.topic_name, Topic.subject)\
+        .outerjoin(Topic, Topic.id == ranked.c.topic_id)\
+        .filter(ranked.c.rank <= limit)\
+        .order_by(ranked.c.student_id, ranked.c.rank).all()
+
+    weak: dict[str, list[dict]] = {}
+    for row in rows:
+        weak.setdefault(row.student_id, []).append({
+            'topic': row.topic_name or 'Unknown',
+            'mastery': row.mastery_score,
+            'subject': row.subject or 'General',
+            'questions_attempted': row.questions_attempted,
+            'accuracy': round((row.questions_correct / row.questions_attempted * 100), 2) if row.questions_attempted else 0
+        })
+    return weak
+
+def refresh_prediction_snapshots(student_ids=None, chunk_size=500) -> dict:
+    """Recompute snapshots for the given students, or for every dirty one
+
+    With no ids this covers students marked dirty, snapshots scored by a model
+    other than the active one, and snapshots from before today for students
+    active within the feature window, so cost tracks activity, not population.
+    Commits once per chunk; dirty marks made while a chunk is being scored are kept.
+    """
+    started = datetime.utcnow()
+    model = model_registry.get()
+    if student_ids is None:
+        dirty = db.session.query(PredictionDirty.student_id).filter(PredictionDirty.marked_at <= started)
+        outdated = db.session.query(PredictionSnapshot.student_id)\
+            .filter(PredictionSnapshot.model_version != model.version)
+        # Windowed features keep moving for a month after a student's last activity
+        sliding = db.session.query(PredictionSnapshot.student_id)\
+            .join(StudentFeatures, StudentFeatures.student_id == PredictionSnapshot.student_id)\
+            .filter(StudentFeatures.last_active_day > feature_today() - WINDOW_DAYS,
+                    PredictionSnapshot.computed_at < datetime(started.year, started.month, started.day))
+        student_ids = [sid for (sid,) in dirty.union(outdated, sliding).all()]
+    student_ids = [str(sid) for sid in dict.fromkeys(student_ids)]
+
+    mastery_col = PREDICTOR_FEATURES.index('average_mastery')
+    time_col = PREDICTOR_FEATURES.index('total_study_time')
+    for start in range(0, len(student_ids), chunk_size):
+        chunk = student_ids[start:start + chunk_size]
+        features = build_feature_matrix(chunk)
+        scores = model.predict_batch(features)
+        risk = predictor.assess_risk_batch(scores['predicted_score'])
+        weak = weakest_topics(chunk)
+        computed_at = datetime.utcnow()
+
+        rows = [{
+            'student_id': sid,
+            'predicted_score': float(scores['predicted_score'][i]),
+            'interval_low': float(scores['interval_low'][i]),
+            'interval_high': float(scores['interval_high'][i]),
+            'confidence': float(scores['confidence'][i]),
+            'risk_level': str(risk[i]),
+            'average_mastery': round(float(features[i, mastery_col]), 1),
+            'total_study_time': round(float(features[i, time_col]), 1),
+            'weak_topics': weak.get(sid, []),
+            'model_version': model.version,
+            'computed_at': computed_at
+        } for i, sid in enumerate(chunk)]
+
+        stmt = dialect_insert(PredictionSnapshot)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['student_id'],
+            set_={name: stmt.excluded[name] for name in rows[0] if name != 'student_id'}
+        )
+        db.session.execute(stmt, rows)
+        PredictionDirty.query.filter(
+            PredictionDirty.student_id.in_(chunk),
+            PredictionDirty.marked_at <= started
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        # Core upserts bypass the ORM flush hooks, so invalidate cached responses here
+        response_cache.bump(chunk)
+
+    return {
+        'refreshed': len(student_ids),
+        'model_version': model.version,
+        'seconds': round((datetime.utcnow() - started).total_seconds(), 3)
+    }
+
+# ============ ACTIVITY ROLLUPS ============
+# Rollup rows read per query while walking back through a streak
+STREAK_PAGE_DAYS = 35
+
+def utc_today() -> date:
+    return datetime.utcnow().date()
+
+def record_activity_rollups(session, events) -> None:
+    """Add (student_id, created_at, activity_type, duration) events to the daily rollups in one upsert"""
+    now = datetime.utcnow()
+    totals: dict[tuple[str, date], list[int]] = {}
+    for student_id, created_at, kind, duration in events:
+        counters = totals.setdefault((str(student_id), (created_at or now).date()), [0, 0, 0, 0])
+        counters[0] += 1
+        counters[1] += int(duration or 0)
+        counters[2] += kind == 'test_completed'
+        counters[3] += kind == 'question_answered'
+    if not totals:
+        return
+    stmt = dialect_insert(StudentDailyActivity)
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=['student_id', 'day'],
+        set_={
+            name: getattr(StudentDailyActivity, name) + getattr(stmt.excluded, name)
+            for name in ('activity_count', 'total_duration', 'tests_completed', 'questions_answered')
+        }
+    ), [{
+        'student_id': student_id,
+        'day': day,
+        'activity_count': count,
+        'total_duration': duration,
+        'tests_completed': tests,
+        'questions_answered': questions
+    } for (student_id, day), (count, duration, tests, questions) in totals.items()])
+
+@event.listens_for(Session, 'before_flush')
+def _record_activity_rollups(session, flush_context, instances) -> None:
+    activities = [obj for obj in session.new if isinstance(obj, StudentActivity) and obj.student_id is not None]
+    if activities:
+        record_activity_rollups(session, [
+            (a.student_id, a.created_at, a.activity_type, a.duration) for a in activities
+        ])
+
+def activity_goals(student_id, day=None) -> dict:
+    """Current streak and this week's goal progress from the student's daily rollups
+    
+    A streak counts consecutive active days ending today, or yesterday while
+    today has no activity yet. Rows are read newest first, one page at a time,
+    so a typical dashboard touches a single page of rollups.
+    """
+    today_date = day or utc_today()
+    week_start = today_date - timedelta(days=today_date.weekday())  # Monday
+    streak, week_seconds, active_today = 0, 0, False
+    expected, streak_open = None, True  # expected: next day the streak needs, walking backwards
+    before = today_date + timedelta(days=1)
+    while True:
+        rows = db.session.query(StudentDailyActivity.day, StudentDailyActivity.total_duration)\
+            .filter(StudentDailyActivity.student_id == str(student_id),
+                    StudentDailyActivity.day < before,
+                    StudentDailyActivity.activity_count > 0)\
+            .order_by(StudentDailyActivity.day.desc())\
+            .limit(STREAK_PAGE_DAYS).all()
+        for row_day, duration in rows:
+            if row_day >= week_start:
+                week_seconds += duration or 0
+            if expected is None:
+                active_today = row_day == today_date
+                expected = today_date if active_today else today_date - timedelta(days=1)
+            if streak_open and row_day == expected:
+                streak += 1
+                expected -= timedelta(days=1)
+            else:
+                streak_open = False  # gap found; later rows only matter for the week total
+        if len(rows) < STREAK_PAGE_DAYS or not streak_open:
+            break
+        before = rows[-1].day
+    
+    goal_minutes = app.config['WEEKLY_GOAL_MINUTES']
+    week_minutes = week_seconds / 60
+    return {
+        'streak_days': streak,
+        'active_today': active_today,
+        'week_minutes': round(week_minutes, 1),
+        'weekly_goal_minutes': goal_minutes,
+        'weekly_goal_progress': min(100, round(week_minutes / goal_minutes * 100)) if goal_minutes > 0 else 0
+    }
+
+def prune_activities(retention_days=None, batch_size=5000) -> int:
+    """Delete raw activities older than the retention window in batches; rollups are kept"""
+    retention_days = app.config['ACTIVITY_RETENTION_DAYS'] if retention_days is None else retention_days
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        ids = [activity_id for (activity_id,) in db.session.query(StudentActivity.id)
+               .filter(StudentActivity.created_at < cutoff)
+               .order_by(StudentActivity.id).limit(batch_size)]
+        if not ids:
+            return deleted
+        # Core delete: no per-row ORM events, and old activities are not in any cached response window
+        db.session.execute(StudentActivity.__table__.delete().where(StudentActivity.id.in_(ids)))
+        db.session.commit()
+        deleted += len(ids)
+
+# ============ PERFORMANCE WRITE BUFFER ============
+class TopicCatalog:
+    """Topic ids, (subject, name) lookups, BKT parameters and the paper topic classifier,
+    cached from the small topics table
+    
+    Reloaded every ttl seconds so fitted parameters and new topics are picked up;
+    a lookup miss forces a reload at most once per second. The classifier is
+    only rebuilt when asked for after the topics' names, synonyms or
+    descriptions actually changed.
+    """
+    
+    def __init__(self, ttl=60.0) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._params: dict[int, BKTParams] = {}
+        self._by_name: dict[tuple[str, str], int] = {}
+        self._terms: tuple[TopicTerms, ...] = ()
+        self._classifier: TopicClassifier | None = None
+        self._loaded_at = None
+    
+    def _reload(self) -> None:
+        params, by_name, terms = {}, {}, []
+        for topic in Topic.query.order_by(Topic.id).all():
+            params[topic.id] = topic.bkt_params()
+            by_name[(topic.subject.lower(), topic.topic_name.lower())] = topic.id
+            terms.append(topic.classifier_terms())
+        with self._lock:
+            self._params, self._by_name, self._terms = params, by_name, tuple(terms)
+            self._loaded_at = time.monotonic()
+    
+    def classifier(self) -> TopicClassifier:
+        self._fresh()
+        terms, classifier = self._terms, self._classifier
+        if classifier is None or tuple(classifier.topics) != terms:
+            classifier = TopicClassifier(terms)
+            self._classifier = classifier
+        return classifier
+    
+    def _fresh(self, miss=False) -> None:
+        loaded_at = self._loaded_at
+        age = time.monotonic() - loaded_at if loaded_at is not None else None
+        if age is None or age >= self.ttl or (miss and age >= 1.0):
+            self._reload()
+    
+    def params(self, topic_id) -> BKTParams | None:
+        self._fresh()
+        found = self._params.get(topic_id)
+        if found is None:
+            self._fresh(miss=True)
+            found = self._params.get(topic_id)
+        return found
+    
+    def topic_id(self, subject, topic_name) -> int | None:
+        key = ((subject or '').lower(), (topic_name or '').lower())
+        self._fresh()
+        found = self._by_name.get(key)
+        if found is None:
+            self._fresh(miss=True)
+            found = self._by_name.get(key)
+        return found
+    
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+topic_catalog = TopicCatalog()
+
+@event.listens_for(Topic, 'after_insert')
+@event.listens_for(Topic, 'after_update')
+@event.listens_for(Topic, 'after_delete')
+def _invalidate_topic_catalog(mapper, connection, target) -> None:
+    # Changes made by this process are visible on the next lookup; other processes catch up within ttl
+    topic_catalog.invalidate()
+
+def topic_exists(topic_id) -> bool:
+    """Topic check served from the catalog cache"""
+    return topic_catalog.params(topic_id) is not None
+
+class KnownStudents:
+    """Bounded cache of student_id values confirmed to exist
+    
+    Lets write paths reject unknown students before anything is queued,
+    with one IN query per batch for ids not seen recently.
+    """
+    
+    def __init__(self, size=100_000) -> None:
+        self.size = size
+        self._lock = threading.Lock()
+        self._ids: OrderedDict[str, None] = OrderedDict()
+    
+    def missing(self, student_ids) -> set[str]:
+        """The ids (as strings) that are not in the users table"""
+        with self._lock:
+            unknown = {str(sid) for sid in student_ids if str(sid) not in self._ids}
+        if not unknown:
+            return set()
+        found = set()
+        ordered = sorted(unknown)
+        for start in range(0, len(ordered), 900):
+            found.update(sid for (sid,) in db.session.query(Student.student_id)
+                         .filter(Student.student_id.in_(ordered[start:start + 900])))
+        with self._lock:
+            for sid in found:
+                self._ids[sid] = None
+            while len(self._ids) > self.size:
+                self._ids.popitem(last=False)
+        return unknown - found
+    
+    def forget(self, student_id) -> None:
+        with self._lock:
+            self._ids.pop(str(student_id), None)
+
+known_students = KnownStudents()
+
+@event.listens_for(Student, 'after_delete')
+def _forget_deleted_student(mapper, connection, target) -> None:
+    known_students.forget(target.student_id)
+
+def student_exists(student_id) -> bool:
+    return not known_students.missing([student_id])
+
+def is_json_id(value) -> bool:
+    """A usable id from a JSON body: a non-empty string or an integer (not a bool, list or object)"""
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, str) and 0 < len(value) <= 50)
+
+def record_topic_answer(student_id, topic_id, correct, minutes) -> StudentPerformance:
+    """Count one answer on a (student, topic) row and advance its BKT mastery in O(1) (caller commits)"""
+    params = topic_catalog.params(topic_id) or DEFAULT_BKT
+    answered_correctly = 1 if correct else 0
+    performance = db.session.scalars(
+        performance_upsert()
+        .values(performance_increment(student_id, topic_id, 1, answered_correctly, minutes, datetime.utcnow()))
+        .returning(StudentPerformance),
+        execution_options={'populate_existing': True}
+    ).one()
+    
+    # RETURNING carries the stored mastery (P(known) x 100) from before this answer
+    prior_answers = performance.questions_attempted - 1
+    previous_mastery = (performance.mastery_score or 0) if prior_answers else 0
+    p_known = previous_mastery / 100 if prior_answers else params.init
+    performance.mastery_score = round(bkt_update(p_known, correct, params) * 100, 2)
+    
+    # Keep the dashboard summary in step (same transaction)
+    bump_student_summary(
+        student_id,
+        topic_count=0 if prior_answers else 1,
+        mastery_total=performance.mastery_score - previous_mastery,
+        questions_attempted=1,
+        questions_correct=answered_correctly,
+        total_time_spent=minutes
+    )
+    mark_prediction_dirty(student_id)
+    return performance
+
+def advance_knowledge(sequences) -> None:
+    """Replay ordered answer outcomes into each row's BKT mastery (rows already upserted and locked)
+    
+    sequences maps (student_id, topic_id) -> [correct, ...] for the answers just counted.
+    """
+    student_ids = sorted({student_id for student_id, _ in sequences})
+    updates = []
+    for start in range(0, len(student_ids), 900):
+        rows = db.session.query(
+            StudentPerformance.id,
+            StudentPerformance.student_id,
+            StudentPerformance.topic_id,
+            StudentPerformance.mastery_score,
+            StudentPerformance.questions_attempted
+        ).filter(StudentPerformance.student_id.in_(student_ids[start:start + 900])).all()
+        for row in rows:
+            outcomes = sequences.get((row.student_id, row.topic_id))
+            if not outcomes:
+                continue
+            params = topic_catalog.params(row.topic_id) or DEFAULT_BKT
+            prior_answers = row.questions_attempted - len(outcomes)
+            p_known = (row.mastery_score or 0) / 100 if prior_answers > 0 else params.init
+            updates.append({'id': row.id, 'mastery_score': round(bkt_replay(p_known, outcomes, params) * 100, 2)})
+    if updates:
+        db.session.execute(update(StudentPerformance), updates)
+
+def flush_performance_writes(increments, activities) -> None:
+    """Apply a coalesced batch of /api/performance/update events in one transaction
+
+    increments maps (student_id, topic_id) -> [attempted, correct, minutes];
+    activities are StudentActivity column dicts in arrival order.
+    """
+    with app.app_context():
+        try:
+            now = datetime.utcnow()
+            db.session.execute(performance_upsert(), [
+                performance_increment(student_id, topic_id, attempted, correct, minutes, now)
+                for (student_id, topic_id), (attempted, correct, minutes) in increments.items()
+            ])
+            
+            # Knowledge tracing is order dependent: replay each key's answers in arrival order
+            sequences: dict[tuple, list[bool]] = {}
+            for activity in sorted(activities, key=lambda a: a['created_at']):
+                metadata = activity['activity_metadata']
+                sequences.setdefault((str(activity['student_id']), metadata['topic_id']), []).append(bool(metadata['correct']))
+            advance_knowledge(sequences)
+            
+            # Re-derive dashboard summaries for the touched students from their performance rows
+            student_ids = sorted({student_id for student_id, _ in increments})
+            for start in range(0, len(student_ids), 900):
+                chunk = student_ids[start:start + 900]
+                existing = {sid for (sid,) in db.session.query(StudentSummary.student_id)
+                            .filter(StudentSummary.student_id.in_(chunk))}
+                totals = db.session.query(
+                    StudentPerformance.student_id,
+                    func.count(StudentPerformance.id),
+                    func.coalesce(func.sum(StudentPerformance.mastery_score), 0.0),
+                    func.coalesce(func.sum(StudentPerformance.questions_attempted), 0),
+                    func.coalesce(func.sum(StudentPerformance.questions_correct), 0),
+                    func.coalesce(func.sum(StudentPerformance.total_time_spent), 0)
+                ).filter(StudentPerformance.student_id.in_(existing))\
+                    .group_by(StudentPerformance.student_id).all() if existing else []
+                if totals:
+                    db.session.execute(update(StudentSummary), [{
+                        'student_id': sid,
+                        'topic_count': topic_count,
+                        'mastery_total': mastery_total,
+                        'questions_attempted': questions_attempted,
+                        'questions_correct': questions_correct,
+                        'total_time_spent': total_time_spent,
+                        'updated_at': now
+                    } for sid, topic_count, mastery_total, questions_attempted, questions_correct, total_time_spent in totals])
+            
+            dirty = dialect_insert(PredictionDirty)
+            db.session.execute(
+                dirty.on_conflict_do_update(index_elements=['student_id'], set_={'marked_at': dirty.excluded.marked_at}),
+                [{'student_id': sid, 'marked_at': now} for sid in student_ids]
+            )
+            
+            # Feature rows first (a backfill must not see this batch), then one executemany insert
+            record_activity_features(db.session, [
+                (a['student_id'], a['created_at'], a['activity_type'], a['activity_metadata']) for a in activities
+            ])
+            record_activity_rollups(db.session, [
+                (a['student_id'], a['created_at'], a['activity_type'], a['duration']) for a in activities
+            ])
+            if activities:
+                db.session.execute(StudentActivity.__table__.insert(), activities)
+                queue_activity_events(db.session, [{
+                    'id': None,
+                    **activity,
+                    'created_at': activity['created_at'].isoformat()
+                } for activity in activities])
+            # Core writes bypass the flush hooks; let the after_commit hook invalidate cached responses
+            db.session.info.setdefault('touched_students', set()).update(student_ids)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+performance_buffer = WriteBuffer(
+    flush_performance_writes,
+    flush_ms=app.config['PERFORMANCE_BUFFER_FLUSH_MS'],
+    max_events=app.config['PERFORMANCE_BUFFER_MAX_EVENTS'],
+    max_lag_ms=app.config['PERFORMANCE_BUFFER_MAX_LAG_MS'],
+    max_depth=app.config['PERFORMANCE_BUFFER_MAX_DEPTH'],
+    # Lost connections and lock/pool timeouts retry the whole batch; other errors isolate the bad keys
+    transient_errors=(OperationalError, PoolTimeoutError)
+) if app.config['PERFORMANCE_BUFFER_ENABLED'] else None
+
+if performance_buffer is not None:
+    atexit.register(performance_buffer.close)
 
 # ============ AUTHENTICATION ROUTES ============
 @app.route('/api/auth/login', methods=['POST'])
@@ -572,6 +2069,7 @@ def logout() -> Response:
 
 # ============ STUDENT DASHBOARD ROUTES ============
 @app.route('/api/dashboard/<student_id>', methods=['GET'])
+@student_cached(vary=lambda student_id: utc_today())  # streaks move at midnight UTC
 def get_dashboard(student_id) -> tuple[Response, Literal[404]] | Response | tuple[Response, Literal[500]]:
     """Get comprehensive dashboard data"""
     try:
@@ -579,20 +2077,15 @@ def get_dashboard(student_id) -> tuple[Response, Literal[404]] | Response | tupl
         if not student:
             return jsonify({'success': False, 'error': 'Student not found'}), 404
         
-        # Get performance data
-        performances = StudentPerformance.query.filter_by(student_id=student_id).all()
+        # Overall stats come from the incrementally maintained summary row
+        summary = load_student_summary(student_id)
+        overall_mastery: float = summary.overall_mastery
+        total_questions: int = summary.questions_attempted
+        correct_answers: int = summary.questions_correct
+        total_time: float = summary.total_time_spent / 60
         
-        # Calculate overall stats
-        if performances:
-            overall_mastery: float = sum(p.mastery_score for p in performances) / len(performances)
-            total_questions: int = sum(p.questions_attempted for p in performances)
-            correct_answers: int = sum(p.questions_correct for p in performances)
-            total_time: float = sum(p.total_time_spent for p in performances) / 60
-        else:
-            overall_mastery = 0
-            total_questions = 0
-            correct_answers = 0
-            total_time = 0
+        # Streak and weekly goal from the daily rollups (a page of rows, not the activity log)
+        goals = activity_goals(student_id)
         
         # Get recent activities
         recent_activities = StudentActivity.query.filter_by(student_id=student_id)\
@@ -601,11 +2094,14 @@ def get_dashboard(student_id) -> tuple[Response, Literal[404]] | Response | tupl
         
         # Get recent tests
         recent_tests = MockTest.query.filter_by(student_id=student_id)\
+            .options(selectinload(MockTest.answer_log))\
             .order_by(MockTest.started_at.desc())\
             .limit(3).all()
         
         # Get weak topics
-        weak_topics: list[Any] = sorted(performances, key=lambda x: x.mastery_score)[:3] if performances else []
+        weak_topics: list[Any] = StudentPerformance.query.filter_by(student_id=student_id)\
+            .order_by(StudentPerformance.mastery_score)\
+            .limit(3).all()
         
         return jsonify({
             'success': True,
@@ -616,8 +2112,8 @@ def get_dashboard(student_id) -> tuple[Response, Literal[404]] | Response | tupl
                     'questions_attempted': total_questions,
                     'accuracy_rate': round(correct_answers/total_questions*100, 1) if total_questions > 0 else 0,
                     'total_study_time': round(total_time, 1),
-                    'streak_days': 7,
-                    'weekly_goal_progress': 65
+                    'streak_days': goals['streak_days'],
+                    'weekly_goal_progress': goals['weekly_goal_progress']
                 },
                 'upcoming_exams': [
                     {
@@ -665,35 +2161,37 @@ def get_dashboard(student_id) -> tuple[Response, Literal[404]] | Response | tupl
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # ============ PERFORMANCE PREDICTION ROUTES ============
+def prediction_stamp(student_id) -> tuple:
+    """Active model version and snapshot time, so snapshots refreshed by refresh_predictions.py
+    (another process) or a model swap are never hidden behind a cached response"""
+    computed_at = db.session.query(PredictionSnapshot.computed_at)\
+        .filter(PredictionSnapshot.student_id == str(student_id)).scalar()
+    return model_registry.get().version, computed_at.isoformat() if computed_at else None
+
 @app.route('/api/performance/predict/<student_id>', methods=['GET'])
+@student_cached(vary=prediction_stamp)
 def predict_performance(student_id) -> tuple[Response, Literal[404]] | Response | tuple[Response, Literal[500]]:
-    """Get performance prediction for student"""
+    """Get performance prediction for student (served from the snapshot table)"""
     try:
-        student = Student.query.get(student_id)
-        if not student:
-            return jsonify({'success': False, 'error': 'Student not found'}), 404
-        
-        # Get student performance data
-        performances = StudentPerformance.query.filter_by(student_id=student_id).all()
-        
-        # Prepare data for prediction
-        student_data = {
-            'engagement_score': 0.7,
-            'average_quiz_score': 75,
-            'average_mastery': sum(p.mastery_score for p in performances) / len(performances) if performances else 60,
-            'consistency_score': 0.8,
-            'total_study_time': sum(p.total_time_spent for p in performances) / 60 if performances else 10
-        }
-        
-        # Get prediction
-        prediction = predictor.predict(student_data)
+        snapshot = db.session.get(PredictionSnapshot, str(student_id))
+        if snapshot is None:
+            student = Student.query.get(student_id)
+            if not student:
+                return jsonify({'success': False, 'error': 'Student not found'}), 404
+            
+            # First request for this student: compute the snapshot now
+            refresh_prediction_snapshots([student_id])
+            snapshot = db.session.get(PredictionSnapshot, str(student_id))
+        elif snapshot.model_version != model_registry.get().version:
+            # Scored by a model that is no longer active: rescore before the cron job gets to it
+            refresh_prediction_snapshots([student_id])
+            db.session.refresh(snapshot)
         
-        # Get weak topics
-        weak_topics: list[Any] = sorted(performances, key=lambda x: x.mastery_score)[:3] if performances else []
+        weak_topics = snapshot.weak_topics or []
         
         # Generate recommendations
         recommendations: list[str] = [
-            f"Focus on {weak_topics[0].topic.topic_name if weak_topics else 'key topics'} for 30 minutes daily",
+            f"Focus on {weak_topics[0]['topic'] if weak_topics else 'key topics'} for 30 minutes daily",
             "Take adaptive mock test on weak topics",
             "Review summarized notes for difficult concepts",
             "Watch concept explanation videos",
@@ -703,15 +2201,11 @@ def predict_performance(student_id) -> tuple[Response, Literal[404]] | Response
         
         return jsonify({
             'success': True,
-            'prediction': prediction,
-            'risk_level': predictor.assess_risk(prediction['predicted_score']),
-            'weak_topics': [{
-                'topic': p.topic.topic_name if p.topic else 'Unknown',
-                'mastery': p.mastery_score,
-                'subject': p.topic.subject if p.topic else 'General',
-                'questions_attempted': p.questions_attempted,
-                'accuracy': round((p.questions_correct / p.questions_attempted * 100), 2) if p.questions_attempted > 0 else 0
-            } for p in weak_topics],
+            'prediction': snapshot.prediction(),
+            'model_version': snapshot.model_version,
+            'computed_at': snapshot.computed_at.isoformat() if snapshot.computed_at else None,
+            'risk_level': snapshot.risk_level,
+            'weak_topics': weak_topics,
             'recommendations': recommendations[:3],
             'improvement_tips': [
                 'Study during peak concentration hours',
@@ -724,52 +2218,149 @@ def predict_performance(student_id) -> tuple[Response, Literal[404]] | Response
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/performance/update', methods=['POST'])
-def update_performance() -> tuple[Response, Literal[400]] | tuple[Response, Literal[404]] | Response | tuple[Response, Literal[500]]:
-    """Update student performance after activity"""
+@app.route('/api/performance/features/<student_id>', methods=['GET'])
+@student_cached
+def get_student_features(student_id) -> Response | tuple[Response, Literal[500]]:
+    """Current predictor inputs derived from the student's activity aggregates"""
     try:
-        data = request.json
-        student_id = data.get('student_id')
+        state = db.session.get(StudentFeatures, str(student_id))
+        if state is None:
+            state = build_student_features(student_id)
+            db.session.add(state)
+            db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'features': state.to_dict()
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/performance/predict/batch', methods=['POST'])
+def predict_performance_batch() -> tuple[Response, Literal[400]] | Response | tuple[Response, Literal[500]]:
+    """Score many students at once (by id list or whole class)"""
+    try:
+        data = request.json or {}
+        student_ids = data.get('student_ids')
+        class_level = data.get('class_level')
+        
+        if class_level and not student_ids:
+            student_ids = [sid for (sid,) in db.session.query(Student.student_id)
+                           .filter(Student.class_level == class_level).all()]
+        if not isinstance(student_ids, list) or not student_ids:
+            return jsonify({'success': False, 'error': 'student_ids list or class_level required'}), 400
+        if len(student_ids) > app.config['PREDICT_BATCH_MAX']:
+            return jsonify({'success': False, 'error': f"At most {app.config['PREDICT_BATCH_MAX']} students per batch"}), 400
+        
+        student_ids = [str(sid) for sid in dict.fromkeys(student_ids)]
+        features = build_feature_matrix(student_ids)
+        mastery_col = PREDICTOR_FEATURES.index('average_mastery')
+        time_col = PREDICTOR_FEATURES.index('total_study_time')
+        
+        model = model_registry.get()
+        scores = model.predict_batch(features)
+        risk = predictor.assess_risk_batch(scores['predicted_score'])
+        
+        predictions = [{
+            'student_id': sid,
+            'predicted_score': float(scores['predicted_score'][i]),
+            'confidence_interval': [float(scores['interval_low'][i]), float(scores['interval_high'][i])],
+            'confidence': float(scores['confidence'][i]),
+            'risk_level': str(risk[i]),
+            'average_mastery': round(float(features[i, mastery_col]), 1),
+            'total_study_time': round(float(features[i, time_col]), 1)
+        } for i, sid in enumerate(student_ids)]
+        
+        levels, counts = np.unique(risk, return_counts=True)
+        risk_summary = {'high': 0, 'medium': 0, 'low': 0}
+        risk_summary.update({str(level): int(count) for level, count in zip(levels, counts)})
+        
+        return jsonify({
+            'success': True,
+            'count': len(predictions),
+            'model_version': model.version,
+            'predictions': predictions,
+            'risk_summary': risk_summary
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/models', methods=['GET'])
+def get_models() -> Response:
+    """List predictor artifacts and the version currently served"""
+    return jsonify({
+        'success': True,
+        'active_version': model_registry.get().version,
+        'versions': model_registry.versions()
+    })
+
+@app.route('/api/models/activate', methods=['POST'])
+def activate_model() -> tuple[Response, Literal[400]] | tuple[Response, Literal[404]] | Response | tuple[Response, Literal[500]]:
+    """Switch the served predictor version without restarting"""
+    try:
+        version = (request.json or {}).get('version')
+        if not version:
+            return jsonify({'success': False, 'error': 'version is required'}), 400
+        model = model_registry.activate(version)
+        return jsonify({'success': True, 'active_version': model.version})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except FileNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/performance/update', methods=['POST'])
+def update_performance() -> tuple[Response, Literal[400]] | tuple[Response, Literal[404]] | tuple[Response, Literal[202]] | Response | tuple[Response, Literal[503]] | tuple[Response, Literal[500]]:
+    """Update student performance after activity"""
+    try:
+        data = request.json
+        student_id = data.get('student_id')
         topic_id = data.get('topic_id')
         correct = data.get('correct', False)
         time_spent = data.get('time_spent', 0)
         
         if not student_id or not topic_id:
             return jsonify({'success': False, 'error': 'Student ID and Topic ID required'}), 400
+        if not is_json_id(student_id) or isinstance(topic_id, bool) or not isinstance(topic_id, int):
+            return jsonify({'success': False, 'error': 'student_id must be a string or integer and topic_id an integer'}), 400
+        if isinstance(time_spent, bool) or not isinstance(time_spent, (int, float)) or time_spent < 0:
+            return jsonify({'success': False, 'error': 'time_spent must be a non-negative number'}), 400
+        if not isinstance(correct, bool):
+            return jsonify({'success': False, 'error': 'correct must be true or false'}), 400
+        student_id, time_spent = str(student_id), int(time_spent)
+        
+        # Checked up front: a bad event must never reach the shared write buffer
+        if not topic_exists(topic_id):
+            return jsonify({'success': False, 'error': 'Topic not found'}), 404
+        if not student_exists(student_id):
+            return jsonify({'success': False, 'error': 'Student not found'}), 404
         
-        # Find or create performance record
-        performance = StudentPerformance.query.filter_by(
-            student_id=student_id,
-            topic_id=topic_id
-        ).first()
-        
-        if not performance:
-            # Get topic first
-            topic = Topic.query.get(topic_id)
-            if not topic:
-                return jsonify({'success': False, 'error': 'Topic not found'}), 404
-            
-            performance = StudentPerformance(
-                student_id=student_id,
-                topic_id=topic_id,
-                mastery_score=50,
-                questions_attempted=0,
-                questions_correct=0,
-                total_time_spent=0
+        if performance_buffer is not None:
+            # Write-behind: coalesce with other pending answers, flushed in bulk
+            depth = performance_buffer.add(
+                (str(student_id), topic_id),
+                (1, 1 if correct else 0, time_spent // 60),
+                row={
+                    'student_id': student_id,
+                    'activity_type': 'question_answered',
+                    'description': f"Answered question on topic {topic_id}",
+                    'activity_metadata': {'topic_id': topic_id, 'correct': correct, 'time_spent': time_spent},
+                    'duration': time_spent,
+                    'created_at': datetime.utcnow()
+                }
             )
-            db.session.add(performance)
-        
-        # Update performance
-        performance.questions_attempted += 1
-        if correct:
-            performance.questions_correct += 1
-        
-        # Calculate new mastery score
-        accuracy: os.Any | int = performance.questions_correct / performance.questions_attempted if performance.questions_attempted > 0 else 0
-        performance.mastery_score = round(accuracy * 100, 2)
+            return jsonify({
+                'success': True,
+                'queued': True,
+                'buffer_depth': depth,
+                'message': 'Performance update queued'
+            }), 202
         
-        # Update time spent
-        performance.total_time_spent += time_spent // 60
+        # One upsert (RETURNING the row) plus an O(1) knowledge-tracing update
+        performance = record_topic_answer(student_id, topic_id, correct, time_spent // 60)
         
         # Record activity
         activity = StudentActivity(
@@ -789,9 +2380,273 @@ def update_performance() -> tuple[Response, Literal[400]] | tuple[Response, Lite
             'message': 'Performance updated successfully'
         })
         
+    except BufferFull as e:
+        return jsonify({'success': False, 'error': f'Too many pending updates, retry shortly ({e})'}), 503
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Longest accepted NDJSON line; anything longer is rejected without being buffered whole
+INGEST_MAX_LINE_BYTES = 64 * 1024
+INGEST_MAX_REPORTED_ERRORS = 100
+
+def parse_answer_event(line) -> tuple[dict | None, str | None]:
+    """Validate one NDJSON answer event; returns (event, None) or (None, error)"""
+    try:
+        event = json.loads(line)
+    except ValueError as e:
+        return None, f'invalid JSON: {e}'
+    if not isinstance(event, dict):
+        return None, 'event must be a JSON object'
+    
+    student_id, topic_id = event.get('student_id'), event.get('topic_id')
+    if not is_json_id(student_id):
+        return None, 'student_id must be a non-empty string or an integer'
+    if not isinstance(topic_id, int) or isinstance(topic_id, bool):
+        return None, 'topic_id must be an integer'
+    if not topic_exists(topic_id):
+        return None, f'unknown topic_id {topic_id}'
+    correct = event.get('correct', False)
+    if not isinstance(correct, bool):
+        return None, 'correct must be true or false'
+    time_spent = event.get('time_spent', 0)
+    if not isinstance(time_spent, int) or isinstance(time_spent, bool) or time_spent < 0:
+        return None, 'time_spent must be a non-negative integer (seconds)'
+    answered_at = event.get('answered_at')
+    if answered_at is not None:
+        try:
+            answered_at = datetime.fromisoformat(str(answered_at).replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            return None, 'answered_at must be an ISO 8601 timestamp'
+    
+    return {
+        'student_id': str(student_id),
+        'topic_id': topic_id,
+        'correct': correct,
+        'time_spent': time_spent,
+        'answered_at': answered_at
+    }, None
+
+@app.route('/api/performance/ingest', methods=['POST'])
+def ingest_answer_events() -> tuple[Response, Literal[400]] | tuple[Response, Literal[413]] | Response:
+    """Bulk-apply newline-delimited JSON answer events, streaming progress per committed batch
+    
+    Each line: {"student_id", "topic_id", "correct", "time_spent", "answered_at"?}.
+    Events are validated as they are read, and their students once per batch; valid
+    ones are applied in transactions of batch_size events (bulk upserts). A batch that
+    fails to commit is reported and skipped, and reading continues with the next one.
+    """
+    max_bytes = app.config['INGEST_MAX_BYTES']
+    if request.content_length is not None and request.content_length > max_bytes:
+        return jsonify({'success': False, 'error': f'Body larger than {max_bytes} bytes'}), 413
+    try:
+        batch_size = max(1, min(int(request.args.get('batch_size', app.config['INGEST_BATCH_SIZE'])), 10000))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'batch_size must be an integer'}), 400
+    
+    # Read wsgi.input directly (the app-wide MAX_CONTENT_LENGTH is sized for file uploads), buffered for readline
+    stream = io.BufferedReader(get_input_stream(request.environ, max_content_length=max_bytes), buffer_size=256 * 1024)
+    
+    def generate():
+        started = time.perf_counter()
+        totals = {'lines': 0, 'accepted': 0, 'rejected': 0, 'failed': 0, 'batches': 0}
+        errors = []
+        pending: list[tuple[int, dict]] = []  # (line number, event)
+        
+        def reject(line_number, error) -> None:
+            totals['rejected'] += 1
+            if len(errors) < INGEST_MAX_REPORTED_ERRORS:
+                errors.append({'line': line_number, 'error': error})
+        
+        def commit_batch():
+            batch = list(pending)
+            pending.clear()
+            # One IN query per batch (cached ids skip it) instead of letting an FK violation fail the batch
+            missing = known_students.missing({event['student_id'] for _, event in batch})
+            increments: dict[tuple, list] = {}
+            activities = []
+            for line_number, event in batch:
+                if event['student_id'] in missing:
+                    reject(line_number, f"unknown student_id {event['student_id']}")
+                    continue
+                counters = increments.setdefault((event['student_id'], event['topic_id']), [0, 0, 0])
+                counters[0] += 1
+                counters[1] += 1 if event['correct'] else 0
+                counters[2] += event['time_spent'] // 60
+                activities.append({
+                    'student_id': event['student_id'],
+                    'activity_type': 'question_answered',
+                    'description': f"Answered question on topic {event['topic_id']}",
+                    'activity_metadata': {'topic_id': event['topic_id'], 'correct': event['correct'],
+                                          'time_spent': event['time_spent'], 'source': 'ingest'},
+                    'duration': event['time_spent'],
+                    'created_at': event['answered_at'] or datetime.utcnow()
+                })
+            
+            totals['batches'] += 1
+            failure = None
+            if activities:
+                try:
+                    flush_performance_writes(increments, activities)
+                    totals['accepted'] += len(activities)
+                except Exception as e:
+                    totals['failed'] += len(activities)
+                    failure = str(e)
+            progress = {
+                'batch': totals['batches'],
+                'events': len(activities),
+                'accepted': totals['accepted'],
+                'rejected': totals['rejected'],
+                'failed': totals['failed'],
+                'last_line': totals['lines'],
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+            }
+            if failure:
+                progress.update(error=failure, first_line=batch[0][0])
+            return json.dumps(progress) + '\n'
+        
+        try:
+            while True:
+                raw = stream.readline(INGEST_MAX_LINE_BYTES + 1)
+                if not raw:
+                    break
+                totals['lines'] += 1
+                if len(raw) > INGEST_MAX_LINE_BYTES and not raw.endswith(b'\n'):
+                    # Skip the rest of an oversized line
+                    while raw and not raw.endswith(b'\n'):
+                        raw = stream.readline(INGEST_MAX_LINE_BYTES)
+                    event, error = None, f'line longer than {INGEST_MAX_LINE_BYTES} bytes'
+                else:
+                    line = raw.decode('utf-8', errors='replace').strip()
+                    if not line:
+                        continue
+                    event, error = parse_answer_event(line)
+                
+                if error:
+                    reject(totals['lines'], error)
+                    continue
+                
+                pending.append((totals['lines'], event))
+                if len(pending) >= batch_size:
+                    yield commit_batch()
+            
+            if pending:
+                yield commit_batch()
+            failure = None
+        except Exception as e:
+            # Reading the body failed (client gone, size limit); committed batches stay
+            failure = str(e)
+        
+        yield json.dumps({
+            'done': True,
+            'success': failure is None and not totals['failed'],
+            'error': failure,
+            **totals,
+            'errors': sorted(errors, key=lambda e: e['line']),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+# ============ ADAPTIVE TEST HELPERS ============
+def adaptive_answer_error(answer, response_time) -> str | None:
+    """Why a submitted (answer, response_time) pair is unusable, or None if it is fine"""
+    if not isinstance(answer, str) or not answer.strip():
+        return 'answer must be a non-empty string'
+    if isinstance(response_time, bool) or not isinstance(response_time, int) or response_time < 0:
+        return 'response_time must be a non-negative integer (seconds)'
+    return None
+
+def apply_adaptive_answer(test, engine, question, answer, response_time) -> dict:
+    """Log one answer, advance the engine and pick the next question (caller commits)
+    
+    answer and response_time must already have passed adaptive_answer_error().
+    """
+    is_correct = answer.strip().upper() == question['correct_answer'].strip().upper()
+    
+    # Append to the answer log (single-row insert)
+    test.answer_count = (test.answer_count or 0) + 1
+    db.session.add(TestAnswer(
+        test_id=test.id,
+        seq=test.answer_count,
+        question_id=question['id'],
+        answer=answer,
+        correct=is_correct,
+        response_time=response_time
+    ))
+    
+    # Knowledge tracing on the question's topic, when it maps to a Topic row
+    topic_id = topic_catalog.topic_id(question.get('subject'), question.get('topic'))
+    if topic_id is not None:
+        record_topic_answer(test.student_id, topic_id, is_correct, response_time // 60)
+    
+    # Update ability estimate and get next difficulty
+    next_difficulty: str | None = engine.record_answer(question, is_correct, response_time, question_pool)
+    
+    # Check if test is complete
+    test_completed: bool = test.answer_count >= 10 or engine.is_converged(test.answer_count)
+    
+    next_question = None
+    if not test_completed:
+        # Get next question (nearest difficulty, unseen first)
+        next_question = engine.select_next(question_pool, test.subject, next_difficulty)
+        
+        if next_question:
+            engine.asked_mask |= question_pool.bit(next_question['id'])
+    
+    # Update ability estimate and pending question in test
+    test.ability_estimate = engine.ability_estimate
+    test.current_question_id = next_question['id'] if next_question else None
+    
+    return {
+        'correct': is_correct,
+        'test_completed': test_completed,
+        'next_question': next_question,
+        'next_difficulty': next_difficulty
+    }
+
+def complete_adaptive_test(test) -> dict:
+    """Score a finished test from its answer log and record the activity (caller commits)"""
+    test.completed_at = datetime.utcnow()
+    
+    # Calculate score from the answer log in one indexed query
+    answered, correct_answers, total_time = db.session.query(
+        func.count(TestAnswer.seq),
+        func.coalesce(func.sum(case((TestAnswer.correct, 1), else_=0)), 0),
+        func.coalesce(func.sum(TestAnswer.response_time), 0)
+    ).filter(TestAnswer.test_id == test.id).one()
+    test.time_taken = int(total_time)
+    test.total_score = (correct_answers / answered) * 100 if answered else 0
+    
+    # Update performance
+    activity = StudentActivity(
+        student_id=test.student_id,
+        activity_type='test_completed',
+        description=f"Completed {test.test_type} test in {test.subject}",
+        activity_metadata={'test_id': test.id, 'score': test.total_score, 'subject': test.subject},
+        duration=test.time_taken
+    )
+    db.session.add(activity)
+    bump_student_summary(test.student_id, tests_completed=1)
+    mark_prediction_dirty(test.student_id)
+    
+    return {
+        'final_score': test.total_score,
+        'correct_answers': int(correct_answers),
+        'total_questions': int(answered),
+        'time_taken': test.time_taken
+    }
+
+def adaptive_progress(step, summary) -> dict:
+    """Response fields describing what comes next after an answer"""
+    if summary:
+        return summary
+    if step['next_question']:
+        return {
+            'next_question': step['next_question'],
+            'next_difficulty': step['next_difficulty'] or step['next_question']['difficulty']
+        }
+    return {}
+
 # ============ ADAPTIVE TEST ROUTES ============
 @app.route('/api/tests/adaptive/start', methods=['POST'])
 def start_adaptive_test() -> tuple[Response, Literal[400]] | Response | tuple[Response, Literal[500]]:
@@ -805,18 +2660,13 @@ def start_adaptive_test() -> tuple[Response, Literal[400]] | Response | tuple[Re
         if not student_id:
             return jsonify({'success': False, 'error': 'Student ID required'}), 400
         
-        # Reset adaptive engine
-        adaptive_engine.reset()
+        # Create test session with its own engine state
+        test_id = str(uuid.uuid4())
+        engine = adaptive_sessions.create(test_id, test_type)
         
         # Get first question based on subject and initial difficulty
-        first_question = Question.query.filter_by(
-            subject=subject,
-            difficulty='medium'
-        ).first()
-        
-        if not first_question:
-            # Fallback to any question in subject
-            first_question = Question.query.filter_by(subject=subject).first()
+        # (falls back to any difficulty in the subject)
+        first_question = engine.select_next(question_pool, subject, 'medium')
             
         if not first_question:
             # Create a mock question
@@ -831,14 +2681,17 @@ def start_adaptive_test() -> tuple[Response, Literal[400]] | Response | tuple[Re
             )
             db.session.add(first_question)
             db.session.flush()
+            first_question = first_question.to_dict()
+        
+        engine.asked_mask |= question_pool.bit(first_question['id'])
         
-        # Create test session
         test = MockTest(
+            id=test_id,
             student_id=student_id,
             subject=subject,
             test_type=test_type,
-            questions=[first_question.to_dict()],
-            ability_estimate=adaptive_engine.ability_estimate
+            current_question_id=first_question['id'],
+            ability_estimate=engine.ability_estimate
         )
         db.session.add(test)
         
@@ -857,10 +2710,10 @@ def start_adaptive_test() -> tuple[Response, Literal[400]] | Response | tuple[Re
         return jsonify({
             'success': True,
             'test_id': test.id,
-            'question': first_question.to_dict(),
+            'question': first_question,
             'question_number': 1,
             'total_questions': 10,
-            'ability_estimate': adaptive_engine.ability_estimate,
+            'ability_estimate': engine.ability_estimate,
             'time_limit': 600
         })
         
@@ -868,7 +2721,7 @@ def start_adaptive_test() -> tuple[Response, Literal[400]] | Response | tuple[Re
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/tests/adaptive/submit', methods=['POST'])
-def submit_adaptive_answer() -> tuple[Response, Literal[400]] | tuple[Response, Literal[404]] | Response | tuple[Response, Literal[500]]:
+def submit_adaptive_answer() -> tuple[Response, Literal[400]] | tuple[Response, Literal[404]] | tuple[Response, Literal[409]] | Response | tuple[Response, Literal[500]]:
     """Submit answer and get next question"""
     try:
         data = request.json
@@ -879,156 +2732,608 @@ def submit_adaptive_answer() -> tuple[Response, Literal[400]] | tuple[Response,
         
         if not test_id or not answer or not question_id:
             return jsonify({'success': False, 'error': 'Missing required fields'}), 400
-        
-        test = MockTest.query.get(test_id)
-        if not test:
-            return jsonify({'success': False, 'error': 'Test not found'}), 404
-        
-        # Get current question
-        question = Question.query.get(question_id)
-        if not question:
-            return jsonify({'success': False, 'error': 'Question not found'}), 404
-        
-        # Determine if answer was correct
-        is_correct = answer.strip().upper() == question.correct_answer.strip().upper()
-        
-        # Update test record
-        if not test.answers:
-            test.answers = []
-        if not test.questions:
-            test.questions = []
-        
-        test.answers.append({
-            'question_id': question_id,
-            'answer': answer,
-            'correct': is_correct,
-            'response_time': response_time
-        })
-        
-        # Update ability estimate and get next difficulty
-        next_difficulty: str = adaptive_engine.get_next_difficulty(is_correct, response_time)
-        
-        # Check if test is complete
-        questions_completed: int = len(test.answers)
-        test_completed: bool = questions_completed >= 10
-        
-        next_question = None
-        if not test_completed:
-            # Get next question
-            next_question = Question.query.filter_by(
-                subject=test.subject,
-                difficulty=next_difficulty
-            ).first()
+        error = adaptive_answer_error(answer, response_time)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        
+        with adaptive_sessions.answering(test_id):
+            test = MockTest.query.get(test_id)
+            if not test:
+                return jsonify({'success': False, 'error': 'Test not found'}), 404
+            if test.completed_at:
+                return jsonify({'success': False, 'error': 'Test already completed'}), 409
             
-            # If no question at that difficulty, get closest
-            if not next_question:
-                difficulties: list[str] = ['easy', 'medium', 'hard']
-                current_idx: int = difficulties.index(next_difficulty) if next_difficulty in difficulties else 1
-                
-                # Try adjacent difficulties
-                for offset in [0, 1, -1, 2, -2]:
-                    idx = current_idx + offset
-                    if 0 <= idx < len(difficulties):
-                        next_question = Question.query.filter_by(
-                            subject=test.subject,
-                            difficulty=difficulties[idx]
-                        ).first()
-                        if next_question:
-                            break
+            # Per-test engine state (rehydrated from the row before this answer is applied)
+            engine = adaptive_sessions.get(test)
             
-            if next_question:
-                test.questions.append(next_question.to_dict())
-        
-        # Update ability estimate in test
-        test.ability_estimate = adaptive_engine.ability_estimate
-        
-        if test_completed:
-            test.completed_at = datetime.utcnow()
-            test.time_taken = sum(a.get('response_time', 0) for a in test.answers)
+            # Get current question
+            question = question_pool.get(question_id)
+            if not question:
+                return jsonify({'success': False, 'error': 'Question not found'}), 404
             
-            # Calculate score
-            correct_answers: int = sum(1 for a in test.answers if a.get('correct', False))
-            test.total_score = (correct_answers / len(test.answers)) * 100 if test.answers else 0
+            step = apply_adaptive_answer(test, engine, question, answer, response_time)
+            summary = complete_adaptive_test(test) if step['test_completed'] else None
             
-            # Update performance
-            activity = StudentActivity(
-                student_id=test.student_id,
-                activity_type='test_completed',
-                description=f"Completed {test.test_type} test in {test.subject}",
-                activity_metadata={'test_id': test.id, 'score': test.total_score, 'subject': test.subject},
-                duration=test.time_taken
-            )
-            db.session.add(activity)
-        
-        db.session.commit()
-        
-        response_data = {
-            'success': True,
-            'correct': is_correct,
-            'explanation': question.explanation,
-            'ability_estimate': adaptive_engine.ability_estimate,
-            'questions_completed': questions_completed,
-            'test_completed': test_completed
-        }
-        
-        if not test_completed and next_question:
-            response_data['next_question'] = next_question.to_dict()
-            response_data['next_difficulty'] = next_difficulty
-        elif test_completed:
-            response_data['final_score'] = test.total_score
-            response_data['correct_answers'] = correct_answers
-            response_data['total_questions'] = len(test.answers)
-            response_data['time_taken'] = test.time_taken
+            db.session.commit()
+            
+            if summary:
+                adaptive_sessions.discard(test.id)
+            
+            response_data = {
+                'success': True,
+                'correct': step['correct'],
+                'explanation': question['explanation'],
+                'ability_estimate': engine.ability_estimate,
+                'questions_completed': test.answer_count,
+                'test_completed': step['test_completed']
+            }
+            response_data.update(adaptive_progress(step, summary))
+            
+        return jsonify(response_data)
         
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/tests/adaptive/submit-batch', methods=['POST'])
+def submit_adaptive_batch() -> tuple[Response, Literal[400]] | tuple[Response, Literal[404]] | tuple[Response, Literal[409]] | Response | tuple[Response, Literal[500]]:
+    """Submit several answers in order and get the next question"""
+    try:
+        data = request.json
+        test_id = data.get('test_id')
+        answers = data.get('answers')
+        
+        if not test_id or not isinstance(answers, list) or not answers:
+            return jsonify({'success': False, 'error': 'test_id and a non-empty answers list are required'}), 400
+        if len(answers) > app.config['ADAPTIVE_BATCH_MAX']:
+            return jsonify({'success': False, 'error': f"At most {app.config['ADAPTIVE_BATCH_MAX']} answers per batch"}), 400
+        
+        # Validate the whole batch before touching engine state
+        items = []
+        for item in answers:
+            if not isinstance(item, dict) or not item.get('answer') or not item.get('question_id'):
+                return jsonify({'success': False, 'error': 'Each answer needs question_id and answer'}), 400
+            error = adaptive_answer_error(item['answer'], item.get('response_time', 30))
+            if error:
+                return jsonify({'success': False, 'error': f"{error} (question {item['question_id']})"}), 400
+            question = question_pool.get(item['question_id'])
+            if not question:
+                return jsonify({'success': False, 'error': f"Question not found: {item['question_id']}"}), 404
+            items.append((question, item['answer'], item.get('response_time', 30)))
+        
+        with adaptive_sessions.answering(test_id):
+            test = MockTest.query.get(test_id)
+            if not test:
+                return jsonify({'success': False, 'error': 'Test not found'}), 404
+            if test.completed_at:
+                return jsonify({'success': False, 'error': 'Test already completed'}), 409
+            
+            engine = adaptive_sessions.get(test)
+            
+            # Replay answers through the engine; anything after completion is ignored
+            results = []
+            step = None
+            for question, answer, response_time in items:
+                step = apply_adaptive_answer(test, engine, question, answer, response_time)
+                results.append({
+                    'question_id': question['id'],
+                    'correct': step['correct'],
+                    'explanation': question['explanation']
+                })
+                if step['test_completed']:
+                    break
+            
+            summary = complete_adaptive_test(test) if step['test_completed'] else None
+            
+            db.session.commit()
+            
+            if summary:
+                adaptive_sessions.discard(test.id)
+            
+            response_data = {
+                'success': True,
+                'results': results,
+                'accepted': len(results),
+                'ability_estimate': engine.ability_estimate,
+                'questions_completed': test.answer_count,
+                'test_completed': step['test_completed']
+            }
+            response_data.update(adaptive_progress(step, summary))
+            
         return jsonify(response_data)
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/tests/history/<student_id>', methods=['GET'])
-def get_test_history(student_id) -> Response | tuple[Response, Literal[500]]:
-    """Get test history for student"""
+@student_cached
+def get_test_history(student_id) -> Response | tuple[Response, Literal[400]] | tuple[Response, Literal[500]]:
+    """Get test history for student (newest first, paged with ?cursor=)"""
     try:
-        tests = MockTest.query.filter_by(student_id=student_id)\
-            .order_by(MockTest.started_at.desc())\
-            .limit(20).all()
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+        query = MockTest.query.filter_by(student_id=student_id)\
+            .options(selectinload(MockTest.answer_log))
+        tests, next_cursor = keyset_page(
+            query, MockTest.started_at, MockTest.id, request.args.get('cursor'), limit
+        )
         
         return jsonify({
             'success': True,
-            'tests': [test.to_dict() for test in tests]
+            'tests': [test.to_dict() for test in tests],
+            'next_cursor': next_cursor
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# ============ PAPER ANALYSIS HELPERS ============
+paper_extractor = PdfExtractor(
+    workers=app.config['PDF_WORKERS'],
+    page_timeout=app.config['PDF_PAGE_TIMEOUT'],
+    max_pages=app.config['PDF_MAX_PAGES'],
+    memory_mb=app.config['PDF_MEMORY_MB']
+)
+
+# Numbered question starts: "1.", "12)", "Q3.", "Question 4:"
+QUESTION_START = re.compile(r'^\s*(?:Q(?:uestion)?\s*\.?\s*)?\d{1,3}\s*[.):]\s+\S', re.IGNORECASE | re.MULTILINE)
+
+class PaperTextStats:
+    """Running counts over a paper's text, fed one page at a time so no page is kept"""
+    
+    def __init__(self, classifier) -> None:
+        self.scan = classifier.scan()
+        self.characters = 0
+        self.questions = 0
+        self.question_marks = 0
+    
+    def add_page(self, text) -> None:
+        self.characters += len(text)
+        self.questions += len(QUESTION_START.findall(text))
+        self.question_marks += text.count('?')
+        self.scan.feed(text)
+    
+    def subject(self, default) -> str:
+        return self.scan.subject(default)
+    
+    def estimated_questions(self) -> int:
+        return self.questions or self.question_marks
+    
+    def topic_distribution(self) -> dict[str, float]:
+        return topic_distribution(self.scan)
+
+def topic_distribution(scan) -> dict[str, float]:
+    """Classifier weights keyed the way analyses name topics, e.g. Chemistry_Organic_Chemistry"""
+    distribution: dict[str, float] = {}
+    for topic, weight in scan.topic_weights().items():
+        # Topics sharing a subject and name share a key
+        key = f"{topic.subject}_{topic.name.replace(' ', '_')}"
+        distribution[key] = round(distribution.get(key, 0.0) + weight, 1)
+    return distribution
+
+def content_digest(kind):
+    """SHA-256 seeded with the content kind, so a PDF and a pasted text never share an entry"""
+    return hashlib.sha256(f'{kind}\0'.encode())
+
+def normalize_paper_text(text) -> str:
+    """Unicode-normalized, case-folded text with whitespace runs collapsed"""
+    return ' '.join(unicodedata.normalize('NFKC', text).split()).casefold()
+
+def save_upload(file) -> tuple[str, str]:
+    """Stream an upload into UPLOAD_FOLDER, hashing as it goes; returns (stored_filename, content_hash)
+    
+    Files are stored under their hash, so repeat uploads of a paper share one copy.
+    """
+    kind = file.filename.rsplit('.', 1)[1].lower()
+    digest = content_digest(kind)
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    partial = os.path.join(app.config['UPLOAD_FOLDER'], f'.{uuid.uuid4().hex}.part')
+    with open(partial, 'wb') as out:
+        while True:
+            chunk = file.stream.read(64 * 1024)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+    content_hash = digest.hexdigest()
+    stored_name = f'{content_hash}.{kind}'
+    # Same name means same bytes, so replacing an existing copy is harmless
+    os.replace(partial, os.path.join(app.config['UPLOAD_FOLDER'], stored_name))
+    return stored_name, content_hash
+
+def analysis_key(content_hash) -> str:
+    """Content store key: the paper's hash combined with the current topic classifier,
+    so editing topics never serves a classification made with the old ones"""
+    signature = topic_catalog.classifier().signature
+    return hashlib.sha256(f'{content_hash}:{signature}'.encode()).hexdigest()
+
+def store_analysis_content(content_hash, kind, analysis) -> None:
+    """Add an analysis to the content store (first writer wins; caller commits)"""
+    db.session.execute(
+        dialect_insert(AnalysisContent).values(
+            content_hash=content_hash,
+            kind=kind,
+            subject=analysis['metadata']['subject'],
+            analysis_data=analysis,
+            created_at=datetime.utcnow()
+        ).on_conflict_do_nothing(index_elements=['content_hash'])
+    )
+
+def demo_paper_analysis() -> dict:
+    """Placeholder analysis blocks (difficulty, recommendations, plan) until they are derived from the paper"""
+    return {
+        'metadata': {
+            'subject': 'Physics',
+            'total_questions_estimated': 50,
+            'analysis_timestamp': datetime.utcnow().isoformat(),
+            'paper_difficulty_overall': 'Medium'
+        },
+        'topic_distribution': {
+            'Physics_Thermodynamics': 30.0,
+            'Physics_Optics': 25.0,
+            'Physics_Mechanics': 25.0,
+            'Physics_Modern_Physics': 20.0
+        },
+        'difficulty_analysis': {
+            'easy': 40.0,
+            'medium': 40.0,
+            'hard': 20.0,
+            'unknown': 0.0
+        },
+        'score_prediction': {
+            'expected_score': 75.0,
+            'score_range': [68.0, 82.0],
+            'confidence': 0.85
+        },
+        'recommendations': [
+            {
+                'topic': 'Thermodynamics',
+                'subject': 'Physics',
+                'weight_in_paper': 30.0,
+                'current_mastery': 65.0,
+                'priority': 'high',
+                'recommended_time': '2 hours',
+                'resources': [
+                    'Video: Thermodynamics concepts explained',
+                    'Notes: Thermodynamics formula sheet',
+                    'Practice: 10 problems on Thermodynamics'
+                ],
+                'action_items': [
+                    'Watch 20-minute video on Thermodynamics',
+                    'Solve 5 basic problems on Thermodynamics',
+                    'Create summary notes for Thermodynamics'
+                ]
+            }
+        ],
+        'key_insights': [
+            'Most important topic: Physics_Thermodynamics (30.0% weightage)',
+            'Paper has mostly easy to moderate difficulty questions',
+            'Focus on 1 high-priority topics for maximum improvement'
+        ],
+        'study_plan': {
+            'total_days': 7,
+            'daily_target': '2-3 hours',
+            'schedule': [
+                {
+                    'day': 'Day 1-2',
+                    'focus': 'High Priority Topics',
+                    'topics': ['Thermodynamics'],
+                    'activities': ['Concept learning', 'Basic practice', 'Note making']
+                },
+                {
+                    'day': 'Day 3-4',
+                    'focus': 'Medium Priority Topics',
+                    'topics': ['Optics', 'Mechanics'],
+                    'activities': ['Problem solving', 'Previous year questions', 'Revision']
+                },
+                {
+                    'day': 'Day 5',
+                    'focus': 'Mixed Practice',
+                    'topics': ['All weak topics'],
+                    'activities': ['Mock test', 'Time-bound practice', 'Error analysis']
+                },
+                {
+                    'day': 'Day 6',
+                    'focus': 'Low Priority Topics',
+                    'topics': ['Modern Physics'],
+                    'activities': ['Quick revision', 'Formula review', 'Important questions']
+                },
+                {
+                    'day': 'Day 7',
+                    'focus': 'Final Revision',
+                    'topics': ['All important topics'],
+                    'activities': ['Complete paper solving', 'Time management practice', 'Relaxation']
+                }
+            ]
+        }
+    }
+
+def extract_paper_analysis(path, subject_hint=None):
+    """Extract an uploaded paper page by page, yielding progress dicts; returns the analysis
+    
+    Page text is folded into PaperTextStats as it arrives and then dropped,
+    so memory stays flat however long the paper is.
+    """
+    extraction = paper_extractor.extract(path)
+    stats = PaperTextStats(topic_catalog.classifier())
+    for page in extraction:
+        if page.text:
+            stats.add_page(page.text)
+        progress = {'page': page.number, 'pages': extraction.page_count}
+        if page.error:
+            progress['error'] = page.error
+        yield progress
+    
+    analysis = demo_paper_analysis()
+    distribution = stats.topic_distribution()
+    analysis['metadata'].update({
+        'subject': stats.subject(subject_hint or analysis['metadata']['subject']),
+        'total_questions_estimated': stats.estimated_questions(),
+        'analysis_timestamp': datetime.utcnow().isoformat()
+    })
+    analysis['topic_distribution'] = distribution
+    analysis['unclassified'] = not distribution
+    if distribution:
+        top_topic, top_weight = next(iter(distribution.items()))
+        analysis['key_insights'][0] = f'Most important topic: {top_topic} ({top_weight}% weightage)'
+    else:
+        analysis['key_insights'][0] = 'No known topics were recognised in this paper'
+    analysis['extraction'] = {**extraction.summary(), 'characters': stats.characters}
+    return analysis
+
+def save_paper_analysis(analysis, stored_filename, filename, student_id=None, content_hash=None) -> PaperAnalysis:
+    """Persist an analysis and the student's activity (caller commits)
+    
+    With content_hash the row only references the shared content store entry.
+    """
+    paper_analysis = PaperAnalysis(
+        student_id=student_id,
+        filename=stored_filename,
+        original_filename=filename,
+        subject=analysis['metadata']['subject'],
+        analysis_data=None if content_hash else analysis,
+        content_hash=content_hash
+    )
+    db.session.add(paper_analysis)
+    
+    # Record activity
+    if student_id:
+        activity = StudentActivity(
+            student_id=student_id,
+            activity_type='paper_analyzed',
+            description=f"Analyzed paper: {filename}",
+            activity_metadata={
+                'filename': filename,
+                'subject': analysis['metadata']['subject'],
+                'predicted_score': analysis['score_prediction']['expected_score']
+            },
+            duration=60
+        )
+        db.session.add(activity)
+    return paper_analysis
+
+# ============ PAPER ANALYSIS JOBS ============
+# Progress is written at most this often while a job runs (also its liveness heartbeat)
+PAPER_JOB_PROGRESS_SECONDS = 1.0
+
+def claim_paper_job() -> str | None:
+    """Atomically move the oldest queued job that is due to running; returns its id"""
+    with app.app_context():
+        now = datetime.utcnow()
+        candidates = [job_id for (job_id,) in db.session.query(PaperJob.id)
+                      .filter(PaperJob.status == 'queued',
+                              or_(PaperJob.available_at.is_(None), PaperJob.available_at <= now))
+                      .order_by(PaperJob.created_at).limit(5)]
+        for job_id in candidates:
+            # Conditional update: another worker (or process) may have taken it first
+            claimed = PaperJob.query.filter_by(id=job_id, status='queued').update({
+                PaperJob.status: 'running',
+                PaperJob.attempts: PaperJob.attempts + 1,
+                PaperJob.started_at: now,
+                PaperJob.heartbeat_at: now
+            }, synchronize_session=False)
+            db.session.commit()
+            if claimed:
+                return job_id
+        return None
+
+def extract_job_analysis(job) -> dict:
+    """Run extraction for a job, recording page progress; returns the analysis"""
+    steps = extract_paper_analysis(os.path.join(app.config['UPLOAD_FOLDER'], job.stored_filename),
+                                   job.subject_hint)
+    last_saved = time.monotonic()
+    while True:
+        try:
+            progress = next(steps)
+        except StopIteration as finished:
+            return finished.value
+        job.pages_done, job.page_count = progress['page'], progress['pages']
+        if time.monotonic() - last_saved >= PAPER_JOB_PROGRESS_SECONDS:
+            job.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+            last_saved = time.monotonic()
+
+def run_paper_job(job_id) -> None:
+    """Extract and analyze one claimed job, saving the analysis and the job outcome together"""
+    with app.app_context():
+        job = db.session.get(PaperJob, job_id)
+        if job is None:
+            return
+        try:
+            # An identical paper queued earlier may have been analyzed meanwhile
+            key = analysis_key(job.content_hash) if job.content_hash else None
+            content = db.session.get(AnalysisContent, key) if key else None
+            if content is not None:
+                analysis = content.analysis_data
+            else:
+                analysis = extract_job_analysis(job)
+                if key:
+                    store_analysis_content(key, job.stored_filename.rsplit('.', 1)[-1], analysis)
+            
+            paper_analysis = save_paper_analysis(analysis, job.stored_filename, job.filename, job.student_id, key)
+            db.session.flush()
+            job.status = 'done'
+            job.analysis_id = paper_analysis.id
+            job.finished_at = job.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+        except ExtractorBusy:
+            # Extraction slots are shared with other work: back off, and don't count this
+            # towards PAPER_JOB_MAX_ATTEMPTS since the paper itself never got a turn
+            db.session.rollback()
+            job.status = 'queued'
+            job.attempts = max((job.attempts or 1) - 1, 0)
+            job.available_at = datetime.utcnow() + timedelta(seconds=app.config['PAPER_JOB_BUSY_RETRY_SECONDS'])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            job.status = 'failed'
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            raise
+
+def requeue_stale_paper_jobs() -> int:
+    """Requeue running jobs whose worker stopped heartbeating (crash/restart), failing repeat offenders"""
+    with app.app_context():
+        cutoff = datetime.utcnow() - timedelta(seconds=app.config['PAPER_JOB_STALE_SECONDS'])
+        stale = PaperJob.query.filter(PaperJob.status == 'running', PaperJob.heartbeat_at < cutoff).all()
+        for job in stale:
+            if (job.attempts or 0) >= app.config['PAPER_JOB_MAX_ATTEMPTS']:
+                job.status = 'failed'
+                job.error = f'Abandoned after {job.attempts} attempts'
+                job.finished_at = datetime.utcnow()
+            else:
+                job.status = 'queued'
+        db.session.commit()
+        return len(stale)
+
+paper_jobs = JobRunner(
+    claim_paper_job,
+    run_paper_job,
+    workers=app.config['PAPER_JOB_WORKERS'],
+    recover_fn=requeue_stale_paper_jobs,
+    recover_seconds=app.config['PAPER_JOB_STALE_SECONDS'] / 2
+)
+
 # ============ PAPER ANALYSIS ROUTES ============
 @app.route('/api/papers/upload', methods=['POST'])
-def upload_and_analyze_paper() -> tuple[Response, Literal[400]] | Response | tuple[Response, Literal[500]]:
-    """Upload and analyze question paper"""
+def upload_and_analyze_paper() -> tuple[Response, Literal[400]] | Response | tuple[Response, Literal[202]] | tuple[Response, Literal[500]]:
+    """Upload a question paper and queue it for analysis; poll /api/papers/jobs/<job_id>"""
     try:
         if 'file' not in request.files:
             return jsonify({'success': False, 'error': 'No file provided'}), 400
         
         file: FileStorage = request.files['file']
         student_id: str | None = request.form.get('student_id')
+        subject_hint: str | None = request.form.get('subject')
         
         if file.filename == '':
             return jsonify({'success': False, 'error': 'No file selected'}), 400
         
-        if file and allowed_file(file.filename):
-            # For demo, just analyze without actual PDF parsing
+        if not (file and allowed_file(file.filename)):
+            return jsonify({'success': False, 'error': 'Invalid file type. Only PDF files are allowed.'}), 400
+        
+        # Workers read the upload from disk; the job row makes the work survive restarts
+        stored_name, content_hash = save_upload(file)
+        job = PaperJob(
+            student_id=student_id,
+            filename=file.filename,
+            stored_filename=stored_name,
+            subject_hint=subject_hint,
+            content_hash=content_hash
+        )
+        db.session.add(job)
+        
+        # Seen this paper before: only a reference row for this student, no job to run
+        key = analysis_key(content_hash)
+        content = db.session.get(AnalysisContent, key)
+        if content is not None:
+            paper_analysis = save_paper_analysis(content.analysis_data, stored_name, file.filename,
+                                                 student_id, key)
+            db.session.flush()
+            job.status = 'done'
+            job.analysis_id = paper_analysis.id
+            job.started_at = job.finished_at = datetime.utcnow()
+            db.session.commit()
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': f'/api/papers/jobs/{job.id}',
+                'analysis_id': paper_analysis.id,
+                'analysis': content.analysis_data,
+                'cached': True,
+                'message': 'Paper analyzed successfully'
+            })
+        
+        db.session.commit()
+        paper_jobs.notify()
+        
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': f'/api/papers/jobs/{job.id}',
+            'cached': False,
+            'message': 'Paper queued for analysis'
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/papers/jobs/<job_id>', methods=['GET'])
+def get_paper_job(job_id) -> tuple[Response, Literal[404]] | Response | tuple[Response, Literal[500]]:
+    """Status and progress of a paper analysis job; includes the analysis once done"""
+    try:
+        job = db.session.get(PaperJob, job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        
+        result = {'success': True, 'job': job.to_dict()}
+        if job.status == 'done' and job.analysis_id:
+            paper_analysis = db.session.get(PaperAnalysis, job.analysis_id)
+            result['analysis'] = paper_analysis.analysis if paper_analysis else None
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/papers/quick-analyze', methods=['POST'])
+def quick_analyze_paper() -> tuple[Response, Literal[400]] | Response | tuple[Response, Literal[500]]:
+    """Analyze paper from text content"""
+    try:
+        data = request.json
+        paper_text = data.get('paper_text', '')
+        student_id = data.get('student_id')
+        
+        if not paper_text:
+            return jsonify({'success': False, 'error': 'No paper text provided'}), 400
+        
+        # Repeat texts (after normalization) are served from the content store
+        normalized = normalize_paper_text(paper_text)
+        digest = content_digest('text')
+        digest.update(normalized.encode())
+        content_hash = analysis_key(digest.hexdigest())
+        content = db.session.get(AnalysisContent, content_hash)
+        
+        if content is not None:
+            analysis = content.analysis_data
+            subject = content.subject
+        else:
+            # Classify the normalized text, so every text sharing this hash gets the same analysis
+            scan = topic_catalog.classifier().scan(normalized)
+            subject: str = scan.subject('General')
+            distribution = topic_distribution(scan)
+            
             analysis = {
                 'metadata': {
-                    'subject': 'Physics',
-                    'total_questions_estimated': 50,
+                    'subject': subject,
+                    'total_questions_estimated': normalized.count('?') or 10,
                     'analysis_timestamp': datetime.utcnow().isoformat(),
                     'paper_difficulty_overall': 'Medium'
                 },
-                'topic_distribution': {
-                    'Physics_Thermodynamics': 30.0,
-                    'Physics_Optics': 25.0,
-                    'Physics_Mechanics': 25.0,
-                    'Physics_Modern_Physics': 20.0
-                },
+                'topic_distribution': distribution,
+                'unclassified': not distribution,
                 'difficulty_analysis': {
                     'easy': 40.0,
                     'medium': 40.0,
@@ -1050,156 +3355,17 @@ def upload_and_analyze_paper() -> tuple[Response, Literal[400]] | Response | tup
                         'recommended_time': '2 hours',
                         'resources': [
                             'Video: Thermodynamics concepts explained',
-                            'Notes: Thermodynamics formula sheet',
-                            'Practice: 10 problems on Thermodynamics'
+                            'Notes: Thermodynamics formula sheet'
                         ],
                         'action_items': [
                             'Watch 20-minute video on Thermodynamics',
-                            'Solve 5 basic problems on Thermodynamics',
-                            'Create summary notes for Thermodynamics'
+                            'Solve 5 basic problems on Thermodynamics'
                         ]
                     }
-                ],
-                'key_insights': [
-                    'Most important topic: Physics_Thermodynamics (30.0% weightage)',
-                    'Paper has mostly easy to moderate difficulty questions',
-                    'Focus on 1 high-priority topics for maximum improvement'
-                ],
-                'study_plan': {
-                    'total_days': 7,
-                    'daily_target': '2-3 hours',
-                    'schedule': [
-                        {
-                            'day': 'Day 1-2',
-                            'focus': 'High Priority Topics',
-                            'topics': ['Thermodynamics'],
-                            'activities': ['Concept learning', 'Basic practice', 'Note making']
-                        },
-                        {
-                            'day': 'Day 3-4',
-                            'focus': 'Medium Priority Topics',
-                            'topics': ['Optics', 'Mechanics'],
-                            'activities': ['Problem solving', 'Previous year questions', 'Revision']
-                        },
-                        {
-                            'day': 'Day 5',
-                            'focus': 'Mixed Practice',
-                            'topics': ['All weak topics'],
-                            'activities': ['Mock test', 'Time-bound practice', 'Error analysis']
-                        },
-                        {
-                            'day': 'Day 6',
-                            'focus': 'Low Priority Topics',
-                            'topics': ['Modern Physics'],
-                            'activities': ['Quick revision', 'Formula review', 'Important questions']
-                        },
-                        {
-                            'day': 'Day 7',
-                            'focus': 'Final Revision',
-                            'topics': ['All important topics'],
-                            'activities': ['Complete paper solving', 'Time management practice', 'Relaxation']
-                        }
-                    ]
-                }
+                ]
             }
-            
-            # Save analysis to database
-            paper_analysis = PaperAnalysis(
-                student_id=student_id,
-                filename=file.filename,
-                original_filename=file.filename,
-                subject=analysis['metadata']['subject'],
-                analysis_data=analysis
-            )
-            db.session.add(paper_analysis)
-            
-            # Record activity
-            if student_id:
-                activity = StudentActivity(
-                    student_id=student_id,
-                    activity_type='paper_analyzed',
-                    description=f"Analyzed paper: {file.filename}",
-                    activity_metadata={
-                        'filename': file.filename,
-                        'subject': analysis['metadata']['subject'],
-                        'predicted_score': analysis['score_prediction']['expected_score']
-                    },
-                    duration=60
-                )
-                db.session.add(activity)
-            
-            db.session.commit()
-            
-            return jsonify({
-                'success': True,
-                'analysis_id': paper_analysis.id,
-                'filename': file.filename,
-                'analysis': analysis,
-                'message': 'Paper analyzed successfully'
-            })
         
-        return jsonify({'success': False, 'error': 'Invalid file type. Only PDF files are allowed.'}), 400
-        
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
-
-@app.route('/api/papers/quick-analyze', methods=['POST'])
-def quick_analyze_paper() -> tuple[Response, Literal[400]] | Response | tuple[Response, Literal[500]]:
-    """Analyze paper from text content"""
-    try:
-        data = request.json
-        paper_text = data.get('paper_text', '')
-        student_id = data.get('student_id')
-        
-        if not paper_text:
-            return jsonify({'success': False, 'error': 'No paper text provided'}), 400
-        
-        # Simple analysis based on text
-        subject: str = 'Physics' if 'physics' in paper_text.lower() else 'Mathematics' if 'mathematics' in paper_text.lower() else 'General'
-        
-        analysis = {
-            'metadata': {
-                'subject': subject,
-                'total_questions_estimated': paper_text.count('?') or 10,
-                'analysis_timestamp': datetime.utcnow().isoformat(),
-                'paper_difficulty_overall': 'Medium'
-            },
-            'topic_distribution': {
-                'Physics_Thermodynamics': 30.0,
-                'Physics_Optics': 25.0,
-                'Physics_Mechanics': 25.0,
-                'Physics_Modern_Physics': 20.0
-            },
-            'difficulty_analysis': {
-                'easy': 40.0,
-                'medium': 40.0,
-                'hard': 20.0,
-                'unknown': 0.0
-            },
-            'score_prediction': {
-                'expected_score': 75.0,
-                'score_range': [68.0, 82.0],
-                'confidence': 0.85
-            },
-            'recommendations': [
-                {
-                    'topic': 'Thermodynamics',
-                    'subject': 'Physics',
-                    'weight_in_paper': 30.0,
-                    'current_mastery': 65.0,
-                    'priority': 'high',
-                    'recommended_time': '2 hours',
-                    'resources': [
-                        'Video: Thermodynamics concepts explained',
-                        'Notes: Thermodynamics formula sheet'
-                    ],
-                    'action_items': [
-                        'Watch 20-minute video on Thermodynamics',
-                        'Solve 5 basic problems on Thermodynamics'
-                    ]
-                }
-            ]
-        }
+            store_analysis_content(content_hash, 'text', analysis)
         
         # Save analysis to database
         paper_analysis = PaperAnalysis(
@@ -1207,7 +3373,8 @@ def quick_analyze_paper() -> tuple[Response, Literal[400]] | Response | tuple[Re
             filename='text_input.txt',
             original_filename='text_input.txt',
             subject=subject,
-            analysis_data=analysis
+            analysis_data=None,
+            content_hash=content_hash
         )
         db.session.add(paper_analysis)
         
@@ -1231,6 +3398,7 @@ def quick_analyze_paper() -> tuple[Response, Literal[400]] | Response | tuple[Re
             'success': True,
             'analysis_id': paper_analysis.id,
             'analysis': analysis,
+            'cached': content is not None,
             'message': 'Paper analyzed successfully'
         })
         
@@ -1298,6 +3466,7 @@ def get_paper_history(student_id) -> Response | tuple[Response, Literal[500]]:
     """Get paper analysis history for student"""
     try:
         analyses = PaperAnalysis.query.filter_by(student_id=student_id)\
+            .options(selectinload(PaperAnalysis.content))\
             .order_by(PaperAnalysis.created_at.desc())\
             .limit(10).all()
         
@@ -1308,7 +3477,7 @@ def get_paper_history(student_id) -> Response | tuple[Response, Literal[500]]:
                 'filename': a.original_filename,
                 'subject': a.subject,
                 'created_at': a.created_at.isoformat() if a.created_at else None,
-                'predicted_score': a.analysis_data.get('score_prediction', {}).get('expected_score')
+                'predicted_score': (a.analysis or {}).get('score_prediction', {}).get('expected_score')
             } for a in analyses]
         })
     except Exception as e:
@@ -1316,6 +3485,7 @@ def get_paper_history(student_id) -> Response | tuple[Response, Literal[500]]:
 
 # ============ LEARNING RECOMMENDATIONS ROUTES ============
 @app.route('/api/recommendations/<student_id>', methods=['GET'])
+@student_cached
 def get_recommendations(student_id) -> Response | tuple[Response, Literal[500]]:
     """Get personalized learning recommendations"""
     try:
@@ -1401,6 +3571,117 @@ def get_recommendations(student_id) -> Response | tuple[Response, Literal[500]]:
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# ============ COHORT ANALYTICS ROUTES ============
+# Mastery histogram buckets [lo, hi) and per-student risk thresholds (average mastery)
+COHORT_MASTERY_BUCKETS: list[tuple[int, int]] = [(0, 20), (20, 40), (40, 60), (60, 80), (80, 101)]
+COHORT_HIGH_RISK_MASTERY = 50
+COHORT_MEDIUM_RISK_MASTERY = 70
+
+@app.route('/api/cohorts/analytics', methods=['GET'])
+def get_cohort_analytics() -> tuple[Response, Literal[400]] | Response | tuple[Response, Literal[500]]:
+    """Per-topic mastery distribution, risk counts and weakest topics for a class"""
+    try:
+        class_level: str | None = request.args.get('class_level')
+        subject: str | None = request.args.get('subject')
+        # type=int gives None for a non-integer value, which is rejected below
+        weakest_limit: int | None = request.args.get('weakest', type=int) if 'weakest' in request.args else 5
+        
+        if not class_level:
+            return jsonify({'success': False, 'error': 'class_level is required'}), 400
+        if weakest_limit is None or not 1 <= weakest_limit <= 50:
+            return jsonify({'success': False, 'error': 'weakest must be an integer from 1 to 50'}), 400
+        
+        mastery = StudentPerformance.mastery_score
+        
+        # IN-subqueries keep rows flowing in (student_id, topic_id) index order,
+        # which lets the per-student GROUP BY skip a temp B-tree
+        def in_cohort(query):
+            query = query.filter(StudentPerformance.student_id.in_(
+                select(Student.student_id).where(Student.class_level == class_level)
+            ))
+            if subject:
+                query = query.filter(StudentPerformance.topic_id.in_(
+                    select(Topic.id).where(Topic.subject == subject)
+                ))
+            return query
+        
+        class_size = db.session.query(func.count(Student.id))\
+            .filter(Student.class_level == class_level).scalar()
+        
+        # One GROUP BY pass for every topic's stats and histogram
+        bucket_columns = [
+            func.sum(case(((mastery >= lo) & (mastery < hi), 1), else_=0))
+            for lo, hi in COHORT_MASTERY_BUCKETS
+        ]
+        topic_rows = in_cohort(db.session.query(
+            StudentPerformance.topic_id,
+            func.count(StudentPerformance.id),
+            func.avg(mastery),
+            func.min(mastery),
+            func.max(mastery),
+            func.sum(StudentPerformance.questions_attempted),
+            func.sum(StudentPerformance.questions_correct),
+            func.sum(case((mastery < COHORT_HIGH_RISK_MASTERY, 1), else_=0)),
+            *bucket_columns
+        )).group_by(StudentPerformance.topic_id).all()
+        
+        topics = {t.id: t for t in Topic.query.filter(Topic.id.in_([r[0] for r in topic_rows])).all()} if topic_rows else {}
+        
+        topic_stats = []
+        for topic_id, students, avg_mastery, min_mastery, max_mastery, attempted, correct, struggling, *buckets in topic_rows:
+            topic = topics.get(topic_id)
+            topic_stats.append({
+                'topic_id': topic_id,
+                'topic': topic.topic_name if topic else 'Unknown',
+                'subject': topic.subject if topic else 'General',
+                'students': students,
+                'average_mastery': round(avg_mastery or 0, 1),
+                'min_mastery': min_mastery,
+                'max_mastery': max_mastery,
+                'accuracy': round(correct / attempted * 100, 1) if attempted else 0,
+                'students_below_threshold': int(struggling or 0),
+                'distribution': {
+                    f'{lo}-{min(hi, 100)}': int(count or 0)
+                    for (lo, hi), count in zip(COHORT_MASTERY_BUCKETS, buckets)
+                }
+            })
+        topic_stats.sort(key=lambda t: t['average_mastery'])
+        
+        # Risk levels from each student's average mastery, aggregated in SQL
+        per_student = in_cohort(db.session.query(
+            StudentPerformance.student_id.label('student_id'),
+            func.avg(mastery).label('average_mastery')
+        )).group_by(StudentPerformance.student_id).subquery()
+        avg_col = per_student.c.average_mastery
+        assessed, high_risk, medium_risk, cohort_mastery = db.session.query(
+            func.count(),
+            func.coalesce(func.sum(case((avg_col < COHORT_HIGH_RISK_MASTERY, 1), else_=0)), 0),
+            func.coalesce(func.sum(case(((avg_col >= COHORT_HIGH_RISK_MASTERY) & (avg_col < COHORT_MEDIUM_RISK_MASTERY), 1), else_=0)), 0),
+            func.avg(avg_col)
+        ).select_from(per_student).one()
+        
+        return jsonify({
+            'success': True,
+            'cohort': {
+                'class_level': class_level,
+                'subject': subject,
+                'class_size': class_size,
+                'students_with_data': assessed,
+                'average_mastery': round(cohort_mastery or 0, 1),
+                'risk_counts': {
+                    'high': int(high_risk),
+                    'medium': int(medium_risk),
+                    'low': int(assessed - high_risk - medium_risk)
+                },
+                'at_risk_students': int(high_risk),
+                'weakest_topics': topic_stats[:weakest_limit],
+                'topics': topic_stats
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # ============ TOPICS & QUESTIONS ROUTES ============
 @app.route('/api/topics', methods=['GET'])
 def get_topics() -> Response | tuple[Response, Literal[500]]:
@@ -1450,25 +3731,101 @@ def get_questions() -> Response | tuple[Response, Literal[500]]:
 
 # ============ ACTIVITIES ROUTES ============
 @app.route('/api/activities/<student_id>', methods=['GET'])
-def get_activities(student_id) -> Response | tuple[Response, Literal[500]]:
-    """Get student activities"""
+@student_cached
+def get_activities(student_id) -> Response | tuple[Response, Literal[400]] | tuple[Response, Literal[500]]:
+    """Get student activities (newest first, paged with ?cursor=)"""
     try:
-        limit = int(request.args.get('limit', 20))
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
         activity_type: str | None = request.args.get('type')
         
         query = StudentActivity.query.filter_by(student_id=student_id)
         if activity_type:
             query = query.filter_by(activity_type=activity_type)
         
-        activities = query.order_by(StudentActivity.created_at.desc()).limit(limit).all()
+        activities, next_cursor = keyset_page(
+            query, StudentActivity.created_at, StudentActivity.id, request.args.get('cursor'), limit
+        )
         
         return jsonify({
             'success': True,
-            'activities': [act.to_dict() for act in activities]
+            'activities': [act.to_dict() for act in activities],
+            'next_cursor': next_cursor
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/activities/<student_id>/daily', methods=['GET'])
+@student_cached(vary=lambda student_id: utc_today())
+def get_daily_activity(student_id) -> Response | tuple[Response, Literal[500]]:
+    """Daily activity totals for the last `days` days plus streak and weekly goal"""
+    try:
+        days = max(1, min(int(request.args.get('days', 30)), 366))
+        since = utc_today() - timedelta(days=days - 1)
+        rollups = StudentDailyActivity.query\
+            .filter(StudentDailyActivity.student_id == student_id, StudentDailyActivity.day >= since)\
+            .order_by(StudentDailyActivity.day).all()
+        
+        return jsonify({
+            'success': True,
+            'days': [row.to_dict() for row in rollups],
+            **activity_goals(student_id)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/stream/activities', methods=['GET'])
+def stream_activities() -> tuple[Response, Literal[400]] | Response:
+    """Server-Sent Events feed of new activities for one student or a whole class
+    
+    Reconnecting clients send Last-Event-ID and receive what they missed; a
+    `reset` event means events were lost (too slow, or restarted) and the
+    client should refetch /api/activities before continuing.
+    """
+    student_id: str | None = request.args.get('student_id')
+    class_level: str | None = request.args.get('class_level')
+    if student_id:
+        channels = {f'student:{student_id}'}
+    elif class_level:
+        # Activities are published to their student's class at the time, so new members show up
+        channels = {f'class:{class_level}'}
+    else:
+        return jsonify({'success': False, 'error': 'student_id or class_level required'}), 400
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    subscription, replay = activity_hub.subscribe(channels, last_event_id)
+    heartbeat = app.config['SSE_HEARTBEAT_SECONDS']
+    
+    def generate():
+        # Events published while subscribing can be in both the replay and the queue
+        last_sent = activity_hub.sequence(last_event_id) if replay else 0
+        try:
+            yield 'retry: 5000\n\n'
+            if replay is None:
+                yield sse_message({'id': activity_hub.last_id(), 'event': 'reset', 'data': {'reason': 'unresumable'}})
+            for event in replay or ():
+                last_sent = activity_hub.sequence(event['id'])
+                yield sse_message(event)
+            while True:
+                events, overflowed = subscription.wait(heartbeat)
+                if overflowed:
+                    yield sse_message({'id': activity_hub.last_id(), 'event': 'reset', 'data': {'reason': 'overflow'}})
+                for event in events:
+                    seq = activity_hub.sequence(event['id'])
+                    if seq > last_sent:
+                        last_sent = seq
+                        yield sse_message(event)
+                if not events and not overflowed:
+                    yield ': keepalive\n\n'
+        finally:
+            activity_hub.unsubscribe(subscription)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # stop nginx from buffering the stream
+    })
+
 # ============ HEALTH & UTILITY ROUTES ============
 @app.route('/api/health', methods=['GET'])
 def health_check() -> Response:
@@ -1489,7 +3846,11 @@ def health_check() -> Response:
         'timestamp': datetime.utcnow().isoformat(),
         'version': '1.0.0',
         'service': 'SkillTwin Backend API',
-        'database': db_status
+        'database': db_status,
+        'write_buffer': performance_buffer.metrics() if performance_buffer is not None else None,
+        'activity_stream': activity_hub.metrics(),
+        'activity_relay': activity_relay.metrics() if activity_relay is not None else None,
+        'paper_jobs': paper_jobs.metrics()
     })
 
 @app.route('/api/init', methods=['POST'])
@@ -1497,7 +3858,7 @@ def initialize_database() -> Response | tuple[Response, Literal[500]]:
     """Initialize database with sample data"""
     try:
         with app.app_context():
-            db.create_all()
+            init_schema()
             seed_sample_data()
         
         return jsonify({
@@ -1515,7 +3876,7 @@ def reset_database() -> Response | tuple[Response, Literal[500]]:
             # Drop all tables
             db.drop_all()
             # Create fresh tables
-            db.create_all()
+            init_schema()
             # Seed sample data
             seed_sample_data()
         
@@ -1589,11 +3950,19 @@ if __name__ == '__main__':
     # Create necessary directories
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
+    # Exit normally on SIGTERM so atexit hooks flush buffered writes
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
     # Initialize database
     with app.app_context():
-        db.create_all()
+        init_schema()
         seed_sample_data()
     
+    # Resume paper jobs queued (or interrupted) before this start
+    paper_jobs.start()
+    if activity_relay is not None:
+        activity_relay.start()
+    
     print(f"""
 {'='*60}
 SkillTwin Backend Server
@@ -1610,7 +3979,10 @@ Server running on http://localhost:5000
   - Performance prediction: GET /api/performance/predict/<student_id>
   - Paper analysis: POST /api/papers/upload
   - Adaptive test: POST /api/tests/adaptive/start
+  - Batch answers: POST /api/tests/adaptive/submit-batch
+  - Bulk answer ingest (NDJSON): POST /api/performance/ingest
   - Learning recommendations: GET /api/recommendations/<student_id>
+  - Class analytics: GET /api/cohorts/analytics?class_level=<class>
 
 🔐 Demo Credentials:
   - Email: demo@skilltwin.com
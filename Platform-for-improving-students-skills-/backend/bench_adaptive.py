@@ -0,0 +1,325 @@
+"""
+SkillTwin adaptive test load benchmark
+Simulates virtual students taking adaptive tests and reports throughput,
+latency percentiles, SQL queries per request and database growth.
+
+Runs fully offline against a throwaway SQLite database using the Flask test
+client, or against an already running local server with --url.
+
+    python bench_adaptive.py --students 10000 --workers 32 --think-time 0.5
+    python bench_adaptive.py --url http://localhost:5000 --students 200
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+
+SUBJECTS = ['Physics', 'Mathematics', 'Chemistry']
+TOPICS = {
+    'Physics': ['Thermodynamics', 'Optics', 'Mechanics'],
+    'Mathematics': ['Calculus', 'Algebra'],
+    'Chemistry': ['Organic Chemistry']
+}
+DIFFICULTIES = ['easy', 'medium', 'hard']
+OPTIONS = ['A', 'B', 'C', 'D']
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Load benchmark for the adaptive test flow')
+    parser.add_argument('--students', type=int, default=500, help='virtual students (one test each)')
+    parser.add_argument('--workers', type=int, default=16, help='client threads issuing requests')
+    parser.add_argument('--accuracy', type=float, default=0.7, help='probability a student answers correctly')
+    parser.add_argument('--think-time', type=float, default=0.0, help='mean seconds between a student\'s answers')
+    parser.add_argument('--questions', type=int, default=300, help='question bank size per subject')
+    parser.add_argument('--test-type', default='adaptive', help="MockTest.test_type ('adaptive' or 'irt')")
+    parser.add_argument('--batch', type=int, default=1, help='answers per submit (uses submit-batch when > 1)')
+    parser.add_argument('--url', help='benchmark a running server instead of the in-process test client')
+    parser.add_argument('--db', help='SQLite file to use in test-client mode (default: temp file)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    return parser.parse_args(argv)
+
+# ============ TRANSPORTS ============
+class TestClientTransport:
+    """Calls the Flask app in-process and counts SQL statements per request"""
+
+    def __init__(self, flask_app, engine) -> None:
+        self.app = flask_app
+        self._local = threading.local()
+        from sqlalchemy import event
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            self._local.queries = getattr(self._local, 'queries', 0) + 1
+
+    def post(self, path, payload):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        before = getattr(self._local, 'queries', 0)
+        response = client.post(path, json=payload)
+        return response.status_code, response.get_json(), getattr(self._local, 'queries', 0) - before
+
+class HttpTransport:
+    """Calls a running server over HTTP (SQL counts are not available)"""
+
+    def __init__(self, base_url) -> None:
+        self.base_url = base_url.rstrip('/')
+
+    def post(self, path, payload):
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(payload).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.loads(response.read()), None
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b'{}'), None
+
+# ============ SEEDING ============
+def seed_database(app_module, args) -> list[str]:
+    """Create a question bank and one student row per virtual student"""
+    db = app_module.db
+    rng = random.Random(args.seed)
+    with app_module.app.app_context():
+        db.create_all()
+        questions = []
+        for subject in SUBJECTS:
+            for i in range(args.questions):
+                difficulty = DIFFICULTIES[i % 3]
+                questions.append(app_module.Question(
+                    id=f'BENCH-{subject[:4].upper()}-{i:05d}',
+                    subject=subject,
+                    topic=rng.choice(TOPICS[subject]),
+                    difficulty=difficulty,
+                    question_text=f'Benchmark {subject} question {i}',
+                    options=[f'Option {o}' for o in OPTIONS],
+                    correct_answer=rng.choice(OPTIONS),
+                    irt_discrimination=round(rng.uniform(0.6, 2.0), 2),
+                    irt_difficulty=round(rng.gauss({'easy': -1, 'medium': 0, 'hard': 1}[difficulty], 0.4), 2),
+                    irt_guessing=0.2
+                ))
+        db.session.add_all(questions)
+        student_ids = [f'BENCH{i:06d}' for i in range(args.students)]
+        db.session.add_all(app_module.Student(
+            email=f'{sid.lower()}@bench.local',
+            name=f'Bench Student {sid}',
+            student_id=sid
+        ) for sid in student_ids)
+        db.session.commit()
+        app_module.question_pool.invalidate()
+    return student_ids
+
+def db_size(path) -> int:
+    """Database size including SQLite WAL/journal side files"""
+    return sum(os.path.getsize(p) for p in (path, path + '-wal', path + '-journal') if os.path.exists(p))
+
+# ============ SIMULATION ============
+class VirtualStudent:
+    __slots__ = ('student_id', 'subject', 'test_id', 'question', 'done')
+
+    def __init__(self, student_id, subject) -> None:
+        self.student_id = student_id
+        self.subject = subject
+        self.test_id = None
+        self.question = None
+        self.done = False
+
+def answer_for(question, rng, accuracy) -> str:
+    correct = question.get('correct_answer', 'A')
+    if rng.random() < accuracy:
+        return correct
+    return rng.choice([o for o in OPTIONS if o != correct])
+
+def run_benchmark(transport, student_ids, args) -> dict:
+    """Drive every virtual student through one test; returns raw measurements"""
+    rng = random.Random(args.seed)
+    students = [VirtualStudent(sid, SUBJECTS[i % len(SUBJECTS)]) for i, sid in enumerate(student_ids)]
+
+    # Ready queue ordered by the time each student next acts
+    ready = [(0.0, i) for i in range(len(students))]
+    heapq.heapify(ready)
+    lock = threading.Lock()
+    latencies = defaultdict(list)
+    queries = defaultdict(list)
+    errors = defaultdict(int)
+
+    def think() -> float:
+        return rng.expovariate(1.0 / args.think_time) if args.think_time > 0 else 0.0
+
+    def step(student, local_rng):
+        if student.test_id is None:
+            path = '/api/tests/adaptive/start'
+            payload = {'student_id': student.student_id, 'subject': student.subject, 'test_type': args.test_type}
+        elif args.batch > 1:
+            path = '/api/tests/adaptive/submit-batch'
+            # A catching-up client only knows its current question; repeat answers are fine for load purposes
+            payload = {'test_id': student.test_id, 'answers': [{
+                'question_id': student.question['id'],
+                'answer': answer_for(student.question, local_rng, args.accuracy),
+                'response_time': local_rng.randint(5, 90)
+            } for _ in range(args.batch)]}
+        else:
+            path = '/api/tests/adaptive/submit'
+            payload = {
+                'test_id': student.test_id,
+                'question_id': student.question['id'],
+                'answer': answer_for(student.question, local_rng, args.accuracy),
+                'response_time': local_rng.randint(5, 90)
+            }
+
+        started = time.perf_counter()
+        status, body, query_count = transport.post(path, payload)
+        elapsed = time.perf_counter() - started
+
+        endpoint = path.rsplit('/', 1)[-1]
+        with lock:
+            latencies[endpoint].append(elapsed)
+            if query_count is not None:
+                queries[endpoint].append(query_count)
+            if status != 200 or not body or not body.get('success'):
+                errors[endpoint] += 1
+
+        if status != 200 or not body or not body.get('success'):
+            student.done = True
+        elif endpoint == 'start':
+            student.test_id = body['test_id']
+            student.question = body['question']
+        elif body.get('test_completed') or not body.get('next_question'):
+            student.done = True
+        else:
+            student.question = body['next_question']
+
+    def worker(seed):
+        local_rng = random.Random(seed)
+        while True:
+            with lock:
+                if not ready:
+                    return
+                due, index = heapq.heappop(ready)
+            delay = due - (time.perf_counter() - wall_start)
+            if delay > 0:
+                time.sleep(delay)
+            student = students[index]
+            step(student, local_rng)
+            if not student.done:
+                with lock:
+                    heapq.heappush(ready, (time.perf_counter() - wall_start + think(), index))
+
+    wall_start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(args.seed + n,), daemon=True) for n in range(args.workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall_time = time.perf_counter() - wall_start
+
+    return {
+        'wall_time': wall_time,
+        'latencies': latencies,
+        'queries': queries,
+        'errors': errors,
+        'completed_tests': sum(1 for s in students if s.done and s.test_id)
+    }
+
+# ============ REPORTING ============
+def percentile(sorted_values, pct) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def build_report(result, args, db_before=None, db_after=None) -> dict:
+    total_requests = sum(len(v) for v in result['latencies'].values())
+    report = {
+        'students': args.students,
+        'workers': args.workers,
+        'test_type': args.test_type,
+        'wall_time_s': round(result['wall_time'], 3),
+        'requests': total_requests,
+        'throughput_rps': round(total_requests / result['wall_time'], 1) if result['wall_time'] else 0,
+        'completed_tests': result['completed_tests'],
+        'endpoints': {}
+    }
+    for endpoint, values in sorted(result['latencies'].items()):
+        values = sorted(values)
+        query_counts = result['queries'].get(endpoint)
+        report['endpoints'][endpoint] = {
+            'requests': len(values),
+            'errors': result['errors'].get(endpoint, 0),
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(values[-1] * 1000, 2),
+            'sql_per_request': round(statistics.mean(query_counts), 2) if query_counts else None
+        }
+    if db_before is not None and db_after is not None:
+        report['db_bytes_before'] = db_before
+        report['db_bytes_after'] = db_after
+        report['db_growth_bytes'] = db_after - db_before
+        report['db_growth_per_test_bytes'] = round((db_after - db_before) / max(result['completed_tests'], 1), 1)
+    return report
+
+def print_report(report) -> None:
+    print(f"\n{'='*72}")
+    print(f"Adaptive test benchmark: {report['students']} students, {report['workers']} workers, "
+          f"test_type={report['test_type']}")
+    print(f"{'='*72}")
+    print(f"Wall time:        {report['wall_time_s']} s")
+    print(f"Requests:         {report['requests']} ({report['throughput_rps']} req/s)")
+    print(f"Completed tests:  {report['completed_tests']}")
+    if 'db_growth_bytes' in report:
+        print(f"DB growth:        {report['db_growth_bytes']} bytes "
+              f"({report['db_growth_per_test_bytes']} bytes/test)")
+    print(f"\n{'endpoint':<14}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'SQL/req':>10}")
+    for endpoint, stats in report['endpoints'].items():
+        sql = stats['sql_per_request'] if stats['sql_per_request'] is not None else '-'
+        print(f"{endpoint:<14}{stats['requests']:>10}{stats['errors']:>8}{stats['p50_ms']:>10}"
+              f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{sql:>10}")
+    print(f"{'='*72}\n")
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args.url:
+        # Against a live server the question bank and students must already exist
+        transport = HttpTransport(args.url)
+        student_ids = [f'BENCH{i:06d}' for i in range(args.students)]
+        result = run_benchmark(transport, student_ids, args)
+        report = build_report(result, args)
+    else:
+        db_path = os.path.abspath(args.db or os.path.join(tempfile.mkdtemp(prefix='skilltwin-bench-'), 'bench.db'))
+        os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import app as app_module
+
+        student_ids = seed_database(app_module, args)
+        with app_module.app.app_context():
+            engine = app_module.db.engine
+        transport = TestClientTransport(app_module.app, engine)
+
+        db_before = db_size(db_path)
+        result = run_benchmark(transport, student_ids, args)
+        db_after = db_size(db_path)
+        report = build_report(result, args, db_before, db_after)
+        report['database'] = db_path
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0 if not any(s['errors'] for s in report['endpoints'].values()) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+SkillTwin index benchmark
+Builds a throwaway SQLite database with a large activity table, then shows
+query plans and latency for the student-scoped hot queries before and after
+the composite indexes from migration 2 are created.
+
+    python bench_indexes.py --activities 1000000 --students 5000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+ACTIVITY_TYPES = ['question_answered', 'test_started', 'test_completed', 'paper_analyzed', 'video_watched']
+SUBJECTS = ['Physics', 'Mathematics', 'Chemistry']
+DIFFICULTIES = ['easy', 'medium', 'hard']
+
+# Mirrors the queries issued by the dashboard, history, activity and adaptive endpoints
+HOT_QUERIES = {
+    'recent activities': (
+        'SELECT * FROM student_activities WHERE student_id = :student_id '
+        'ORDER BY created_at DESC LIMIT 20'
+    ),
+    'activities by type': (
+        'SELECT * FROM student_activities WHERE student_id = :student_id AND activity_type = :activity_type '
+        'ORDER BY created_at DESC LIMIT 20'
+    ),
+    'test history': (
+        'SELECT * FROM mock_tests WHERE student_id = :student_id ORDER BY started_at DESC LIMIT 20'
+    ),
+    'performance lookup': (
+        'SELECT * FROM student_performance WHERE student_id = :student_id AND topic_id = :topic_id'
+    ),
+    'questions by difficulty': (
+        'SELECT * FROM questions WHERE subject = :subject AND difficulty = :difficulty LIMIT 1'
+    ),
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Query plan / latency benchmark for hot-path indexes')
+    parser.add_argument('--activities', type=int, default=1_000_000)
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--tests', type=int, default=100_000)
+    parser.add_argument('--topics', type=int, default=20)
+    parser.add_argument('--questions', type=int, default=5000)
+    parser.add_argument('--runs', type=int, default=200, help='executions per query and phase')
+    parser.add_argument('--db', help='SQLite file to use (default: temp file)')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args(argv)
+
+def insert_chunked(conn, table, columns, rows, chunk=50_000) -> None:
+    sql = text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})")
+    batch = []
+    for row in rows:
+        batch.append(dict(zip(columns, row)))
+        if len(batch) >= chunk:
+            conn.execute(sql, batch)
+            batch = []
+    if batch:
+        conn.execute(sql, batch)
+
+def populate(conn, args, rng) -> None:
+    now = datetime.utcnow()
+    student_ids = [f'IDX{i:06d}' for i in range(args.students)]
+
+    insert_chunked(conn, 'users', ['email', 'password_hash', 'name', 'student_id'],
+                   ((f'{sid.lower()}@bench.local', 'x', sid, sid) for sid in student_ids))
+    insert_chunked(conn, 'topics', ['subject', 'topic_name', 'difficulty_level'],
+                   ((SUBJECTS[i % 3], f'Topic {i}', 2) for i in range(args.topics)))
+    insert_chunked(conn, 'questions', ['id', 'subject', 'topic', 'difficulty', 'question_text', 'options', 'correct_answer'],
+                   ((f'IDXQ{i:06d}', SUBJECTS[i % 3], f'Topic {i % args.topics}', DIFFICULTIES[i % 3],
+                     'q', '["A", "B", "C", "D"]', 'A') for i in range(args.questions)))
+    insert_chunked(conn, 'student_performance',
+                   ['student_id', 'topic_id', 'mastery_score', 'questions_attempted', 'questions_correct', 'total_time_spent'],
+                   ((sid, t + 1, 50.0, 10, 5, 10) for sid in student_ids for t in range(args.topics)))
+    insert_chunked(conn, 'mock_tests', ['id', 'student_id', 'subject', 'test_type', 'answer_count', 'started_at'],
+                   ((f'IDXT{i:08d}', rng.choice(student_ids), SUBJECTS[i % 3], 'adaptive', 10,
+                     now - timedelta(minutes=rng.randrange(525_600))) for i in range(args.tests)))
+    insert_chunked(conn, 'student_activities', ['student_id', 'activity_type', 'description', 'duration', 'created_at'],
+                   ((rng.choice(student_ids), rng.choice(ACTIVITY_TYPES), 'bench', 30,
+                     now - timedelta(seconds=rng.randrange(31_536_000))) for _ in range(args.activities)))
+
+def explain(conn, sql, params) -> list[str]:
+    if conn.dialect.name == 'sqlite':
+        return [row[-1] for row in conn.execute(text('EXPLAIN QUERY PLAN ' + sql), params)]
+    return [row[0] for row in conn.execute(text('EXPLAIN ' + sql), params)]
+
+def measure(conn, args, rng) -> dict:
+    results = {}
+    for name, sql in HOT_QUERIES.items():
+        timings = []
+        plan = None
+        for _ in range(args.runs):
+            params = {
+                'student_id': f'IDX{rng.randrange(args.students):06d}',
+                'topic_id': rng.randrange(args.topics) + 1,
+                'activity_type': rng.choice(ACTIVITY_TYPES),
+                'subject': rng.choice(SUBJECTS),
+                'difficulty': rng.choice(DIFFICULTIES)
+            }
+            if plan is None:
+                plan = explain(conn, sql, params)
+            started = time.perf_counter()
+            conn.execute(text(sql), params).fetchall()
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        results[name] = {
+            'plan': plan,
+            'p50_ms': statistics.median(timings) * 1000,
+            'p95_ms': timings[int(len(timings) * 0.95) - 1] * 1000
+        }
+    return results
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    db_path = os.path.abspath(args.db or os.path.join(tempfile.mkdtemp(prefix='skilltwin-idx-'), 'bench.db'))
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+    from migrations import create_missing_indexes
+
+    db = app_module.db
+    with app_module.app.app_context():
+        db.create_all()
+        engine = db.engine
+
+    # Start from the pre-migration schema: no secondary indexes on the hot tables
+    indexed_tables = [t for t in db.metadata.sorted_tables if t.indexes]
+    with engine.begin() as conn:
+        for table in indexed_tables:
+            for index in table.indexes:
+                index.drop(conn, checkfirst=True)
+
+    print(f'Populating {db_path} ({args.activities:,} activities, {args.tests:,} tests, {args.students:,} students)...')
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        populate(conn, args, rng)
+    print(f'  done in {time.perf_counter() - started:.1f} s')
+
+    with engine.connect() as conn:
+        conn.execute(text('ANALYZE'))
+        before = measure(conn, args, random.Random(args.seed))
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        create_missing_indexes(conn, db.metadata)
+        conn.execute(text('ANALYZE'))
+    index_build = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        after = measure(conn, args, random.Random(args.seed))
+
+    print(f"\n{'='*78}\nIndex build time: {index_build:.1f} s\n{'='*78}")
+    for name in HOT_QUERIES:
+        b, a = before[name], after[name]
+        speedup = b['p50_ms'] / a['p50_ms'] if a['p50_ms'] else float('inf')
+        print(f'\n{name}')
+        print(f"  before: p50 {b['p50_ms']:9.3f} ms  p95 {b['p95_ms']:9.3f} ms  plan: {' | '.join(b['plan'])}")
+        print(f"  after:  p50 {a['p50_ms']:9.3f} ms  p95 {a['p95_ms']:9.3f} ms  plan: {' | '.join(a['plan'])}")
+        print(f'  speedup: {speedup:.1f}x')
+    print(f"\n{'='*78}\n")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+SkillTwin concurrent update check
+Fires answers for the same student/topic from many parallel writers at
+POST /api/performance/update and verifies that no increment was lost.
+
+Runs against a throwaway SQLite database with the Flask test client, or
+against a running server (e.g. backed by PostgreSQL) with --url.
+
+    python check_concurrent_updates.py --writers 32 --answers 50
+    python check_concurrent_updates.py --url http://localhost:5000 --student-id S1 --topic-id 1
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Lost-update check for concurrent performance updates')
+    parser.add_argument('--writers', type=int, default=32, help='parallel writer threads')
+    parser.add_argument('--answers', type=int, default=50, help='answers posted per writer')
+    parser.add_argument('--buffered', action='store_true', help='go through the write-behind buffer (test-client mode)')
+    parser.add_argument('--url', help='check a running server instead of the in-process test client')
+    parser.add_argument('--student-id', default='CONC001', help='student to write to (must exist with --url)')
+    parser.add_argument('--topic-id', type=int, help='topic to write to (default: first topic)')
+    parser.add_argument('--db', help='SQLite file to use in test-client mode (default: temp file)')
+    return parser.parse_args(argv)
+
+def http_post(base_url, path, payload):
+    request = urllib.request.Request(
+        base_url.rstrip('/') + path,
+        data=json.dumps(payload).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'null')
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    app_module = None
+
+    if args.url:
+        if args.topic_id is None:
+            print('--topic-id is required with --url')
+            return 2
+
+        def post(payload):
+            return http_post(args.url, '/api/performance/update', payload)
+
+        def read_counters():
+            # Probe with one wrong answer and read the row it returns (server must run unbuffered)
+            status, body = post({'student_id': args.student_id, 'topic_id': args.topic_id, 'correct': False})
+            performance = (body or {}).get('performance')
+            if performance is None:
+                raise SystemExit(f'Probe failed (HTTP {status}): {body} -- run the server with PERFORMANCE_BUFFER_ENABLED=0')
+            return performance['questions_attempted'], performance['questions_correct']
+    else:
+        db_path = os.path.abspath(args.db or os.path.join(tempfile.mkdtemp(prefix='skilltwin-conc-'), 'conc.db'))
+        os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+        os.environ['PERFORMANCE_BUFFER_ENABLED'] = '1' if args.buffered else '0'
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import app as app_module
+
+        db = app_module.db
+        with app_module.app.app_context():
+            app_module.init_schema()
+            if not app_module.Student.query.filter_by(student_id=args.student_id).first():
+                db.session.add(app_module.Student(email=f'{args.student_id.lower()}@check.local',
+                                                  name='Concurrency Check', student_id=args.student_id))
+            topic = app_module.Topic.query.first()
+            if topic is None:
+                topic = app_module.Topic(subject='Physics', topic_name='Concurrency')
+                db.session.add(topic)
+            db.session.commit()
+            args.topic_id = args.topic_id or topic.id
+
+        local = threading.local()
+
+        def post(payload):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = app_module.app.test_client()
+            response = client.post('/api/performance/update', json=payload)
+            return response.status_code, response.get_json()
+
+        def read_counters():
+            if app_module.performance_buffer is not None:
+                app_module.performance_buffer.flush()
+            with app_module.app.app_context():
+                row = app_module.StudentPerformance.query\
+                    .filter_by(student_id=args.student_id, topic_id=args.topic_id).first()
+                return (row.questions_attempted, row.questions_correct) if row else (0, 0)
+
+    before = read_counters()
+    errors = []
+    barrier = threading.Barrier(args.writers)
+
+    def writer(index):
+        barrier.wait()
+        for i in range(args.answers):
+            status, body = post({
+                'student_id': args.student_id,
+                'topic_id': args.topic_id,
+                'correct': (index + i) % 2 == 0,
+                'time_spent': 60
+            })
+            if status not in (200, 202) or not body.get('success'):
+                errors.append((status, body))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    after = read_counters()
+    # In --url mode the second probe adds one (wrong) answer of its own
+    attempted = after[0] - before[0] - (1 if args.url else 0)
+    correct = after[1] - before[1]
+    expected_attempted = args.writers * args.answers
+    expected_correct = sum(1 for n in range(args.writers) for i in range(args.answers) if (n + i) % 2 == 0)
+
+    print(f"{expected_attempted} answers from {args.writers} writers in {elapsed:.2f} s "
+          f"({expected_attempted / elapsed:.0f}/s), {len(errors)} failed requests")
+    print(f"questions_attempted: expected {expected_attempted}, got {attempted}")
+    print(f"questions_correct:   expected {expected_correct}, got {correct}")
+    for status, body in errors[:5]:
+        print(f"  HTTP {status}: {body}")
+
+    ok = not errors and attempted == expected_attempted and correct == expected_correct
+    print('OK: no lost updates' if ok else 'FAILED: lost or failed updates')
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+In-process event hub
+Fan-out of committed events to live subscribers (the SSE activity stream).
+Events are published to named channels; each subscriber listens on a set
+of channels through a bounded queue, so a slow or idle client costs a few
+hundred queued events at most and never blocks publishers. A ring of recent
+events lets a reconnecting client resume from its Last-Event-ID.
+
+Event ids are "<epoch>-<seq>": the epoch changes on every process start,
+so ids from another process (or before a restart) are recognised as
+unresumable rather than silently skipping events.
+
+A RowRelay feeds a hub from rows committed by other processes (polling a
+table's auto-increment id), so streams can be served apart from the
+workers that write.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+
+class Subscription:
+    """A subscriber's bounded queue; overflow drops the backlog and flags a reset"""
+
+    def __init__(self, channels, buffer_size) -> None:
+        self.channels = frozenset(channels)
+        self._queue = deque()
+        self._buffer_size = buffer_size
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self.overflowed = False
+        self.closed = False
+
+    def push(self, event) -> bool:
+        """Queue an event; returns True if this push overflowed the buffer"""
+        with self._lock:
+            overflow = len(self._queue) >= self._buffer_size
+            if overflow:
+                # Client is too far behind to catch up event by event
+                self._queue.clear()
+                self.overflowed = True
+            else:
+                self._queue.append(event)
+        self._ready.set()
+        return overflow
+
+    def wait(self, timeout) -> tuple[list, bool]:
+        """Block up to timeout for events; returns (events, overflowed) and resets both"""
+        self._ready.wait(timeout)
+        with self._lock:
+            events, overflowed = list(self._queue), self.overflowed
+            self._queue.clear()
+            self.overflowed = False
+            self._ready.clear()
+        return events, overflowed
+
+class EventHub:
+    """Thread-safe channel pub/sub with Last-Event-ID replay"""
+
+    def __init__(self, replay_size=10000, buffer_size=256) -> None:
+        self.epoch = uuid.uuid4().hex[:8]
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._recent = deque(maxlen=replay_size)  # (seq, channels, event)
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self.stats = {'published': 0, 'overflows': 0}
+
+    def publish(self, channels, event_type, data) -> str:
+        """Deliver an event to every subscriber of any of channels; returns its id"""
+        channels = frozenset(channels)
+        with self._lock:
+            self._seq += 1
+            event = {'id': f'{self.epoch}-{self._seq}', 'event': event_type, 'data': data}
+            self._recent.append((self._seq, channels, event))
+            targets = set()
+            for channel in channels:
+                targets.update(self._subscribers.get(channel, ()))
+            self.stats['published'] += 1
+        for subscription in targets:
+            if subscription.push(event):
+                self.stats['overflows'] += 1
+        return event['id']
+
+    def last_id(self) -> str:
+        """Id of the latest event, for resuming after a reset"""
+        return f'{self.epoch}-{self._seq}'
+
+    def sequence(self, event_id) -> int:
+        """Position of one of this hub's event ids (0 for foreign ids)"""
+        epoch, _, seq = str(event_id).partition('-')
+        return int(seq) if epoch == self.epoch and seq.isdigit() else 0
+
+    def subscribe(self, channels, last_event_id=None) -> tuple[Subscription, list | None]:
+        """Register a subscriber; returns (subscription, replay)
+
+        replay is the events after last_event_id on these channels, or None if
+        that id cannot be resumed from (other process, or aged out of the ring).
+        """
+        subscription = Subscription(channels, self.buffer_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+            replay = [] if last_event_id is None else self._replay(subscription.channels, last_event_id)
+        return subscription, replay
+
+    def _replay(self, channels, last_event_id) -> list | None:
+        epoch, _, seq = str(last_event_id).partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq > self._seq:
+            return None
+        if seq < self._seq and (not self._recent or self._recent[0][0] > seq + 1):
+            return None  # events after seq have already left the ring
+        return [event for event_seq, event_channels, event in self._recent
+                if event_seq > seq and not channels.isdisjoint(event_channels)]
+
+    def unsubscribe(self, subscription) -> None:
+        subscription.closed = True
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            subscriptions = {s for subscribers in self._subscribers.values() for s in subscribers}
+            return {
+                'subscribers': len(subscriptions),
+                'channels': len(self._subscribers),
+                'replay_events': len(self._recent),
+                **self.stats
+            }
+
+class RowRelay:
+    """Publishes rows committed by any process into a hub by polling an auto-increment id
+
+    fetch_fn(after_id, gap_ids) returns (row_id, channels, event_type, data) tuples, ordered
+    by id, for rows with id > after_id or id in gap_ids; latest_fn() returns the highest id
+    at start, where following begins. Ids are assigned at INSERT but become visible at
+    COMMIT, so a higher id can show up before a lower one: ids skipped below the highest
+    seen are asked for again on every poll for gap_seconds, then given up (rolled back).
+    """
+
+    def __init__(self, hub, fetch_fn, latest_fn, poll_seconds=1.0, gap_seconds=30.0, max_gaps=500) -> None:
+        self.hub = hub
+        self.fetch_fn = fetch_fn
+        self.latest_fn = latest_fn
+        self.poll_seconds = poll_seconds
+        self.gap_seconds = gap_seconds
+        self.max_gaps = max_gaps
+        self.after_id = None
+        self._gaps: dict[int, float] = {}  # missing id -> monotonic deadline
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'polls': 0, 'relayed': 0, 'gaps_expired': 0, 'errors': 0}
+
+    def start(self) -> None:
+        """Start the polling thread (idempotent)"""
+        with self._lock:
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name='row-relay', daemon=True)
+                self._thread.start()
+
+    def poll(self) -> int:
+        """Publish rows that became visible since the last poll; returns how many"""
+        if self.after_id is None:
+            self.after_id = self.latest_fn() or 0
+        now = time.monotonic()
+        for row_id in [row_id for row_id, deadline in self._gaps.items() if deadline <= now]:
+            del self._gaps[row_id]
+            self.stats['gaps_expired'] += 1
+
+        published = 0
+        for row_id, channels, event_type, data in self.fetch_fn(self.after_id, sorted(self._gaps)):
+            if row_id > self.after_id:
+                for missing in range(max(self.after_id + 1, row_id - self.max_gaps), row_id):
+                    self._gaps[missing] = now + self.gap_seconds
+                self.after_id = row_id
+            elif self._gaps.pop(row_id, None) is None:
+                continue  # already published
+            self.hub.publish(channels, event_type, data)
+            published += 1
+        # Bounded: the oldest gaps are the least likely to still commit
+        for row_id in sorted(self._gaps)[:max(len(self._gaps) - self.max_gaps, 0)]:
+            del self._gaps[row_id]
+            self.stats['gaps_expired'] += 1
+
+        self.stats['polls'] += 1
+        self.stats['relayed'] += published
+        return published
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"Row relay poll failed: {e}")
+            self._stop.wait(self.poll_seconds)
+
+    def close(self, timeout=5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def metrics(self) -> dict:
+        return {'after_id': self.after_id, 'pending_gaps': len(self._gaps), **self.stats}
@@ -0,0 +1,139 @@
+"""
+Incremental predictor features
+Maintains per-student sliding-window activity counts, a test-score EWMA and
+session-gap statistics so engagement, quiz and consistency features can be
+read without scanning activity history. Every update is O(WINDOW_DAYS) at
+most, independent of how many events a student has.
+
+State lives on any object with the FEATURE_STATE_FIELDS attributes (the
+StudentFeatures model in app.py).
+"""
+import math
+from datetime import datetime
+
+# Daily event counts kept in a ring buffer indexed by day ordinal
+WINDOW_DAYS = 30
+SHORT_WINDOW_DAYS = 7
+
+# Smoothing for the test-score EWMA and the gap mean/variance
+SCORE_ALPHA = 0.3
+GAP_ALPHA = 0.2
+
+# Events in the last week that count as fully engaged
+WEEKLY_EVENT_TARGET = 20
+
+FEATURE_STATE_FIELDS = (
+    'day_counts', 'last_day', 'last_active_day', 'gap_mean', 'gap_var',
+    'gap_count', 'score_ewma', 'tests_scored', 'event_count'
+)
+
+def day_number(moment) -> int:
+    """Day ordinal of a datetime/date (UTC calendar days)"""
+    if isinstance(moment, datetime):
+        moment = moment.date()
+    return moment.toordinal()
+
+def today() -> int:
+    return day_number(datetime.utcnow())
+
+def reset_state(state) -> None:
+    state.day_counts = [0] * WINDOW_DAYS
+    state.last_day = None
+    state.last_active_day = None
+    state.gap_mean = 0.0
+    state.gap_var = 0.0
+    state.gap_count = 0
+    state.score_ewma = None
+    state.tests_scored = 0
+    state.event_count = 0
+
+def _advance(counts, last_day, day) -> list[int]:
+    """Ring buffer moved forward to day, zeroing the buckets that slid out"""
+    if last_day is not None:
+        for d in range(max(last_day + 1, day - WINDOW_DAYS + 1), day + 1):
+            counts[d % WINDOW_DAYS] = 0
+    return counts
+
+def _gap_update(mean, var, gap) -> tuple[float, float]:
+    """Exponentially weighted mean/variance update with one new gap sample"""
+    diff = gap - mean
+    mean += GAP_ALPHA * diff
+    var = (1 - GAP_ALPHA) * (var + GAP_ALPHA * diff * diff)
+    return mean, var
+
+def record_event(state, moment, score=None) -> None:
+    """Fold one activity into the state; score is set for completed tests"""
+    day = day_number(moment)
+    counts = list(state.day_counts or [0] * WINDOW_DAYS)  # new list so JSON changes are detected
+
+    if state.last_day is None or day > state.last_day:
+        state.day_counts = _advance(counts, state.last_day, day)
+        state.last_day = day
+        counts = state.day_counts
+    if day > state.last_day - WINDOW_DAYS:
+        counts[day % WINDOW_DAYS] += 1
+        state.day_counts = counts
+
+    if state.last_active_day is None:
+        state.last_active_day = day
+    elif day > state.last_active_day:
+        gap = day - state.last_active_day
+        if state.gap_count:
+            state.gap_mean, state.gap_var = _gap_update(state.gap_mean, state.gap_var, gap)
+        else:
+            state.gap_mean, state.gap_var = float(gap), 0.0
+        state.gap_count += 1
+        state.last_active_day = day
+
+    if score is not None:
+        score = float(score)
+        state.score_ewma = score if state.score_ewma is None else \
+            SCORE_ALPHA * score + (1 - SCORE_ALPHA) * state.score_ewma
+        state.tests_scored += 1
+    state.event_count = (state.event_count or 0) + 1
+
+def window_counts(state, day=None) -> dict[str, int]:
+    """Event counts and active days over the trailing windows ending at day"""
+    day = today() if day is None else day
+    if state.last_day is None or day - state.last_day >= WINDOW_DAYS:
+        return {'events_7d': 0, 'events_30d': 0, 'active_days_30d': 0}
+    counts = state.day_counts or [0] * WINDOW_DAYS
+    events_7d = events_30d = active_days = 0
+    # Only days in (day - WINDOW_DAYS, last_day] hold live counts
+    for d in range(day - WINDOW_DAYS + 1, min(day, state.last_day) + 1):
+        n = counts[d % WINDOW_DAYS]
+        events_30d += n
+        active_days += 1 if n else 0
+        if d > day - SHORT_WINDOW_DAYS:
+            events_7d += n
+    return {'events_7d': events_7d, 'events_30d': events_30d, 'active_days_30d': active_days}
+
+def consistency(state, day=None) -> float | None:
+    """1 / (1 + coefficient of variation) of the gaps between active days
+
+    The gap still open since the last active day counts once it is longer
+    than usual, so regularity decays while a student is away.
+    """
+    if not state.gap_count:
+        return None
+    day = today() if day is None else day
+    mean, var = state.gap_mean, state.gap_var
+    open_gap = day - (state.last_active_day or day)
+    if open_gap > mean:
+        mean, var = _gap_update(mean, var, open_gap)
+    if mean <= 0:
+        return 1.0
+    return 1.0 / (1.0 + math.sqrt(var) / mean)
+
+def derive_features(state, defaults, day=None) -> dict[str, float]:
+    """Predictor inputs from the state, falling back to defaults where there is no signal"""
+    windows = window_counts(state, day)
+    engagement = 0.6 * windows['active_days_30d'] / WINDOW_DAYS + \
+        0.4 * min(1.0, windows['events_7d'] / WEEKLY_EVENT_TARGET)
+    regularity = consistency(state, day)
+    return {
+        'engagement_score': round(engagement, 3),
+        'average_quiz_score': round(state.score_ewma, 1) if state.score_ewma is not None else defaults['average_quiz_score'],
+        'consistency_score': round(regularity, 3) if regularity is not None else defaults['consistency_score'],
+        **windows
+    }
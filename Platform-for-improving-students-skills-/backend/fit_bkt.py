@@ -0,0 +1,93 @@
+"""
+Fit per-topic Bayesian knowledge tracing parameters
+Rebuilds each student's answer sequence per topic from the activity log
+(question_answered events) and the adaptive-test answer log, fits
+(init, learn, guess, slip) by maximum likelihood and stores them on the
+topics table. Topics with too few sequences keep the defaults.
+
+    python fit_bkt.py --min-sequences 20
+    python fit_bkt.py --dry-run
+"""
+import argparse
+import os
+import sys
+import time
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Fit per-topic BKT parameters from the SkillTwin database')
+    parser.add_argument('--min-sequences', type=int, default=20, help='students needed before a topic is fitted')
+    parser.add_argument('--max-length', type=int, default=200, help='answers used per sequence')
+    parser.add_argument('--dry-run', action='store_true', help='print the fitted parameters without saving them')
+    return parser.parse_args(argv)
+
+def load_sequences(app_module) -> dict[int, list[list[bool]]]:
+    """topic_id -> one ordered outcome list per student"""
+    db = app_module.db
+    StudentActivity, MockTest, TestAnswer, Question = \
+        app_module.StudentActivity, app_module.MockTest, app_module.TestAnswer, app_module.Question
+
+    # (student_id, topic_id, when, tiebreak, correct)
+    events = []
+    activities = db.session.query(StudentActivity.student_id, StudentActivity.created_at, StudentActivity.activity_metadata)\
+        .filter(StudentActivity.activity_type == 'question_answered')\
+        .yield_per(5000)
+    for student_id, created_at, metadata in activities:
+        metadata = metadata or {}
+        if metadata.get('topic_id') is None or 'correct' not in metadata:
+            continue
+        events.append((str(student_id), metadata['topic_id'], created_at, 0, bool(metadata['correct'])))
+
+    answers = db.session.query(MockTest.student_id, MockTest.started_at, TestAnswer.seq,
+                               TestAnswer.correct, Question.subject, Question.topic)\
+        .join(TestAnswer, TestAnswer.test_id == MockTest.id)\
+        .join(Question, Question.id == TestAnswer.question_id)\
+        .yield_per(5000)
+    for student_id, started_at, seq, correct, subject, topic in answers:
+        topic_id = app_module.topic_catalog.topic_id(subject, topic)
+        if topic_id is not None and started_at is not None:
+            events.append((str(student_id), topic_id, started_at, seq, bool(correct)))
+
+    events.sort(key=lambda e: (e[0], e[1], e[2], e[3]))
+    sequences: dict[int, dict[str, list[bool]]] = {}
+    for student_id, topic_id, _, _, correct in events:
+        sequences.setdefault(topic_id, {}).setdefault(student_id, []).append(correct)
+    return {topic_id: list(by_student.values()) for topic_id, by_student in sequences.items()}
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+    from knowledge_tracing import fit_bkt
+
+    with app_module.app.app_context():
+        sequences = load_sequences(app_module)
+        topics = {topic.id: topic for topic in app_module.Topic.query.all()}
+
+        fitted = 0
+        for topic_id, topic_sequences in sorted(sequences.items()):
+            topic = topics.get(topic_id)
+            if topic is None:
+                continue
+            label = f'{topic.subject}/{topic.topic_name}'
+            if len(topic_sequences) < args.min_sequences:
+                print(f'{label}: {len(topic_sequences)} sequences, keeping {tuple(topic.bkt_params())}')
+                continue
+
+            started = time.perf_counter()
+            params, loglik = fit_bkt(topic_sequences, max_length=args.max_length)
+            print(f'{label}: {len(topic_sequences)} sequences -> init={params.init} learn={params.learn} '
+                  f'guess={params.guess} slip={params.slip} (loglik/answer {loglik:.4f}, '
+                  f'{time.perf_counter() - started:.1f} s)')
+            topic.bkt_init, topic.bkt_learn, topic.bkt_guess, topic.bkt_slip = params
+            fitted += 1
+
+        if args.dry_run:
+            app_module.db.session.rollback()
+            print(f'Dry run: {fitted} topics fitted, nothing saved')
+        else:
+            app_module.db.session.commit()
+            print(f'Saved parameters for {fitted} topics')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
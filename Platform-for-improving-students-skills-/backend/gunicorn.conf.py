@@ -0,0 +1,17 @@
+"""
+Gunicorn settings for the API
+    gunicorn app:app        (gunicorn reads this file from the working directory)
+
+Each worker starts the paper analysis job runner as soon as it has loaded the app,
+so jobs queued or interrupted before a restart resume (and stale ones are recovered)
+without waiting for a request. The activity stream has its own server, see
+gunicorn_stream.conf.py.
+"""
+import os
+
+bind = os.getenv('API_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+
+def post_worker_init(worker):
+    from app import paper_jobs
+    paper_jobs.start()
@@ -0,0 +1,24 @@
+"""
+Gunicorn settings for the live activity stream (/api/stream/*)
+    gunicorn -c gunicorn_stream.conf.py app:app
+
+One gevent worker holds thousands of idle Server-Sent Events connections, each a
+greenlet parked on its subscription rather than a thread. The worker follows the
+student_activities table (SSE_RELAY_POLL_SECONDS), so it streams activities written
+by the API workers in other processes. Route /api/stream/ here and the rest of
+/api/ to the API server.
+"""
+import os
+
+# Read by app.py when the worker imports it
+os.environ.setdefault('SSE_RELAY_POLL_SECONDS', '1')
+
+bind = os.getenv('STREAM_BIND', '0.0.0.0:5001')
+worker_class = 'gevent'
+# Last-Event-ID replay lives in the worker's memory, so reconnects must reach the same one
+workers = 1
+worker_connections = int(os.getenv('STREAM_MAX_CONNECTIONS', 5000))
+
+def post_worker_init(worker):
+    from app import activity_relay
+    activity_relay.start()
@@ -0,0 +1,90 @@
+"""
+Background job runner
+A fixed pool of worker threads pulling jobs from a durable queue (a table).
+The queue itself is reached only through callbacks, so any number of
+processes can share it: claim_fn atomically takes the next queued job id
+(or returns None), run_fn executes it and records the outcome, and
+recover_fn periodically requeues jobs whose worker died. Workers sleep
+until notify() or the next poll, so an idle runner costs nothing.
+"""
+import threading
+import time
+
+class JobRunner:
+    """Bounded-concurrency consumer of a durable job queue"""
+
+    def __init__(self, claim_fn, run_fn, workers=2, poll_seconds=5.0, recover_fn=None, recover_seconds=60.0) -> None:
+        self.claim_fn = claim_fn
+        self.run_fn = run_fn
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.recover_fn = recover_fn
+        self.recover_seconds = recover_seconds
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._closed = False
+        self._last_recovery = None
+        self.stats = {'busy': 0, 'completed': 0, 'failed': 0}
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent)"""
+        if self._threads or self.workers <= 0:
+            return
+        with self._lock:
+            if self._threads or self._closed:
+                return
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'job-runner-{n}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self) -> None:
+        """A job was queued: wake idle workers (starting them if needed)"""
+        self.start()
+        self._wakeup.set()
+
+    def _recover(self) -> None:
+        if self.recover_fn is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._last_recovery is not None and now - self._last_recovery < self.recover_seconds:
+                return
+            self._last_recovery = now
+        try:
+            self.recover_fn()
+        except Exception as e:
+            print(f"Job recovery failed: {e}")
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._recover()
+            try:
+                job_id = self.claim_fn()
+            except Exception as e:
+                print(f"Job claim failed: {e}")
+                job_id = None
+            if job_id is None:
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+                continue
+            self.stats['busy'] += 1
+            try:
+                self.run_fn(job_id)
+                self.stats['completed'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                print(f"Job {job_id} failed: {e}")
+            finally:
+                self.stats['busy'] -= 1
+
+    def metrics(self) -> dict:
+        return {'workers': len(self._threads), **self.stats}
+
+    def close(self, timeout=5.0) -> None:
+        """Stop taking jobs; running jobs are left to finish or to recovery"""
+        self._closed = True
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
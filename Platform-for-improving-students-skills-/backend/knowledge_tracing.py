@@ -0,0 +1,115 @@
+"""
+Bayesian Knowledge Tracing
+Per student-topic mastery as P(skill known), updated in constant time per
+answer, plus a NumPy maximum-likelihood fitter for per-topic parameters.
+
+Parameters per topic (all probabilities):
+    init   P(known) before the first answer
+    learn  P(unknown -> known) after each practice opportunity
+    guess  P(correct | unknown)
+    slip   P(wrong | known)
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+class BKTParams(NamedTuple):
+    init: float
+    learn: float
+    guess: float
+    slip: float
+
+DEFAULT_BKT = BKTParams(init=0.3, learn=0.1, guess=0.2, slip=0.1)
+
+# Keep guess/slip below 0.5 so "known" stays the state that predicts correct answers
+MAX_GUESS = 0.45
+MAX_SLIP = 0.45
+
+def bkt_update(p_known, correct, params) -> float:
+    """Posterior P(known) after one observed answer, then one learning transition"""
+    _, learn, guess, slip = params
+    if correct:
+        evidence = p_known * (1 - slip)
+        posterior = evidence / (evidence + (1 - p_known) * guess)
+    else:
+        evidence = p_known * slip
+        posterior = evidence / (evidence + (1 - p_known) * (1 - guess))
+    return posterior + (1 - posterior) * learn
+
+def bkt_replay(p_known, outcomes, params) -> float:
+    """Apply a sequence of answers in order"""
+    for correct in outcomes:
+        p_known = bkt_update(p_known, correct, params)
+    return p_known
+
+def p_correct(p_known, params) -> float:
+    """Predicted probability that the next answer is correct"""
+    return p_known * (1 - params.slip) + (1 - p_known) * params.guess
+
+# ============ OFFLINE FITTING ============
+def pad_sequences(sequences, max_length=200) -> tuple[np.ndarray, np.ndarray]:
+    """Ragged 0/1 answer sequences -> (outcomes, mask) matrices, truncated to max_length"""
+    length = min(max_length, max((len(s) for s in sequences), default=0))
+    outcomes = np.zeros((len(sequences), length), dtype=bool)
+    mask = np.zeros((len(sequences), length), dtype=bool)
+    for i, seq in enumerate(sequences):
+        seq = seq[:length]
+        outcomes[i, :len(seq)] = seq
+        mask[i, :len(seq)] = True
+    return outcomes, mask
+
+def log_likelihood(outcomes, mask, grid) -> np.ndarray:
+    """Log-likelihood of all sequences under every parameter row of grid (k x 4)"""
+    init, learn, guess, slip = (grid[:, i:i + 1] for i in range(4))
+    p = np.broadcast_to(init, (len(grid), len(outcomes))).copy()
+    total = np.zeros(len(grid))
+    for t in range(outcomes.shape[1]):
+        observed, active = outcomes[:, t], mask[:, t]
+        correct_prob = p * (1 - slip) + (1 - p) * guess
+        likelihood = np.where(observed, correct_prob, 1 - correct_prob)
+        total += np.log(np.clip(likelihood, 1e-12, None)) @ active
+        posterior = np.where(observed, p * (1 - slip) / correct_prob, p * slip / (1 - correct_prob))
+        p = np.where(active, posterior + (1 - posterior) * learn, p)
+    return total
+
+def _grid(centre=None, step=None) -> np.ndarray:
+    if centre is None:
+        axes = [
+            np.linspace(0.05, 0.9, 6),          # init
+            np.linspace(0.02, 0.4, 6),          # learn
+            np.linspace(0.05, MAX_GUESS, 5),    # guess
+            np.linspace(0.02, MAX_SLIP, 5)      # slip
+        ]
+    else:
+        bounds = [(0.01, 0.99), (0.001, 0.6), (0.01, MAX_GUESS), (0.01, MAX_SLIP)]
+        axes = [np.clip(np.linspace(c - s, c + s, 5), lo, hi) for c, s, (lo, hi) in zip(centre, step, bounds)]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    return np.unique(np.stack([m.ravel() for m in mesh], axis=1), axis=0)
+
+def fit_bkt(sequences, max_length=200, chunk=2000, refinements=3) -> tuple[BKTParams, float]:
+    """Maximum-likelihood BKT parameters by coarse grid search plus local refinement
+
+    sequences: per-student lists of 0/1 outcomes for one topic, in answer order.
+    Returns (params, mean log-likelihood per answer).
+    """
+    outcomes, mask = pad_sequences(sequences, max_length)
+    answers = int(mask.sum())
+    if not answers:
+        return DEFAULT_BKT, 0.0
+
+    def score(grid):
+        total = np.zeros(len(grid))
+        for start in range(0, len(outcomes), chunk):
+            total += log_likelihood(outcomes[start:start + chunk], mask[start:start + chunk], grid)
+        return total
+
+    grid = _grid()
+    scores = score(grid)
+    best = grid[np.argmax(scores)]
+    step = np.array([0.06, 0.03, 0.04, 0.04])
+    for _ in range(refinements):
+        grid = _grid(best, step)
+        scores = score(grid)
+        best = grid[np.argmax(scores)]
+        step = step / 2
+    return BKTParams(*(round(float(v), 4) for v in best)), float(scores.max() / answers)
@@ -0,0 +1,153 @@
+"""
+Lightweight schema migrations
+db.create_all() only creates missing tables; these steps bring existing
+databases up to date (new columns, indexes) and are recorded in
+schema_migrations so each runs once.
+"""
+from datetime import date, datetime
+from sqlalchemy import inspect, text
+
+def _literal_default(column):
+    """SQL literal for a column's scalar Python default, if it has one"""
+    default = column.default
+    if default is None or not default.is_scalar:
+        return None
+    value = default.arg
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return None
+
+def add_missing_columns(conn, metadata) -> None:
+    """ALTER TABLE ADD COLUMN for model columns missing from existing tables"""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {c['name'] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present or column.primary_key:
+                continue
+            ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}'
+            default = _literal_default(column)
+            if default is not None:
+                ddl += f' DEFAULT {default}'
+                if not column.nullable:
+                    ddl += ' NOT NULL'
+            conn.execute(text(ddl))
+
+def merge_duplicate_performance(conn, metadata) -> None:
+    """Fold duplicate (student_id, topic_id) performance rows into one before adding uniqueness"""
+    duplicates = conn.execute(text(
+        'SELECT student_id, topic_id FROM student_performance '
+        'GROUP BY student_id, topic_id HAVING COUNT(*) > 1'
+    )).fetchall()
+    for student_id, topic_id in duplicates:
+        rows = conn.execute(text(
+            'SELECT id, questions_attempted, questions_correct, total_time_spent FROM student_performance '
+            'WHERE student_id = :student_id AND topic_id = :topic_id ORDER BY id'
+        ), {'student_id': student_id, 'topic_id': topic_id}).fetchall()
+        keep = rows[0][0]
+        attempted = sum(r[1] or 0 for r in rows)
+        correct = sum(r[2] or 0 for r in rows)
+        time_spent = sum(r[3] or 0 for r in rows)
+        conn.execute(text(
+            'UPDATE student_performance SET questions_attempted = :attempted, questions_correct = :correct, '
+            'total_time_spent = :time_spent, mastery_score = :mastery WHERE id = :id'
+        ), {
+            'attempted': attempted,
+            'correct': correct,
+            'time_spent': time_spent,
+            'mastery': round(correct / attempted * 100, 2) if attempted else 0,
+            'id': keep
+        })
+        conn.execute(text(
+            'DELETE FROM student_performance WHERE student_id = :student_id AND topic_id = :topic_id AND id != :id'
+        ), {'student_id': student_id, 'topic_id': topic_id, 'id': keep})
+
+def create_missing_indexes(conn, metadata) -> None:
+    """Create every index declared on the models that the database does not have yet"""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+def add_hot_path_indexes(conn, metadata) -> None:
+    if 'student_performance' in inspect(conn).get_table_names():
+        merge_duplicate_performance(conn, metadata)
+    create_missing_indexes(conn, metadata)
+
+def backfill_daily_activity(conn, metadata) -> None:
+    """Build student_daily_activity rows from the activity history recorded before rollups existed"""
+    rollups = metadata.tables['student_daily_activity']
+    if conn.execute(text('SELECT 1 FROM student_daily_activity LIMIT 1')).first():
+        return
+    totals = {}
+    result = conn.execute(text(
+        'SELECT student_id, created_at, activity_type, duration FROM student_activities WHERE student_id IS NOT NULL'
+    ))
+    for student_id, created_at, activity_type, duration in result:
+        if created_at is None:
+            continue
+        # SQLite hands back text; the first ten characters are the date either way
+        day = date.fromisoformat(str(created_at)[:10])
+        counters = totals.setdefault((student_id, day), [0, 0, 0, 0])
+        counters[0] += 1
+        counters[1] += int(duration or 0)
+        counters[2] += activity_type == 'test_completed'
+        counters[3] += activity_type == 'question_answered'
+    rows = [{
+        'student_id': student_id,
+        'day': day,
+        'activity_count': count,
+        'total_duration': duration,
+        'tests_completed': tests,
+        'questions_answered': questions
+    } for (student_id, day), (count, duration, tests, questions) in totals.items()]
+    for start in range(0, len(rows), 5000):
+        conn.execute(rollups.insert(), rows[start:start + 5000])
+
+def add_keyset_indexes(conn, metadata) -> None:
+    """Swap the (student_id, time) history indexes for (student_id, time, id) used by cursor paging"""
+    create_missing_indexes(conn, metadata)
+    for name in ('ix_student_activities_student_created', 'ix_mock_tests_student_started'):
+        conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+
+# (version, description, step) -- append only, never renumber
+MIGRATIONS = [
+    (1, 'Add IRT item parameters and answer-log columns', add_missing_columns),
+    (2, 'Composite indexes for student-scoped hot queries', add_hot_path_indexes),
+    (3, 'Index users.class_level for cohort analytics', create_missing_indexes),
+    (4, 'Per-topic knowledge tracing parameters', add_missing_columns),
+    (5, 'Backfill daily activity rollups', backfill_daily_activity),
+    (6, 'Keyset pagination indexes for activity and test history', add_keyset_indexes),
+    (7, 'Content hashes for shared paper analyses', add_missing_columns),
+    (8, 'Topic synonyms for the paper topic classifier', add_missing_columns),
+    (9, 'Retry delay for paper jobs', add_missing_columns),
+]
+
+def run_migrations(engine, metadata) -> list[int]:
+    """Apply pending migrations in order; returns the versions applied"""
+    applied_now = []
+    with engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE IF NOT EXISTS schema_migrations ('
+            'version INTEGER PRIMARY KEY, description VARCHAR(255), applied_at TIMESTAMP)'
+        ))
+        applied = {row[0] for row in conn.execute(text('SELECT version FROM schema_migrations'))}
+        for version, description, step in MIGRATIONS:
+            if version in applied:
+                continue
+            step(conn, metadata)
+            conn.execute(text(
+                'INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)'
+            ), {'v': version, 'd': description, 't': datetime.utcnow()})
+            applied_now.append(version)
+    return applied_now
@@ -0,0 +1,148 @@
+"""
+Predictor model registry
+Loads joblib-serialized predictor artifacts lazily (once per worker process)
+and hot-swaps them when the active version pointer changes on disk.
+
+Layout of MODEL_DIR:
+    predictor-<version>.joblib   artifact: {'model', 'features', 'version', ...}
+    ACTIVE                       text file holding the version to serve
+"""
+import os
+import re
+import threading
+import time
+import numpy as np
+
+# Column order of the feature matrix every predictor receives
+PREDICTOR_FEATURES = (
+    'average_mastery',
+    'engagement_score',
+    'average_quiz_score',
+    'consistency_score',
+    'total_study_time'
+)
+
+def feature_row(student_data) -> list[float]:
+    """Feature dict -> row in PREDICTOR_FEATURES order"""
+    return [float(student_data.get(name, 0) or 0) for name in PREDICTOR_FEATURES]
+
+# Versions become file names, and artifacts are pickles: never let one name a path outside MODEL_DIR
+VERSION_PATTERN = re.compile(r'[\w.-]{1,100}')
+
+def valid_version(version) -> bool:
+    return isinstance(version, str) and VERSION_PATTERN.fullmatch(version) is not None
+
+def artifact_path(model_dir, version) -> str:
+    if not valid_version(version):
+        raise ValueError(f'Invalid predictor version {version!r}')
+    return os.path.join(model_dir, f'predictor-{version}.joblib')
+
+class SklearnPredictor:
+    """Adapts a fitted scikit-learn regressor to the predictor interface"""
+
+    def __init__(self, artifact) -> None:
+        self.model = artifact['model']
+        self.version = artifact['version']
+        self.features = tuple(artifact.get('features', PREDICTOR_FEATURES))
+        self.interval = float(artifact.get('interval', 5.0))
+        self.confidence = float(artifact.get('confidence', 85.0))
+        self._columns = [PREDICTOR_FEATURES.index(name) for name in self.features]
+
+    def predict_batch(self, features) -> dict[str, np.ndarray]:
+        predicted_score = np.clip(self.model.predict(features[:, self._columns]), 0, 100)
+        return {
+            'predicted_score': np.round(predicted_score, 1),
+            'interval_low': np.round(predicted_score - self.interval, 1),
+            'interval_high': np.round(predicted_score + self.interval, 1),
+            'confidence': np.full(predicted_score.shape, round(self.confidence, 1))
+        }
+
+    def predict(self, student_data):
+        scores = self.predict_batch(np.array([feature_row(student_data)]))
+        return {
+            'predicted_score': float(scores['predicted_score'][0]),
+            'confidence_interval': [float(scores['interval_low'][0]), float(scores['interval_high'][0])],
+            'confidence': float(scores['confidence'][0])
+        }
+
+class ModelRegistry:
+    """Serves the active predictor, falling back to a built-in model when no artifact exists"""
+
+    def __init__(self, model_dir, fallback, check_interval=5.0) -> None:
+        self.model_dir = model_dir
+        self.fallback = fallback
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._model = None
+        self._pointer_mtime = None
+        self._next_check = 0.0
+
+    def _pointer_path(self) -> str:
+        return os.path.join(self.model_dir, 'ACTIVE')
+
+    def _read_pointer(self):
+        """(version, mtime) of the ACTIVE pointer, or (None, None) if absent"""
+        try:
+            path = self._pointer_path()
+            mtime = os.stat(path).st_mtime_ns
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read().strip() or None, mtime
+        except OSError:
+            return None, None
+
+    def _load(self, version):
+        # Deferred so API startup never pays for importing joblib/scikit-learn
+        import joblib
+        artifact = joblib.load(artifact_path(self.model_dir, version))
+        artifact.setdefault('version', version)
+        return SklearnPredictor(artifact)
+
+    def get(self):
+        """Active predictor; re-checks the pointer at most every check_interval seconds"""
+        now = time.monotonic()
+        if self._model is not None and now < self._next_check:
+            return self._model
+        with self._lock:
+            if self._model is not None and now < self._next_check:
+                return self._model
+            self._next_check = now + self.check_interval
+            version, mtime = self._read_pointer()
+            if self._model is None or mtime != self._pointer_mtime:
+                self._pointer_mtime = mtime
+                current = getattr(self._model, 'version', None)
+                if version is None:
+                    self._model = self.fallback
+                elif version != current:
+                    try:
+                        self._model = self._load(version)
+                    except Exception as e:
+                        print(f"Failed to load predictor {version}: {e}")
+                        if self._model is None:
+                            self._model = self.fallback
+            return self._model
+
+    def activate(self, version):
+        """Point ACTIVE at an existing artifact and load it immediately"""
+        if not valid_version(version):
+            raise ValueError(f'Invalid predictor version {version!r}')
+        if version not in self.versions():
+            raise FileNotFoundError(f'No artifact for predictor version {version}')
+        model = self._load(version)
+        os.makedirs(self.model_dir, exist_ok=True)
+        tmp_path = self._pointer_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(tmp_path, self._pointer_path())
+        with self._lock:
+            self._model = model
+            self._pointer_mtime = self._read_pointer()[1]
+            self._next_check = time.monotonic() + self.check_interval
+        return model
+
+    def versions(self) -> list[str]:
+        try:
+            names = os.listdir(self.model_dir)
+        except OSError:
+            return []
+        return sorted(n[len('predictor-'):-len('.joblib')] for n in names
+                      if n.startswith('predictor-') and n.endswith('.joblib'))
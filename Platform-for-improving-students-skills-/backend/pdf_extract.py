@@ -0,0 +1,214 @@
+"""
+Paper text extraction
+Extracts text from uploaded PDFs page by page with PyPDF2 in a separate
+worker process, so parsing never runs (or hangs) on a web worker:
+
+- at most `workers` documents are extracted at once (a bounded pool of
+  extraction slots; callers wait up to slot_timeout for one)
+- each page must arrive within page_timeout; a stuck worker is killed and
+  a fresh one resumes at the next page
+- the worker's address space may grow by at most memory_mb (POSIX)
+- documents are cut off after max_pages, and page text after max_page_chars
+- pages are streamed back one at a time, so callers can fold each page
+  into running results and drop its text
+
+A dedicated process per document (rather than a shared executor) is what
+makes the page timeout enforceable: a hung task can be terminated without
+taking other documents down with it. Workers are never plain fork()s of the
+server, whose write-buffer, job and SSE threads may hold locks (logging,
+connection pool) at that moment: they come from a forkserver (started once
+from a fresh interpreter), or are spawned where that is unavailable.
+"""
+import multiprocessing
+import os
+import threading
+from typing import NamedTuple
+
+try:
+    import resource
+except ImportError:  # Windows: no address-space limit
+    resource = None
+
+# Plain-text uploads are read in-process in chunks of about this many characters
+TEXT_CHUNK_CHARS = 64 * 1024
+
+def _worker_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+class PageText(NamedTuple):
+    number: int           # 1-based page (or chunk) number
+    text: str | None      # None when the page failed
+    error: str | None = None
+
+class ExtractionError(Exception):
+    """The document could not be read at all"""
+
+class ExtractorBusy(ExtractionError):
+    """No extraction slot became free in time"""
+
+def _limit_memory(extra_bytes) -> None:
+    """Cap the address space at its current size plus extra_bytes"""
+    if resource is None or not extra_bytes:
+        return
+    try:
+        with open('/proc/self/statm') as statm:
+            current = int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = current + extra_bytes
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (OSError, ValueError):
+        pass
+
+def _extract_worker(path, start, max_pages, max_page_chars, memory_bytes, conn) -> None:
+    """Child process: send ('pages', total), then ('page', index, text | None, error) per page"""
+    _limit_memory(memory_bytes)
+    try:
+        from PyPDF2 import PdfReader
+        reader = PdfReader(path)
+        total = len(reader.pages)
+    except Exception as e:
+        conn.send(('failed', f'{type(e).__name__}: {e}'))
+        conn.close()
+        return
+    conn.send(('pages', total))
+    for index in range(start, min(total, max_pages)):
+        try:
+            text = (reader.pages[index].extract_text() or '')[:max_page_chars]
+            conn.send(('page', index, text, None))
+        except MemoryError:
+            conn.send(('page', index, None, 'memory limit exceeded'))
+        except Exception as e:
+            conn.send(('page', index, None, f'{type(e).__name__}: {e}'))
+    conn.send(('done',))
+    conn.close()
+
+class Extraction:
+    """Iterable of PageText for one document; counters are filled in while iterating"""
+
+    def __init__(self, extractor, path) -> None:
+        self.extractor = extractor
+        self.path = path
+        self.page_count = None    # pages in the document (PDF only)
+        self.pages_read = 0
+        self.failed_pages: list[int] = []
+        self.truncated = False
+
+    def summary(self) -> dict:
+        return {
+            'page_count': self.page_count,
+            'pages_read': self.pages_read,
+            'failed_pages': self.failed_pages[:50],
+            'truncated': self.truncated
+        }
+
+    def __iter__(self):
+        if self.path.lower().endswith('.txt'):
+            yield from self._text_chunks()
+        else:
+            yield from self._pdf_pages()
+
+    def _record(self, page) -> PageText:
+        self.pages_read += 1
+        if page.error is not None:
+            self.failed_pages.append(page.number)
+        return page
+
+    def _text_chunks(self):
+        extractor = self.extractor
+        number, buffered, size = 0, [], 0
+        with open(self.path, encoding='utf-8', errors='replace') as handle:
+            for line in handle:
+                buffered.append(line[:extractor.max_page_chars])
+                size += len(buffered[-1])
+                if size >= TEXT_CHUNK_CHARS:
+                    number += 1
+                    yield self._record(PageText(number, ''.join(buffered)))
+                    buffered, size = [], 0
+                    if number >= extractor.max_pages:
+                        self.truncated = bool(handle.readline())
+                        return
+        if buffered:
+            yield self._record(PageText(number + 1, ''.join(buffered)))
+
+    def _pdf_pages(self):
+        extractor = self.extractor
+        if not extractor.slots.acquire(timeout=extractor.slot_timeout):
+            raise ExtractorBusy('All PDF extraction workers are busy, try again shortly')
+        try:
+            start = 0
+            while True:
+                outcome = yield from self._run_worker(start)
+                if outcome is None:
+                    break
+                start = outcome  # worker killed or crashed on page `outcome - 1`
+            if self.page_count is not None and self.page_count > extractor.max_pages:
+                self.truncated = True
+        finally:
+            extractor.slots.release()
+
+    def _run_worker(self, start):
+        """Stream pages from one worker; returns None when done, or the page to resume at"""
+        extractor = self.extractor
+        context = _worker_context()
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_extract_worker,
+            args=(self.path, start, extractor.max_pages, extractor.max_page_chars, extractor.memory_bytes, sender),
+            daemon=True
+        )
+        process.start()
+        sender.close()
+        expected = start
+        try:
+            while True:
+                if not receiver.poll(extractor.page_timeout):
+                    if self.page_count is None:
+                        raise ExtractionError('Timed out opening the PDF')
+                    yield self._record(PageText(expected + 1, None, 'timeout'))
+                    return expected + 1
+                try:
+                    message = receiver.recv()
+                except EOFError:
+                    # Worker died (e.g. hit the memory cap outside the per-page handler)
+                    if self.page_count is None:
+                        raise ExtractionError(f'PDF worker exited with code {process.exitcode}')
+                    if expected >= min(self.page_count, extractor.max_pages):
+                        return None
+                    yield self._record(PageText(expected + 1, None, 'worker exited'))
+                    return expected + 1
+                kind = message[0]
+                if kind == 'failed':
+                    raise ExtractionError(f'Unreadable PDF: {message[1]}')
+                if kind == 'pages':
+                    self.page_count = message[1]
+                elif kind == 'page':
+                    _, index, text, error = message
+                    expected = index + 1
+                    yield self._record(PageText(index + 1, text, error))
+                else:
+                    return None
+        finally:
+            receiver.close()
+            if process.is_alive():
+                process.terminate()
+            process.join(timeout=5)
+
+class PdfExtractor:
+    """Bounded, timeout-enforcing page extractor (thread-safe; share one per process)"""
+
+    def __init__(self, workers=2, page_timeout=10.0, max_pages=300, memory_mb=512,
+                 max_page_chars=100_000, slot_timeout=30.0) -> None:
+        self.workers = workers
+        self.page_timeout = page_timeout
+        self.max_pages = max_pages
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.max_page_chars = max_page_chars
+        self.slot_timeout = slot_timeout
+        self.slots = threading.BoundedSemaphore(workers)
+
+    def extract(self, path) -> Extraction:
+        """Pages of a .pdf (worker process) or chunks of a .txt (read in place) as an iterable"""
+        return Extraction(self, path)
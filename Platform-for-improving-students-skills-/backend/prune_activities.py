@@ -0,0 +1,37 @@
+"""
+Prune old student activities
+Deletes student_activities rows older than the retention window
+(ACTIVITY_RETENTION_DAYS, default 180). Streaks, weekly goals and daily
+history are served from student_daily_activity, which is kept. Meant to
+run nightly from cron:
+
+    30 2 * * * cd /path/to/backend && python prune_activities.py
+"""
+import argparse
+import os
+import sys
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Delete raw activities older than the retention window')
+    parser.add_argument('--retention-days', type=int, help='override ACTIVITY_RETENTION_DAYS')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows deleted and committed per batch')
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+
+    with app_module.app.app_context():
+        # Migrations first, so rollups are backfilled before any history is deleted
+        app_module.init_schema()
+        retention_days = args.retention_days
+        if retention_days is None:
+            retention_days = app_module.app.config['ACTIVITY_RETENTION_DAYS']
+        deleted = app_module.prune_activities(retention_days, batch_size=args.batch_size)
+
+    print(f'Deleted {deleted} activities older than {retention_days} days')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
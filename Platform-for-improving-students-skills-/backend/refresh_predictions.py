@@ -0,0 +1,36 @@
+"""
+Refresh prediction snapshots
+Recomputes prediction_snapshot rows for students marked dirty by
+/api/performance/update or a completed test (and for snapshots scored by a
+model version that is no longer active). Meant to run nightly from cron:
+
+    0 2 * * * cd /path/to/backend && python refresh_predictions.py
+"""
+import argparse
+import os
+import sys
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Recompute prediction snapshots for dirty students')
+    parser.add_argument('--all', action='store_true', help='recompute every student, not just dirty ones')
+    parser.add_argument('--chunk-size', type=int, default=500, help='students scored and committed per batch')
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+
+    with app_module.app.app_context():
+        app_module.init_schema()
+        student_ids = None
+        if args.all:
+            student_ids = [sid for (sid,) in app_module.db.session.query(app_module.Student.student_id)]
+        result = app_module.refresh_prediction_snapshots(student_ids, chunk_size=args.chunk_size)
+
+    print(f"Refreshed {result['refreshed']} snapshots with model {result['model_version']} "
+          f"in {result['seconds']:.2f} s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Keyword-automaton topic classifier
+Scores a paper's text against every topic in one pass. Each topic
+contributes weighted phrases (its name, synonyms and key phrases from its
+description); all phrases are compiled into a single Aho–Corasick automaton
+over word tokens, so scanning costs one dictionary step per word however
+many topics and phrases there are.
+
+Weights per phrase:
+    name         3.0
+    synonym      2.0
+    description  1.0
+A phrase shared by several topics splits its weight between them. Subject
+names count towards subject detection only.
+"""
+import hashlib
+import json
+import re
+from collections import deque
+from typing import NamedTuple
+
+NAME_WEIGHT = 3.0
+SYNONYM_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+TOKEN = re.compile(r'\w+')
+# Description clauses: "Heat engines, entropy and the laws of thermodynamics"
+CLAUSE_BREAK = re.compile(r'[,;:.()\n]|\band\b|\bor\b', re.IGNORECASE)
+STOPWORDS = frozenset((
+    'a', 'an', 'the', 'of', 'in', 'on', 'to', 'for', 'with', 'by', 'from', 'at', 'as',
+    'is', 'are', 'its', 'their', 'this', 'that', 'basic', 'introduction', 'concepts', 'topics'
+))
+MAX_PHRASE_WORDS = 4
+
+class TopicTerms(NamedTuple):
+    subject: str
+    name: str
+    synonyms: tuple[str, ...] = ()
+    description: str | None = None
+
+def tokens(text) -> list[str]:
+    return TOKEN.findall(text.casefold())
+
+def description_phrases(description) -> list[str]:
+    """Short noun-phrase-like clauses of a description, without leading/trailing stopwords"""
+    phrases = []
+    for clause in CLAUSE_BREAK.split(description or ''):
+        words = tokens(clause)
+        while words and words[0] in STOPWORDS:
+            words.pop(0)
+        while words and words[-1] in STOPWORDS:
+            words.pop()
+        if not words or len(words) > MAX_PHRASE_WORDS:
+            continue
+        if len(words) == 1 and len(words[0]) < 4:
+            continue
+        phrases.append(' '.join(words))
+    return phrases
+
+class TopicScan:
+    """Running scores for one document; feed() it page by page"""
+
+    def __init__(self, classifier) -> None:
+        self.classifier = classifier
+        self.topic_scores = [0.0] * len(classifier.topics)
+        self.subject_mentions: dict[str, float] = {}
+        self.words = 0
+        self._state = 0
+
+    def feed(self, text) -> None:
+        classifier = self.classifier
+        goto, fail, output, vocabulary = classifier._goto, classifier._fail, classifier._output, classifier._vocabulary
+        scores, mentions = self.topic_scores, self.subject_mentions
+        state = self._state
+        words = tokens(text)
+        self.words += len(words)
+        for word in words:
+            if word not in vocabulary:
+                state = 0  # no phrase contains this word, so every partial match dies here
+                continue
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for target, weight in output[state]:
+                if isinstance(target, int):
+                    scores[target] += weight
+                else:
+                    mentions[target] = mentions.get(target, 0.0) + weight
+        self._state = state
+
+    def topic_weights(self) -> dict[TopicTerms, float]:
+        """Matched topics with their share of the total score (percent), highest first"""
+        total = sum(self.topic_scores)
+        if not total:
+            return {}
+        ranked = sorted(
+            ((topic, score) for topic, score in zip(self.classifier.topics, self.topic_scores) if score),
+            key=lambda item: -item[1]
+        )
+        return {topic: round(score / total * 100, 1) for topic, score in ranked}
+
+    def subject_scores(self) -> dict[str, float]:
+        """Topic scores summed per subject, plus direct mentions of the subject name"""
+        scores = dict(self.subject_mentions)
+        for topic, score in zip(self.classifier.topics, self.topic_scores):
+            if score:
+                scores[topic.subject] = scores.get(topic.subject, 0.0) + score
+        return scores
+
+    def subject(self, default) -> str:
+        scores = self.subject_scores()
+        return max(scores, key=scores.get) if scores else default
+
+class TopicClassifier:
+    """Aho–Corasick automaton over word tokens (immutable; safe to share between threads)"""
+
+    def __init__(self, topics) -> None:
+        self.topics: list[TopicTerms] = list(topics)
+        # Identifies the vocabulary across processes, so stored classifications can be keyed on it
+        self.signature = hashlib.sha256(json.dumps(self.topics, sort_keys=True).encode()).hexdigest()[:16]
+        patterns: dict[tuple[str, ...], dict] = {}
+
+        def add(phrase, target, weight) -> None:
+            words = tuple(tokens(phrase))
+            if words:
+                targets = patterns.setdefault(words, {})
+                # Strongest source wins when a topic lists the same phrase twice
+                targets[target] = max(targets.get(target, 0.0), weight)
+
+        for index, topic in enumerate(self.topics):
+            add(topic.name, index, NAME_WEIGHT)
+            for synonym in topic.synonyms:
+                add(synonym, index, SYNONYM_WEIGHT)
+            for phrase in description_phrases(topic.description):
+                add(phrase, index, DESCRIPTION_WEIGHT)
+        for subject in {topic.subject for topic in self.topics}:
+            add(subject, subject, 1.0)
+        self.pattern_count = len(patterns)
+
+        self._goto: list[dict[str, int]] = [{}]
+        self._output: list[tuple] = [()]
+        for words, targets in patterns.items():
+            state = 0
+            for word in words:
+                next_state = self._goto[state].get(word)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][word] = next_state
+                    self._goto.append({})
+                    self._output.append(())
+                state = next_state
+            topic_targets = [target for target in targets if isinstance(target, int)]
+            self._output[state] = tuple(
+                (target, weight / len(topic_targets) if isinstance(target, int) else weight)
+                for target, weight in targets.items()
+            )
+        self._vocabulary = frozenset(word for words in patterns for word in words)
+
+        # Breadth-first failure links; outputs of suffix states are merged in
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(word, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def scan(self, text=None) -> TopicScan:
+        """Start a scan, optionally feeding a whole text at once"""
+        scan = TopicScan(self)
+        if text:
+            scan.feed(text)
+        return scan
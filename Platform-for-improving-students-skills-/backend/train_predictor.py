@@ -0,0 +1,79 @@
+"""
+Train a performance predictor artifact for the model registry
+Fits a scikit-learn regressor on per-student features against the average
+score of each student's completed tests and writes
+MODEL_DIR/predictor-<version>.joblib.
+
+    python train_predictor.py --version 2024-06-01 --activate
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Train a predictor artifact from the SkillTwin database')
+    parser.add_argument('--version', default=datetime.utcnow().strftime('%Y%m%d%H%M%S'))
+    parser.add_argument('--min-samples', type=int, default=20)
+    parser.add_argument('--activate', action='store_true', help='make the new artifact the served version')
+    return parser.parse_args(argv)
+
+def load_training_data(app_module):
+    """(X, y) with one row per student that has completed tests"""
+    from sqlalchemy import func
+    db, MockTest = app_module.db, app_module.MockTest
+
+    targets = db.session.query(MockTest.student_id, func.avg(MockTest.total_score))\
+        .filter(MockTest.completed_at.isnot(None), MockTest.total_score.isnot(None))\
+        .group_by(MockTest.student_id).all()
+
+    # Same feature pipeline the API scores with
+    X = app_module.build_feature_matrix([str(sid) for sid, _ in targets])
+    y = np.array([score for _, score in targets], dtype=float)
+    return X, y
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from model_registry import artifact_path, valid_version
+    if not valid_version(args.version):
+        print(f'Invalid version {args.version!r}: use letters, digits, ".", "_" or "-"')
+        return 2
+    import app as app_module
+    import joblib
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.model_selection import cross_val_score
+
+    with app_module.app.app_context():
+        X, y = load_training_data(app_module)
+
+    if len(y) < args.min_samples:
+        print(f'Only {len(y)} students with completed tests; need at least {args.min_samples}.')
+        return 1
+
+    model = GradientBoostingRegressor(n_estimators=200, max_depth=3, random_state=0)
+    cv_mae = -cross_val_score(model, X, y, cv=min(5, len(y)), scoring='neg_mean_absolute_error').mean()
+    model.fit(X, y)
+
+    model_dir = app_module.app.config['MODEL_DIR']
+    os.makedirs(model_dir, exist_ok=True)
+    path = artifact_path(model_dir, args.version)
+    joblib.dump({
+        'model': model,
+        'version': args.version,
+        'features': list(app_module.PREDICTOR_FEATURES),
+        'interval': round(float(cv_mae), 1),
+        'trained_at': datetime.utcnow().isoformat(),
+        'samples': len(y)
+    }, path)
+    print(f'Wrote {path} ({len(y)} samples, CV MAE {cv_mae:.2f})')
+
+    if args.activate:
+        app_module.model_registry.activate(args.version)
+        print(f'Activated predictor {args.version}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Write-behind buffer
+Coalesces high-frequency writes in process memory and hands them to a flush
+callback in batches: keyed counter increments are summed per key, append-only
+rows are kept in arrival order. A background thread flushes every flush_ms
+or as soon as max_events are pending; producers flush synchronously once the
+oldest pending event is older than max_lag_ms (e.g. while the database is
+unavailable), which bounds how much work can be lost on a crash.
+
+A failed flush never blocks the queue behind one bad event. Errors listed in
+transient_errors (connection loss, lock timeouts) put the whole batch back
+to be retried. Any other error splits the batch by key until the failing
+keys are isolated and flushes the rest; a key that fails on its own
+max_attempts times is moved to dead_letters. Producers never see another
+request's flush error: add() only raises BufferFull once max_depth events
+are pending.
+"""
+import threading
+import time
+from collections import deque
+
+class BufferFull(RuntimeError):
+    """Too many events pending (the writer is failing); the caller should back off"""
+
+class WriteBuffer:
+    """Thread-safe coalescing buffer feeding flush_fn(increments, rows)"""
+
+    def __init__(self, flush_fn, flush_ms=200, max_events=500, max_lag_ms=2000, max_depth=None,
+                 transient_errors=(), max_attempts=3, dead_letter_size=1000) -> None:
+        self.flush_fn = flush_fn
+        self.flush_interval = flush_ms / 1000.0
+        self.max_events = max_events
+        self.max_lag = max_lag_ms / 1000.0
+        self.max_depth = max_depth if max_depth is not None else max_events * 100
+        self.transient_errors = tuple(transient_errors)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._increments: dict[tuple, list] = {}
+        self._counts: dict[tuple, int] = {}   # events per key
+        self._rows: list[tuple] = []          # (key, row) in arrival order
+        self._events = 0
+        self._oldest = None
+        self._failures: dict[tuple, int] = {}  # key -> flushes it failed on its own
+        self._thread = None
+        self._closed = False
+        self.dead_letters = deque(maxlen=dead_letter_size)
+        self.stats = {'flushes': 0, 'flushed_events': 0, 'failed_flushes': 0, 'dead_lettered': 0, 'last_flush_ms': 0.0}
+
+    # ---- producer side ----
+    def add(self, key, increments, row=None) -> int:
+        """Queue counter increments for key (and an optional row); returns the buffer depth"""
+        oldest = self._oldest
+        if oldest is not None and time.monotonic() - oldest >= self.max_lag:
+            # The writer is behind (or failing): try to flush before accepting more
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Write buffer flush failed ({self._events} events kept): {e}")
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('write buffer is closed')
+            if self._events >= self.max_depth:
+                raise BufferFull(f'{self._events} writes pending')
+            totals = self._increments.get(key)
+            if totals is None:
+                self._increments[key] = list(increments)
+            else:
+                for i, value in enumerate(increments):
+                    totals[i] += value
+            self._counts[key] = self._counts.get(key, 0) + 1
+            if row is not None:
+                self._rows.append((key, row))
+            self._events += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            depth = self._events
+        self._ensure_thread()
+        if depth >= self.max_events:
+            self._wakeup.set()
+        return depth
+
+    def depth(self) -> int:
+        """Events accepted but not yet flushed"""
+        return self._events
+
+    def lag_ms(self) -> float:
+        oldest = self._oldest
+        return round((time.monotonic() - oldest) * 1000, 1) if oldest is not None else 0.0
+
+    def metrics(self) -> dict:
+        return {
+            'depth': self.depth(),
+            'pending_keys': len(self._increments),
+            'lag_ms': self.lag_ms(),
+            'dead_letters': len(self.dead_letters),
+            **self.stats
+        }
+
+    # ---- flushing ----
+    def _take(self):
+        with self._lock:
+            batch = (self._increments, self._counts, self._rows)
+            oldest = self._oldest
+            self._increments, self._counts, self._rows, self._events, self._oldest = {}, {}, [], 0, None
+        return batch, oldest
+
+    def _restore(self, keys, batch, oldest) -> None:
+        """Put the unwritten keys of a batch back in front of anything queued since"""
+        increments, counts, rows = batch
+        keys = set(keys)
+        with self._lock:
+            restored = {key: increments[key] for key in increments if key in keys}
+            for key, values in self._increments.items():
+                totals = restored.get(key)
+                if totals is None:
+                    restored[key] = values
+                else:
+                    for i, value in enumerate(values):
+                        totals[i] += value
+            for key in keys:
+                self._counts[key] = self._counts.get(key, 0) + counts[key]
+                self._events += counts[key]
+            self._increments = restored
+            self._rows = [(key, row) for key, row in rows if key in keys] + self._rows
+            self._oldest = oldest if self._oldest is None else min(oldest, self._oldest)
+
+    def _write(self, keys, batch) -> None:
+        increments, _, rows = batch
+        if len(keys) == len(increments):
+            self.flush_fn(increments, [row for _, row in rows])
+        else:
+            keys = set(keys)
+            self.flush_fn({key: increments[key] for key in keys},
+                          [row for key, row in rows if key in keys])
+
+    def flush(self) -> int:
+        """Flush everything pending now; returns the number of events written
+
+        Raises only for transient errors, after putting the batch back.
+        """
+        with self._flush_lock:
+            batch, oldest = self._take()
+            increments, counts, rows = batch
+            if not increments:
+                return 0
+            started = time.perf_counter()
+            written = 0
+            pending = [list(increments)]
+            while pending:
+                keys = pending.pop()
+                try:
+                    self._write(keys, batch)
+                except self.transient_errors:
+                    self.stats['failed_flushes'] += 1
+                    self._restore([key for part in pending for key in part] + keys, batch, oldest)
+                    raise
+                except Exception as e:
+                    self.stats['failed_flushes'] += 1
+                    if len(keys) > 1:
+                        # Bisect until the keys that fail are on their own
+                        middle = len(keys) // 2
+                        pending += [keys[middle:], keys[:middle]]
+                        continue
+                    self._failed_alone(keys[0], batch, oldest, e)
+                    continue
+                for key in keys:
+                    self._failures.pop(key, None)
+                written += sum(counts[key] for key in keys)
+            self.stats['flushes'] += 1
+            self.stats['flushed_events'] += written
+            self.stats['last_flush_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            return written
+
+    def _failed_alone(self, key, batch, oldest, error) -> None:
+        """Retry a failing key on later flushes, or dead-letter it after max_attempts"""
+        failures = self._failures.get(key, 0) + 1
+        if failures < self.max_attempts:
+            self._failures[key] = failures
+            self._restore([key], batch, oldest)
+            return
+        self._failures.pop(key, None)
+        increments, counts, rows = batch
+        self.dead_letters.append({
+            'key': key,
+            'increments': increments[key],
+            'rows': [row for row_key, row in rows if row_key == key],
+            'error': f'{type(error).__name__}: {error}'
+        })
+        self.stats['dead_lettered'] += counts[key]
+        print(f"Write buffer dropped {counts[key]} events for {key!r} after {failures} failed flushes: {error}")
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._events:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"Write buffer flush failed ({self._events} events kept): {e}")
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name='write-buffer', daemon=True)
+                self._thread.start()
+
+    def close(self) -> None:
+        """Stop the writer thread and flush what is left (registered for interpreter shutdown)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(5.0, self.flush_interval * 2))
+        if self._events:
+            self.flush()
@@ -1,4 +1,4 @@
-import React, { useState, useCallback } from 'react';
+import React, { useState, useCallback, useEffect, useRef } from 'react';
 import { motion } from 'framer-motion';
 import { 
   FiUpload, 
@@ -12,6 +12,8 @@ import {
 } from 'react-icons/fi';
 import { paperAPI } from '../services/api';
 
+const JOB_POLL_INTERVAL_MS = 2000;
+
 const PaperUpload = ({ studentId }) => {
   const [file, setFile] = useState(null);
   const [isUploading, setIsUploading] = useState(false);
@@ -19,6 +21,23 @@ const PaperUpload = ({ studentId }) => {
   const [dragActive, setDragActive] = useState(false);
   const [quickText, setQuickText] = useState('');
   const [activeTab, setActiveTab] = useState('upload'); // 'upload' or 'text'
+  const [jobProgress, setJobProgress] = useState(null);
+  const unmounted = useRef(false);
+
+  useEffect(() => () => { unmounted.current = true; }, []);
+
+  // Uploads are analyzed in the background; poll the job until it finishes
+  const waitForPaperJob = async (jobId) => {
+    while (!unmounted.current) {
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+      const response = await paperAPI.getPaperJob(jobId);
+      const { status, progress, error } = response.job;
+      if (status === 'done') return response.analysis;
+      if (status === 'failed') throw new Error(error || 'Analysis failed');
+      setJobProgress(progress);
+    }
+    return null;
+  };
 
   const handleDrag = useCallback((e) => {
     e.preventDefault();
@@ -85,12 +104,19 @@ const PaperUpload = ({ studentId }) => {
 
     try {
       const response = await paperAPI.analyzePaper(formData);
-      setAnalysis(response.analysis);
+      // A paper analyzed before comes back done straight away; otherwise it is queued
+      const result = response.status === 'done'
+        ? response.analysis
+        : await waitForPaperJob(response.job_id);
+      if (result && !unmounted.current) setAnalysis(result);
     } catch (error) {
       console.error('Upload failed:', error);
       alert('Upload failed. Please try again.');
     } finally {
-      setIsUploading(false);
+      if (!unmounted.current) {
+        setIsUploading(false);
+        setJobProgress(null);
+      }
     }
   };
 
@@ -220,7 +246,9 @@ const PaperUpload = ({ studentId }) => {
                   disabled={!file || isUploading}
                   className="w-full mt-6 py-3 bg-gradient-to-r from-blue-500 to-indigo-600 text-white font-semibold rounded-lg hover:from-blue-600 hover:to-indigo-700 transition-all duration-300 disabled:opacity-50"
                 >
-                  {isUploading ? 'Analyzing...' : 'Analyze Paper'}
+                  {isUploading
+                    ? (jobProgress != null ? `Analyzing... ${jobProgress}%` : 'Analyzing...')
+                    : 'Analyze Paper'}
                 </button>
               </div>
             )}
@@ -48,6 +48,7 @@ export const authAPI = {
 // Performance APIs
 export const performanceAPI = {
   getPrediction: (studentId) => api.get(`/performance/predict/${studentId}`),
+  getBatchPredictions: (data) => api.post('/performance/predict/batch', data),
   getDashboard: (studentId) => api.get(`/dashboard/${studentId}`),
 };
 
@@ -55,17 +56,25 @@ export const performanceAPI = {
 export const testAPI = {
   startAdaptiveTest: (data) => api.post('/tests/adaptive/start', data),
   submitAnswer: (data) => api.post('/tests/adaptive/submit', data),
+  submitAnswerBatch: (data) => api.post('/tests/adaptive/submit-batch', data),
   getTestHistory: (studentId) => api.get(`/tests/history/${studentId}`),
 };
 
+// Cohort APIs
+export const cohortAPI = {
+  getAnalytics: (classLevel, subject) => api.get('/cohorts/analytics', { params: { class_level: classLevel, subject } }),
+};
+
 // Paper Analysis APIs
 export const paperAPI = {
   analyzePaper: (formData) => {
     const config = {
       headers: { 'Content-Type': 'multipart/form-data' }
     };
-    return api.post('/papers/analyze', formData, config);
+    return api.post('/papers/upload', formData, config);
   },
+  getPaperJob: (jobId) => api.get(`/papers/jobs/${jobId}`),
+  quickAnalyze: (data) => api.post('/papers/quick-analyze', data),
 };
 
 // Learning APIs